@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+benchmark.py - Implements a reproducible benchmark suite for the hot paths of the solver, on seeded
+               synthetic images, compared against a stored JSON baseline to flag regressions.
+               Run from the repository root with
+                   python -m benchmarks.benchmark [--sizes 128 256] [--save] [--baseline path] [--tune]
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# External Imports
+import numpy as np
+from tabulate import tabulate       # type: ignore
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Profiler, Recorder, svd_shrink
+from inpainter.InPainter import fold, unfold
+from inpainter.backends import AUTOTUNER, SVD_CACHE_VARIABLE
+
+BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES: Tuple[int, ...] = (128, 256, 512, 1024)
+
+# Metrics compared to the baseline, with whether a larger value is a regression
+METRICS: Dict[str, bool] = {"time": True, "its/s": False, "peak MB": True, "iterations": True}
+
+# Values of a case reported in the table
+COLUMNS: Tuple[str, ...] = ("time", "iterations", "bregman updates", "its/s", "time to tol", "peak MB")
+
+
+def synthetic_image(size: int, seed: int = 0) -> np.ndarray:
+    """
+    Creates a seeded (size, size, 3) image in [0, 1], made of smooth low-rank gradients and
+    waves, a few constant rectangles for edges and a little noise, as natural images are
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    x: np.ndarray = np.linspace(0, 1, size)
+    image: np.ndarray = np.empty((size, size, 3))
+    for channel in range(3):
+        frequencies: np.ndarray = rng.uniform(0.5, 4, size=2)
+        phases: np.ndarray = rng.uniform(0, 2 * np.pi, size=2)
+        image[..., channel] = 0.5 + 0.25 * np.outer(np.sin(2 * np.pi * frequencies[0] * x + phases[0]),
+                                                    np.cos(2 * np.pi * frequencies[1] * x + phases[1]))
+        image[..., channel] += 0.2 * np.add.outer(x, -x) * rng.uniform(-1, 1)
+    for _ in range(8):
+        i0, j0 = rng.integers(0, size, size=2)
+        i1, j1 = i0 + rng.integers(size // 16, size // 4 + 1, size=2)
+        image[i0:i1, j0:j1] = rng.uniform(0, 1, size=3)
+    image += rng.normal(0, 0.01, size=image.shape)
+    return np.clip(image, 0, 1)
+
+
+def synthetic_masked_image(size: int, erase_ratio: float = 0.5, seed: int = 0) -> MaskedImage:
+    """
+    Creates a seeded synthetic MaskedImage, erasing a fraction erase_ratio of its pixels at random
+    """
+    rng: np.random.Generator = np.random.default_rng(seed + 1)
+    mask: np.ndarray = (rng.random((size, size)) >= erase_ratio).astype(np.uint8)
+    return MaskedImage.from_arrays(synthetic_image(size, seed), mask)
+
+
+def measure(function: Callable[[], Any], repeats: int) -> Tuple[float, float, Any]:
+    """
+    Returns the best time over repeats calls of function, the peak traced memory in MB of one more
+    call and the result of that call. The memory is traced separately so it does not slow the timings.
+    """
+    times: List[float] = []
+    for _ in range(repeats):
+        start: float = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    tracemalloc.start()
+    result: Any = function()
+    peak: float = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return min(times), peak, result
+
+
+def tune_backends(sizes: Sequence[int]) -> Dict[str, str]:
+    """
+    Tunes the SVD backends of AUTOTUNER on both unfoldings of an image of every size, without time
+    budget, and returns the choices. They are cached as configured by SVD_CACHE_VARIABLE.
+    """
+    for size in sizes:
+        Z: np.ndarray = synthetic_masked_image(size).get_image_masked()
+        for axis in (0, 1):
+            AUTOTUNER.tune(fold(Z, axis))
+    return AUTOTUNER.choices
+
+
+def micro_benchmarks(sizes: Sequence[int], repeats: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmarks svd_shrink on the shapes of both unfoldings, fold/unfold and the masking operator
+    """
+    cases: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        image: MaskedImage = synthetic_masked_image(size)
+        Z: np.ndarray = image.get_image()
+        for axis in (0, 1):
+            matrix: np.ndarray = fold(Z, axis)
+            time, peak, _ = measure(lambda: svd_shrink(matrix, 1), repeats)
+            cases[f"svd_shrink {matrix.shape[0]}x{matrix.shape[1]}"] = {"time": time, "peak MB": peak}
+            time, peak, _ = measure(lambda: unfold(fold(Z, axis), axis), 10 * repeats)
+            cases[f"fold/unfold axis={axis} {size}"] = {"time": time, "peak MB": peak}
+            # The prox outputs are Fortran ordered, which mask_image should also handle well
+            time, peak, _ = measure(lambda: image.mask_image(unfold(matrix, axis)), 10 * repeats)
+            cases[f"mask_image {'CF'[axis]}-order {size}"] = {"time": time, "peak MB": peak}
+    return cases
+
+
+def solver_benchmarks(sizes: Sequence[int], repeats: int, max_it: int, tol: float, tol_bregman: float,
+                      rho: float = 1, lamb: float = 0.5) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmarks a full InPainter.run at every size, with static and inertial iterations and with
+    and without Bregman updates, keeping the best time over repeats runs. The time to tolerance is
+    the time of the run if it converged. The Bregman updates are counted by one more, profiled, run,
+    and a Bregman case without any update, which would only time the run without, is an error.
+    """
+    cases: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        image: MaskedImage = synthetic_masked_image(size)
+        painter: InPainter = InPainter(image, max_it=max_it, tol=tol, tol_bregman=tol_bregman)
+        for alpha_static in (True, False):
+            for bregman in (False, True):
+                name: str = f"run {size} {'static' if alpha_static else 'inertial'}" \
+                            f"{' bregman' if bregman else ''}"
+                run: Callable[..., Any] = lambda profiler=None: painter.run(rho, lamb, alpha_static, bregman,
+                                                                            recorder=Recorder(every=0),
+                                                                            profiler=profiler)
+                time, peak, (_, its, _, _) = measure(run, repeats)
+                updates: Optional[int] = None
+                if bregman:
+                    profiler: Profiler = Profiler()
+                    run(profiler)
+                    updates = profiler.counts().get("bregman", 0)
+                    if updates == 0:
+                        raise ValueError(f"The case '{name}' made no Bregman update in {its} iterations, "
+                                         f"increase --tol-bregman or --max-it")
+                cases[name] = {"time": time,
+                               "iterations": its,
+                               "bregman updates": updates,
+                               "its/s": its / time,
+                               "time to tol": time if its < max_it else None,
+                               "peak MB": peak}
+    return cases
+
+
+def compare(cases: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float,
+            metrics_compared: Dict[str, bool] = METRICS, columns: Sequence[str] = COLUMNS) \
+        -> Tuple[List[List[Any]], List[str]]:
+    """
+    Compares the cases to the baseline, returns the rows of the report, made of the columns of every
+    case, and the names of the cases having one of the metrics compared worse than the baseline by
+    more than the relative threshold
+    """
+    rows: List[List[Any]] = []
+    regressions: List[str] = []
+    for name, metrics in cases.items():
+        reference: Optional[Dict[str, Any]] = baseline.get(name)
+        status: str = "new" if reference is None else "ok"
+        changes: List[str] = []
+        for metric, larger_worse in metrics_compared.items():
+            if reference is None or metrics.get(metric) is None or not reference.get(metric):
+                continue
+            ratio: float = metrics[metric] / reference[metric]
+            changes.append(f"{metric} {ratio - 1:+.0%}")
+            if (ratio > 1 + threshold) if larger_worse else (ratio < 1 / (1 + threshold)):
+                status = "REGRESSION"
+        if status == "REGRESSION":
+            regressions.append(name)
+        rows.append([name, *(metrics.get(column) for column in columns), ", ".join(changes), status])
+    return rows, regressions
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the suite, prints the report and returns 1 if a regression was found, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the hot paths of the inpainting solver")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Image sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats of every benchmark, the best is kept")
+    parser.add_argument("--max-it", type=int, default=50, help="Maximal number of iterations of a run")
+    parser.add_argument("--tol", type=float, default=1e-3, help="Tolerance of a run")
+    parser.add_argument("--tol-bregman", type=float, default=1,
+                        help="Tolerance of the Bregman updates, on the absolute residual, which grows with the size")
+    parser.add_argument("--baseline", default=BASELINE, help="Path of the JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change flagged as regression")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--no-solver", action="store_true", help="Only run the micro benchmarks")
+    parser.add_argument("--tune", action="store_true",
+                        help=f"Tune all the SVD backends of the sizes first, cached as set by ${SVD_CACHE_VARIABLE}")
+    options = parser.parse_args(arguments)
+
+    if options.tune:
+        for shape, backend in tune_backends(options.sizes).items():
+            print(f"SVD backend of {shape}: {backend}")
+
+    cases: Dict[str, Dict[str, Any]] = micro_benchmarks(options.sizes, options.repeats)
+    if not options.no_solver:
+        cases.update(solver_benchmarks(options.sizes, options.repeats, options.max_it, options.tol,
+                                       options.tol_bregman))
+
+    settings: Dict[str, Any] = {"max_it": options.max_it, "tol": options.tol,
+                                "tol_bregman": options.tol_bregman, "repeats": options.repeats}
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as file:
+            stored: Dict[str, Any] = json.load(file)
+        baseline = stored["cases"]
+        if stored["settings"] != settings:
+            print(f"Warning: the baseline was measured with {stored['settings']}, not {settings}")
+
+    rows, regressions = compare(cases, baseline, options.threshold)
+    print(tabulate(rows, headers=["case", "time", "its", "updates", "its/s", "time to tol", "peak MB", "vs baseline",
+                                  "status"], floatfmt=".4g"))
+
+    if options.save:
+        with open(options.baseline, "w") as file:
+            json.dump({"machine": {"platform": platform.platform(),
+                                   "processor": platform.processor(),
+                                   "cpus": os.cpu_count(),
+                                   "python": platform.python_version(),
+                                   "numpy": np.__version__},
+                       "settings": settings,
+                       "cases": {**baseline, **cases}}, file, indent=2)
+        print(f"Saved the baseline to {options.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {options.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
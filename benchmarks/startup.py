@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+startup.py - Implements a benchmark of the import time, number of imported modules and memory at
+             startup of the import paths of the inpainter module, compared against a stored JSON
+             baseline to flag regressions. Run from the repository root with
+                 python -m benchmarks.startup [--repeats 5] [--save] [--baseline path]
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# External Imports
+from tabulate import tabulate       # type: ignore
+
+# Internal Imports
+from benchmarks.benchmark import compare
+
+BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Statements timed in a fresh interpreter
+CASES: Dict[str, str] = {
+    "numpy": "import numpy",
+    "inpainter.solver": "import inpainter.solver",
+    "inpainter": "import inpainter",
+    "InPainter": "from inpainter import InPainter, MaskedImage",
+    "experiments": "from inpainter import ExpRho, plot_convergence",
+}
+
+# Dependencies which should only be imported when used
+HEAVY: Tuple[str, ...] = ("matplotlib", "tabulate", "tqdm", "scipy.sparse", "scipy.ndimage", "PIL")
+
+# Metrics compared to the baseline, with whether a larger value is a regression
+METRICS: Dict[str, bool] = {"time": True, "modules": True, "RSS MB": True}
+
+# Script run in a fresh interpreter, printing the measurements of the statement as JSON
+# The peak resident memory is read from /proc when available, as ru_maxrss survives the exec of the interpreter
+PROBE: str = """
+import json, resource, sys, time
+modules = len(sys.modules)
+start = time.perf_counter()
+{statement}
+try:
+    with open("/proc/self/status") as status:
+        rss = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"time": time.perf_counter() - start,
+                  "modules": len(sys.modules) - modules,
+                  "RSS MB": rss / 1024,
+                  "heavy": [name for name in {heavy} if name in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeats: int) -> Dict[str, Any]:
+    """
+    Runs statement in repeats fresh interpreters, returns the best import time and the number of
+    modules, peak resident memory and heavy dependencies imported
+    """
+    runs: List[Dict[str, Any]] = []
+    for _ in range(repeats):
+        output: str = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY)],
+                                     cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+    best: Dict[str, Any] = min(runs, key=lambda run: run["time"])
+    best["heavy"] = ", ".join(best["heavy"])
+    return best
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the startup benchmark, prints the report and returns 1 if a regression was found, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the import paths of the inpainter module")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per case, the best is kept")
+    parser.add_argument("--baseline", default=BASELINE, help="Path of the JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change flagged as regression")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    options = parser.parse_args(arguments)
+
+    cases: Dict[str, Dict[str, Any]] = {name: measure(statement, options.repeats)
+                                        for name, statement in CASES.items()}
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as file:
+            baseline = json.load(file)["cases"]
+
+    columns: Tuple[str, ...] = ("time", "modules", "RSS MB", "heavy")
+    rows, regressions = compare(cases, baseline, options.threshold, METRICS, columns)
+    print(tabulate(rows, headers=["case", *columns, "vs baseline", "status"], floatfmt=".4g"))
+
+    if options.save:
+        with open(options.baseline, "w") as file:
+            json.dump({"machine": {"platform": platform.platform(),
+                                   "processor": platform.processor(),
+                                   "cpus": os.cpu_count(),
+                                   "python": platform.python_version()},
+                       "settings": {"repeats": options.repeats},
+                       "cases": {**baseline, **cases}}, file, indent=2)
+        print(f"Saved the baseline to {options.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {options.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,14 +6,57 @@ Algorithm2.py - Implements an Algorithm based on Inertial Krasnoselskii-Mann Ite
 """
 
 # Standard Imports
-from typing import Tuple, Callable, List, TypedDict
+from collections import deque
+from time import perf_counter
+from typing import Any, Tuple, Callable, Deque, Dict, Generator, List, Optional, TypedDict
 
 # External imports
 import numpy as np
-from tqdm.auto import trange                # type: ignore
 
 # Internal Imports
-from .types import HistoryDict
+from .lazy import tqdm
+from .Checkpoint import Checkpoint
+from .LowRank import LowRank
+from .Recorder import Recorder, HistoryRecorder
+from .Profiler import Profiler
+from .types import ProgressDict
+
+
+def inertial_alpha(lamb: float, rho: float, beta: float) -> float:
+    """
+    Computes the inertial parameter alpha given lambda, rho and beta, see Algorithm
+    """
+    eta: float = lamb * 2 * beta / (4 * beta - rho)
+    alpha: float = 1 / 3
+    if abs(eta - 1 / 2) > 1e-6:
+        alpha = (eta - 2 + np.sqrt((eta - 2) ** 2 - 4 * (eta - 1) * (2 * eta - 1))) / (2 * (2 * eta - 1))
+    return alpha
+
+
+class Workspace:
+    """
+    Owns the buffers reused by the iterations of a run of the Algorithm, all shaped as the iterates,
+    so that a KM iteration allocates none outside the operators. The intermediate variable of T is built
+    in the buffer of the next iterate, so only the factored operator, which needs both at once, holds
+    a buffer for it.
+    Parameters:
+        Z_init              Initial guess of Z, copied in its memory layout so the iterations can overwrite it
+        inertial            Whether the inertial variable is needed (Default: True)
+        factored            Whether the factored operator T is used (Default: False)
+    Attributes:
+        Z_previous          Iterate before the actual one, overwritten by the next iterate
+        Z_actual            Actual iterate, initially Z_init
+        U                   Inertial variable, only allocated in the inertial case
+        Z_half              Intermediate variable of the factored operator T, only allocated if factored
+        difference          Difference of the last two iterates, whose norm is the residual
+    """
+
+    def __init__(self, Z_init: np.ndarray, inertial: bool = True, factored: bool = False) -> None:
+        self.Z_previous: np.ndarray = np.empty_like(Z_init)
+        self.Z_actual: np.ndarray = Z_init.copy(order='K')
+        self.U: Optional[np.ndarray] = np.empty_like(Z_init) if inertial else None
+        self.Z_half: Optional[np.ndarray] = np.empty_like(Z_init) if factored else None
+        self.difference: np.ndarray = np.empty_like(Z_init)
 
 
 class Algorithm:
@@ -37,17 +80,42 @@ class Algorithm:
     Parameters:
         proxf               The proximal operator of f
         proxg               The proximal operator of g
-        LgradhL             The operator L^*(grad_h(L))
+        LgradhL             The operator L^*(grad_h(L)), whose output T scales in place, so it may be a
+                            buffer reused by the operator as long as it is rewritten at every call
         Z_init              Initial guess of Z
         lamb                Value of lambda in (0,1) [Default: 0.5]
         rho                 Value of rho in (0,2) [Default: 1]
         beta                The inverse of the Lipschitz constant of grad_h [Default: 1]
         alpha_static        Boolean expression whether alpha is static or not [Default: False]
+        anderson            Memory of the Anderson acceleration, 0 to disable it [Default: 0]
+        anderson_type       Type (1 or 2) of the Anderson acceleration [Default: 2]
+        profiler            Profiler timing the phases of the runs, None to disable it [Default: None]
+        factored            Whether proxf and proxg return LowRank tensors instead of arrays [Default: False]
+        state               Arrays modified in place by the operators, such as the Bregman state, which
+                            are saved in the checkpoints and restored when resuming [Default: None]
+    When anderson > 0, the inertial step is replaced by a safeguarded Anderson acceleration of the
+    fixed-point iteration Z1 = T(Z0): the next iterate combines the last images by T so as to minimise
+    the combined residual T(Z) - Z (type 2), or solves the secant equations projected on the last
+    steps (type 1). The step is only accepted if it does not increase the residual, otherwise the
+    plain KM step Z1 = T(Z0) is taken and the memory cleared.
+    When factored, the outputs of the proximal operators are carried as the factors of their shrunken
+    unfoldings and only materialised in the buffers of the workspace, which are Fortran ordered so that
+    the unfoldings are views. Xg is not kept, but recovered from Zhalf when computing the next iterate.
+    The iterates themselves, and so the residuals of the stopping criterion, remain dense, while the
+    recorders of the history would materialise z_k and Tz_k at every recorded iteration, so factored
+    runs only accept recorders of no iteration.
     Public Methods:
         run                Runs the algorithm
+        stream             Runs the algorithm as a generator of progress records
     Private Methods:
-        iterate            Runs a single iteration of the algorithm
-        error              Compute error estimate used for stopping criterion
+        operator_T         Applies the operator T, in place when possible
+        operator_T_factored Applies the operator T on factored proximal outputs
+        iterate            Runs a single iteration of the algorithm, in the workspace
+        iterate_anderson   Runs a single Anderson accelerated iteration
+        image_T            Applies the operator T, reusing the last image computed
+        residuals          Compute the residuals used for stopping criterion and Bregman update
+        resume             Restores the state saved in a checkpoint
+        snapshot           Returns the state to save in a checkpoint
     """
 
     def __init__(self,
@@ -59,70 +127,302 @@ class Algorithm:
                  lamb: float = 0.5,
                  rho: float = 1,
                  beta: float = 1,
-                 alpha_static: bool = False) -> None:
+                 alpha_static: bool = False,
+                 anderson: int = 0,
+                 anderson_type: int = 2,
+                 profiler: Optional[Profiler] = None,
+                 factored: bool = False,
+                 state: Optional[Dict[str, np.ndarray]] = None) -> None:
+        if anderson_type not in (1, 2):
+            raise ValueError("The type of the Anderson acceleration should be 1 or 2")
+        # Time the operators by wrapping them, so that nothing changes without profiler
+        self.__profiler: Optional[Profiler] = profiler
+        if profiler is not None:
+            proxf, proxg = profiler.wrap("proxf", proxf), profiler.wrap("proxg", proxg)
+            LgradhL, update_LgradhL = profiler.wrap("LgradhL", LgradhL), profiler.wrap("bregman", update_LgradhL)
         self.__proxf: Callable[[np.ndarray, float], np.ndarray] = proxf
         self.__proxg: Callable[[np.ndarray, float], np.ndarray] = proxg
         self.__LgradhL: Callable[[np.ndarray], np.ndarray] = LgradhL
         self.__update_LgradhL: Callable[[None], None] = update_LgradhL
-        self.__Z_init: np.ndarray = Z_init
+        self.__Z_init: np.ndarray = np.asfortranarray(Z_init) if factored else Z_init
+        self.__factored: bool = factored
+        self.__state: Dict[str, np.ndarray] = state if state is not None else {}
         self.__lambda: float = lamb
         self.__rho: float = rho
 
         # Compute get_alpha
-        eta: float = lamb * 2 * beta / (4 * beta - rho)
-        alpha: float = 1 / 3
-        if abs(eta - 1 / 2) > 1e-6:
-            alpha = (eta - 2 + np.sqrt((eta - 2) ** 2 - 4 * (eta - 1) * (2 * eta - 1))) / (2 * (2 * eta - 1))
+        alpha: float = inertial_alpha(lamb, rho, beta)
         self.__get_alpha: Callable[[int], float] = lambda k: (1 - 1 / (k+1)) * alpha if not alpha_static else 0
 
-    def __operator_T(self, U: np.ndarray) -> np.ndarray:
+        # Anderson acceleration, with the differences of the last iterates, residuals and images by T
+        self.__anderson: int = anderson
+        self.__anderson_type: int = anderson_type
+        self.__memory: Deque[Tuple[np.ndarray, np.ndarray, np.ndarray]] = deque(maxlen=anderson)
+        self.__last: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self.__T_cache: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.__apply_T: Callable[..., np.ndarray] = self.__operator_T_factored if factored else self.__operator_T
+        self.__workspace: Optional[Workspace] = None
+
+    def __operator_T(self, U: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """ @private
-        Applies the operator T on the inertial variable U
+        Applies the operator T on the inertial variable U, writing the result in out if given.
+        Zhalf is built in out, which proxf has consumed by the time the result overwrites it, and the
+        gradient is scaled in place in the array returned by LgradhL.
         """
         Xg = self.__proxg(U, self.__rho)
-        Z_halfnext = 2 * Xg - U - self.__rho * self.__LgradhL(Xg)
-        Z_next = U + self.__lambda * (self.__proxf(Z_halfnext, self.__rho) - Xg)
+        gradient = self.__LgradhL(Xg)
+        gradient *= self.__rho
+        Z_halfnext = np.multiply(Xg, 2, out=out)
+        Z_halfnext -= U
+        Z_halfnext -= gradient
+        Z_next = np.subtract(self.__proxf(Z_halfnext, self.__rho), Xg, out=Z_halfnext)
+        Z_next *= self.__lambda
+        Z_next += U
+        return Z_next
+
+    def __operator_T_factored(self, U: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ @private
+        Applies the operator T on the inertial variable U, writing the result in out if given, the
+        proximal operators returning LowRank tensors. As Zhalf = 2 * Xg - U - rho * L^*(grad_h(L(Xg))),
+        the next iterate is computed without Xg as
+            Z_next = lambda * prox_{rho f}(Zhalf) - lambda / 2 * (Zhalf + U + rho * L^*(grad_h(L(Xg)))) + U
+        """
+        workspace: Workspace = self.__workspace
+        Xg: LowRank = self.__proxg(U, self.__rho)
+        Z_halfnext = Xg.dense(out=workspace.Z_half)
+        gradient = self.__LgradhL(Z_halfnext)
+        gradient *= self.__rho
+        Z_halfnext *= 2
+        Z_halfnext -= U
+        Z_halfnext -= gradient
+        Z_next = self.__proxf(Z_halfnext, self.__rho).dense(out=out)
+        Z_next *= self.__lambda
+        # Zhalf is no longer needed, so the subtracted term is accumulated in it
+        Z_halfnext += U
+        Z_halfnext += gradient
+        Z_halfnext *= self.__lambda / 2
+        Z_next -= Z_halfnext
+        Z_next += U
         return Z_next
 
-    def __iterate(self, Z_previous: np.ndarray, Z_actual: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    def __image_T(self, Z: np.ndarray) -> np.ndarray:
+        """ @private
+        Applies the operator T on Z, reusing the last image computed if it was of Z itself.
+        Buffers of the workspace are overwritten, so the cache is dropped by iterate when that happens.
+        """
+        if self.__T_cache is None or self.__T_cache[0] is not Z:
+            self.__T_cache = (Z, self.__apply_T(Z))
+        return self.__T_cache[1]
+
+    def __iterate_anderson(self, Z_actual: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """ @private
-        Perform the iterations according to Algorithm 2
+        Perform a safeguarded Anderson accelerated iteration of the map T, see iterate
         """
-        U = Z_actual + self.__get_alpha(k) * (Z_actual - Z_previous)    # Inertial Step
-        Z_next = self.__operator_T(U)                                   # KM Step
-        return Z_actual, Z_next
+        TZ: np.ndarray = self.__image_T(Z_actual)
+        G: np.ndarray = TZ - Z_actual
+        if self.__last is not None:
+            self.__memory.append((Z_actual - self.__last[0], G - self.__last[1], TZ - self.__last[2]))
+        self.__last = (Z_actual, G, TZ)
+        if not self.__memory:
+            return Z_actual, TZ, Z_actual, TZ
+
+        # Combination coefficients, from the flattened differences of the memory
+        dX, dG, dT = (np.stack([entry[i].ravel() for entry in self.__memory], axis=1) for i in range(3))
+        if self.__anderson_type == 2:
+            gamma: np.ndarray = np.linalg.lstsq(dG, G.ravel(), rcond=None)[0]
+        else:
+            gamma = np.linalg.lstsq(dX.T @ dG, dX.T @ G.ravel(), rcond=None)[0]
+        Z_next: np.ndarray = TZ - (dT @ gamma).reshape(TZ.shape)
+
+        # Safeguard, falling back to the KM step if the residual would grow
+        if np.linalg.norm(self.__image_T(Z_next) - Z_next) > np.linalg.norm(G):
+            self.__memory.clear()
+            return Z_actual, TZ, Z_actual, TZ
+        return Z_actual, Z_next, Z_actual, TZ
 
-    @staticmethod
-    def __residual(Z_previous: np.ndarray, Z_actual: np.ndarray) -> float:
+    def __iterate(self, Z_previous: np.ndarray, Z_actual: np.ndarray,
+                  k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """ @private
-        Computes the residual of the iterations
+        Perform the iterations according to Algorithm 2. Returns the actual and next iterates, and the
+        point U to which T was applied with its image T(U), which a recorder at_inertial records for free.
         """
-        return np.linalg.norm(Z_actual - Z_previous) / np.linalg.norm(Z_previous)
+        if self.__anderson > 0:
+            return self.__iterate_anderson(Z_actual)
+
+        # Inertial Step, in the workspace unless it vanishes
+        U: np.ndarray = Z_actual
+        alpha: float = self.__get_alpha(k)
+        if alpha != 0:
+            U = np.subtract(Z_actual, Z_previous, out=self.__workspace.U)
+            U *= alpha
+            U += Z_actual
+
+        # KM Step, overwriting the no longer needed previous iterate, with the image of U if the history
+        # already computed it
+        if self.__T_cache is not None and self.__T_cache[0] is Z_previous:
+            self.__T_cache = None
+        if self.__T_cache is not None and self.__T_cache[0] is U:
+            Z_previous[...] = self.__T_cache[1]
+            return Z_actual, Z_previous, U, Z_previous
+        Z_next = self.__apply_T(U, out=Z_previous)
+        return Z_actual, Z_next, U, Z_next
 
-    @staticmethod
-    def __residual_bregman(Z_previous: np.ndarray, Z_actual: np.ndarray) -> float:
+    def __residuals(self, Z_previous: np.ndarray, Z_actual: np.ndarray) -> Tuple[float, float]:
         """ @private
-        Computes the residual of the iterations
+        Computes the relative residual of the iterations, used as stopping criterion, and the
+        absolute one, used for the Bregman update, from a single difference, computed in the workspace
         """
-        return np.linalg.norm(Z_actual - Z_previous)
+        difference: np.ndarray = np.subtract(Z_actual, Z_previous, out=self.__workspace.difference)
+        residual: float = np.linalg.norm(difference)
+        return residual / np.linalg.norm(Z_previous), residual
 
-    def run(self, max_it: int, tol: float, tol_bregman: float = 0, verbose: bool = True) \
-            -> Tuple[int, HistoryDict]:
+    def __snapshot(self, Z_previous: np.ndarray, Z_actual: np.ndarray, inertial: bool) -> Dict[str, np.ndarray]:
+        """ @private
+        Returns the arrays of the state to save in a checkpoint, the previous iterate only being needed
+        by the inertial step
+        """
+        arrays: Dict[str, np.ndarray] = {f"state_{name}": array for name, array in self.__state.items()}
+        arrays["Z"] = Z_actual
+        if inertial:
+            arrays["Z_previous"] = Z_previous
+        return arrays
+
+    def __resume(self, saved: Dict[str, np.ndarray], Z_previous: np.ndarray, Z_actual: np.ndarray) -> int:
+        """ @private
+        Restores the iterates and the state of the operators saved in a checkpoint, in place, and
+        returns the iteration to resume from
+        """
+        Z_actual[...] = saved["Z"]
+        if "Z_previous" in saved:
+            Z_previous[...] = saved["Z_previous"]
+        for name, array in self.__state.items():
+            array[...] = saved[f"state_{name}"]
+        return int(saved["iteration"])
+
+    def run(self, max_it: int, tol: float, tol_bregman: float = 0, verbose: bool = True,
+            recorder: Optional[Recorder] = None, checkpoint: Optional[Checkpoint] = None,
+            key: str = "") -> Tuple[int, Recorder]:
+        """ @public
+        Run the algorithm given the number of iterations and the iterator, see stream.
+        Returns the number of iterations and the recorder.
+        """
+        progress = self.stream(max_it, tol, tol_bregman, verbose, recorder, checkpoint, key, every=0)
+        while True:
+            try:
+                next(progress)
+            except StopIteration as stop:
+                return stop.value
+
+    def stream(self, max_it: int, tol: float, tol_bregman: float = 0, verbose: bool = False,
+               recorder: Optional[Recorder] = None, checkpoint: Optional[Checkpoint] = None,
+               key: str = "", every: int = 1, interval: float = 0,
+               preview: int = 0) -> Generator[ProgressDict, Optional[Dict[str, Any]], Tuple[int, Recorder]]:
         """ @public
-        Run the algorithm given the number of iterations and the iterator
+        Runs the algorithm as a generator, yielding a progress record every every iterations, or as soon
+        as interval seconds passed since the previous one, and a last record once done, holding the
+        solution. The records hold the iteration, the relative residual, the tolerance and, if preview > 0,
+        a copy of the iterate downsampled by taking one pixel out of preview in both directions.
+        A dictionary sent to the generator updates "tol" or "tol_bregman", or with "stop" ends the run
+        cleanly, the solution being the image of the last iterate and the checkpoint, if any, being saved
+        instead of removed. Closing the generator abandons the run. The generator returns the number
+        of iterations and the recorder.
+        The recorder (Default: HistoryRecorder) decides which iterations are recorded. The iterate z_k of
+        a recorded iteration k is recorded with its image Tz_k, computed before the Bregman update of the
+        iteration, if any. Static iterations then apply T to z_k at the next iteration, so they reuse
+        that image, and only the recorded inertial iterations apply T once more. If the recorder is
+        at_inertial, the point u_k to which iteration k + 1 applies T is recorded instead, with its image,
+        the next iterate, so that T is never applied for the history: it is the inertial variable of an
+        inertial step, and otherwise z_k, its image being taken after the Bregman update of iteration k.
+        The image of the last iterate by T is computed once, before its Bregman update, and recorded.
+        The factored operator only supports a recorder of no iteration (Default: Recorder(every=0)), as
+        recording materialises the iterates and their images; only the final iterate is then recorded.
+        With a profiler, the phases are timed and the profiler is attached to the recorder.
+        With a checkpoint, the run resumes from the state it saved for the problem key, if any, saves its
+        state periodically and removes it once completed. The Anderson memory is not saved, so it is
+        rebuilt after resuming; all else continues exactly, including the iteration count.
         """
-        Z_previous: np.ndarray = np.zeros_like(self.__Z_init) + 1
-        Z_next: np.ndarray = self.__Z_init
-        hist: HistoryDict = {"Z": [], "TZ": []}
-        its: int = 0
-
-        for its in trange(max_it, disable=not verbose):
-            Z_previous, Z_next = self.__iterate(Z_previous, Z_next, its)
-            hist["Z"].append(Z_next)
-            hist["TZ"].append(self.__operator_T(Z_next))
-            if self.__residual_bregman(Z_previous, Z_next) < tol_bregman:
+        profiler: Optional[Profiler] = self.__profiler
+        residuals = self.__residuals if profiler is None else profiler.wrap("residuals", self.__residuals)
+        image_T = self.__image_T if profiler is None else profiler.wrap("image_T", self.__image_T)
+        inertial: bool = self.__anderson == 0 and self.__get_alpha(1) != 0
+        self.__workspace = Workspace(self.__Z_init, inertial=inertial, factored=self.__factored)
+        Z_previous: np.ndarray = self.__workspace.Z_previous
+        Z_next: np.ndarray = self.__workspace.Z_actual
+        if recorder is None:
+            recorder = Recorder(every=0) if self.__factored else HistoryRecorder()
+        if self.__factored and recorder.records():
+            raise ValueError("The factored operator only supports recorders of no iteration, such as Recorder(every=0)")
+        recorder.point = "u" if inertial and recorder.at_inertial else "z"
+        TZ_last: Optional[np.ndarray] = None
+        stopped: bool = False
+        residual: float = np.inf
+        self.__memory.clear()
+        self.__T_cache, self.__last = None, None
+
+        # Resume from the checkpoint
+        start: int = 0
+        saved: Optional[Dict[str, np.ndarray]] = checkpoint.load(key) if checkpoint is not None else None
+        if saved is not None:
+            start = self.__resume(saved, Z_previous, Z_next)
+            if start >= max_it:
+                raise ValueError(f"The checkpoint resumes at iteration {start}, beyond max_it = {max_it}")
+        its: int = start
+        last_progress: float = perf_counter()
+
+        for its in tqdm(range(start, max_it), disable=not verbose, initial=start, total=max_it):
+            if profiler is not None:
+                profiler.start_iteration(its)
+            Z_previous, Z_next, U, TU = self.__iterate(Z_previous, Z_next, its)
+            if recorder.at_inertial and its > start and recorder.wants(its - 1):
+                recorder.record(its - 1, U, TU)
+            residual, residual_bregman = residuals(Z_previous, Z_next)
+            update: bool = residual_bregman < tol_bregman
+            converged: bool = residual < tol
+            TZ_last = None
+            if converged or its + 1 == max_it or recorder.wants(its) and not recorder.at_inertial:
+                TZ_last = image_T(Z_next)
+                if recorder.wants(its):
+                    recorder.record(its, Z_next, TZ_last)
+            if update:
+                # T changes, so do its images and the residuals of the Anderson memory
                 self.__update_LgradhL(Z_next)
-            if self.__residual(Z_previous, Z_next) < tol:
+                self.__T_cache, self.__last = None, None
+                self.__memory.clear()
+            if converged:
                 break
+            if checkpoint is not None and checkpoint.due(its):
+                checkpoint.save(key, its + 1, self.__snapshot(Z_previous, Z_next, inertial))
+
+            # Progress record, at the requested cadence
+            if every > 0 and (its + 1) % every == 0 or interval > 0 and perf_counter() - last_progress >= interval:
+                command: Optional[Dict[str, Any]] = yield {
+                    "iteration": its + 1, "residual": float(residual), "tol": tol,
+                    "preview": Z_next[::preview, ::preview].copy() if preview > 0 else None,
+                    "done": False, "solution": None}
+                last_progress = perf_counter()
+                if command:
+                    tol = command.get("tol", tol)
+                    tol_bregman = command.get("tol_bregman", tol_bregman)
+                    stopped = bool(command.get("stop", False))
+                if stopped:
+                    if TZ_last is None:
+                        TZ_last = image_T(Z_next)
+                        if recorder.wants(its):
+                            recorder.record(its, Z_next, TZ_last)
+                    break
 
-        return its + 1, hist
+        if checkpoint is not None:
+            if stopped:
+                checkpoint.save(key, its + 1, self.__snapshot(Z_previous, Z_next, inertial))
+            else:
+                checkpoint.clear()
+        if profiler is not None:
+            profiler.stop()
+            recorder.profiler = profiler
+        recorder.finish(its, Z_next, TZ_last)
+        # Without any iteration, as when max_it = 0, there is no image and the preview is that of Z_init
+        last: np.ndarray = TZ_last if TZ_last is not None else Z_next
+        yield {"iteration": its + 1, "residual": float(residual), "tol": tol,
+               "preview": last[::preview, ::preview].copy() if preview > 0 else None,
+               "done": True, "solution": TZ_last}
+        return its + 1, recorder
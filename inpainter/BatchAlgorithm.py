@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+BatchAlgorithm.py - Implements the Inertial Krasnoselskii-Mann Iterations on a batch of problems
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Callable, Tuple
+
+# External imports
+import numpy as np
+
+# Internal Imports
+from .lazy import trange
+from .Algorithm import inertial_alpha
+
+
+class BatchAlgorithm:
+    """
+    Solves a batch of B independent minimisation problems with the iterations of Algorithm, stacked
+    along a first axis of size B, so every step processes the whole batch at once. Each problem
+    keeps its own stopping criterion and Bregman updates, and leaves the active batch once converged.
+    The operators receive the stacked iterates of the active problems together with their indices.
+    Parameters:
+        proxf               The proximal operator of f, applied to a stack
+        proxg               The proximal operator of g, applied to a stack
+        LgradhL             The operator L^*(grad_h(L)), applied to a stack of the given problems
+        update_LgradhL      The Bregman update of the given problems
+        Z_init              Initial guesses of Z, stacked
+        lamb                Value of lambda in (0,1) [Default: 0.5]
+        rho                 Value of rho in (0,2) [Default: 1]
+        beta                The inverse of the Lipschitz constant of grad_h [Default: 1]
+        alpha_static        Boolean expression whether alpha is static or not [Default: False]
+    Public Methods:
+        run                Runs the algorithm
+    Private Methods:
+        operator_T         Applies the operator T to a stack
+        norms              Computes the norm of every element of a stack
+    """
+
+    def __init__(self,
+                 proxf: Callable[[np.ndarray, float], np.ndarray],
+                 proxg: Callable[[np.ndarray, float], np.ndarray],
+                 LgradhL: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                 update_LgradhL: Callable[[np.ndarray, np.ndarray], None],
+                 Z_init: np.ndarray,
+                 lamb: float = 0.5,
+                 rho: float = 1,
+                 beta: float = 1,
+                 alpha_static: bool = False) -> None:
+        self.__proxf: Callable[[np.ndarray, float], np.ndarray] = proxf
+        self.__proxg: Callable[[np.ndarray, float], np.ndarray] = proxg
+        self.__LgradhL: Callable[[np.ndarray, np.ndarray], np.ndarray] = LgradhL
+        self.__update_LgradhL: Callable[[np.ndarray, np.ndarray], None] = update_LgradhL
+        self.__Z_init: np.ndarray = Z_init
+        self.__lambda: float = lamb
+        self.__rho: float = rho
+
+        alpha: float = inertial_alpha(lamb, rho, beta)
+        self.__get_alpha: Callable[[int], float] = lambda k: (1 - 1 / (k+1)) * alpha if not alpha_static else 0
+
+    def __operator_T(self, U: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """ @private
+        Applies the operator T on the stacked inertial variables U of the active problems
+        """
+        Xg = self.__proxg(U, self.__rho)
+        Z_halfnext = 2 * Xg - U - self.__rho * self.__LgradhL(Xg, active)
+        return U + self.__lambda * (self.__proxf(Z_halfnext, self.__rho) - Xg)
+
+    @staticmethod
+    def __norms(Z: np.ndarray) -> np.ndarray:
+        """ @private
+        Computes the norm of every element of a stack
+        """
+        return np.sqrt(np.sum(np.square(Z.reshape(Z.shape[0], -1)), axis=1))
+
+    def run(self, max_it: int, tol: float, tol_bregman: float = 0, verbose: bool = True) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Run the algorithm, returns the number of iterations of every problem and the image by T
+        of their last iterate
+        """
+        batch: int = self.__Z_init.shape[0]
+        active: np.ndarray = np.arange(batch)
+        iterations: np.ndarray = np.zeros(batch, dtype=int)
+        solutions: np.ndarray = np.empty_like(self.__Z_init)
+        Z_previous: np.ndarray = np.zeros_like(self.__Z_init) + 1
+        Z_next: np.ndarray = self.__Z_init
+
+        for its in trange(max_it, disable=not verbose):
+            U = Z_next + self.__get_alpha(its) * (Z_next - Z_previous)
+            Z_previous, Z_next = Z_next, self.__operator_T(U, active)
+            iterations[active] = its + 1
+
+            differences: np.ndarray = self.__norms(Z_next - Z_previous)
+            update: np.ndarray = differences < tol_bregman
+            done: np.ndarray = differences / self.__norms(Z_previous) < tol
+            if its + 1 == max_it:
+                done[:] = True
+            if np.any(done):
+                solutions[active[done]] = self.__operator_T(Z_next[done], active[done])
+            if np.any(update):
+                self.__update_LgradhL(Z_next[update], active[update])
+
+            # Converged problems leave the active batch
+            active, Z_previous, Z_next = active[~done], Z_previous[~done], Z_next[~done]
+            if active.size == 0:
+                break
+
+        return iterations, solutions
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+BatchInPainter.py - Implements the BatchInPainter Class, which solves the InPainting problem
+                    on a batch of images of the same size at once
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from time import time
+from typing import List, Tuple
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .Image import MaskedImage
+from .BatchAlgorithm import BatchAlgorithm
+from .Shrinkage import svd_shrink_batch
+
+
+class BatchInPainter:
+    """
+    Solves the inpainting problem on a batch of images of the same size, as InPainter does for a
+    single one, holding them as a (B, N, M, 3) stack. The proximal steps use stacked SVDs, while
+    the stopping criterion and the Bregman update are kept per image. As in InPainter, the gradient
+    and the Bregman state only touch the observed pixels of every image, see MaskedImage.restrict.
+    Parameters:
+        images                A list of instances of MaskedImage of the same size, to be inpainted
+        max_it                Maximal number of iterations (Default: 100)
+        tol                   Tolerance of the stopping criterion (Default: 1e-3)
+        tol_bregman           Tolerance triggering the Bregman update (Default: 5e-2)
+        verbose               Whether to show a progress bar (Default: False)
+    Public Methods:
+        run                   Runs the algorithm
+    Private Methods:
+    """
+
+    def __init__(self,
+                 images: List[MaskedImage],
+                 max_it: int = 100,
+                 tol: float = 1e-3,
+                 tol_bregman: float = 5e-2,
+                 verbose: bool = False) -> None:
+        if len({image.get_image().shape for image in images}) > 1:
+            raise ValueError("All images of a batch should have the same size")
+
+        # Save parameters
+        self.__max_it: int = max_it
+        self.__tol: float = tol
+        self.__tol_bregman: float = tol_bregman
+        self.__verbose: bool = verbose
+
+        # Set the stacked corrupt images, and the observed entries of every image used by the Algorithm
+        self.__images: List[MaskedImage] = list(images)
+        self.__Z_corrupt: np.ndarray = np.stack([image.get_image_masked() for image in images])
+        self.__Y_corrupt: List[np.ndarray] = [image.restrict(Z) for image, Z in zip(images, self.__Z_corrupt)]
+
+    def run(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray, float]:
+        """ @public
+        Run a certain amount of iterations of the BatchAlgorithm, returns the stacked solutions,
+        the number of iterations of every image and the total time
+        """
+        images: List[MaskedImage] = self.__images
+        Y_corrupt_copy: List[np.ndarray] = [Y.copy() for Y in self.__Y_corrupt]
+        # One gradient per image, zero outside of its observed pixels, which extend leaves untouched
+        gradients: np.ndarray = np.zeros_like(self.__Z_corrupt)
+
+        def LgradhL(Z: np.ndarray, active: np.ndarray) -> np.ndarray:
+            for i, b in enumerate(active):
+                images[b].extend(np.subtract(images[b].restrict(Z[i]), Y_corrupt_copy[b]), out=gradients[b])
+            return gradients[active]
+
+        def bregman_update(Z: np.ndarray, indices: np.ndarray) -> None:
+            for i, b in enumerate(indices):
+                Y_corrupt_copy[b] += rho * (self.__Y_corrupt[b] - images[b].restrict(Z[i]))
+
+        algo = BatchAlgorithm(proxf=lambda Z, r: unfold_batch(svd_shrink_batch(fold_batch(Z, axis=0), r), axis=0),
+                              proxg=lambda Z, r: unfold_batch(svd_shrink_batch(fold_batch(Z, axis=1), r), axis=1),
+                              LgradhL=LgradhL,
+                              update_LgradhL=bregman_update,
+                              Z_init=self.__Z_corrupt,
+                              lamb=lamb,
+                              rho=rho,
+                              beta=1,
+                              alpha_static=alpha_static)
+
+        start = time()
+
+        iterations, solutions = algo.run(self.__max_it, self.__tol, self.__tol_bregman if bregman else 0,
+                                         self.__verbose)
+
+        return solutions, iterations, time() - start
+
+
+def fold_batch(Z: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Transforms a (B, N, M, 3) stack to a (B, N, 3*M) or (B, 3*N, M) stack, as fold does per image
+    Reverses unfold_batch
+    """
+    (a, b) = (1, 3) if axis == 0 else (3, 1)
+    B, N, M, _ = Z.shape
+    return Z.transpose(0, 3, 2, 1).reshape(B, M * b, N * a).transpose(0, 2, 1)
+
+
+def unfold_batch(Z: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Transforms a (B, N, 3*M) or (B, 3*N, M) stack to a (B, N, M, 3) stack, as unfold does per image
+    Reverses fold_batch
+    """
+    (a, b) = (1, 3) if axis == 0 else (3, 1)
+    B, N, M = Z.shape[0], Z.shape[1] // a, Z.shape[2] // b
+    return Z.transpose(0, 2, 1).reshape(B, 3, M, N).transpose(0, 3, 2, 1)
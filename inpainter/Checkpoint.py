@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Checkpoint.py - Implements the Checkpoint Class, which saves the state of a run of the Algorithm so
+                that it can be resumed
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import glob
+import os
+import tempfile
+from typing import Dict, Optional
+
+# External Imports
+import numpy as np
+
+
+class Checkpoint:
+    """
+    Periodically saves the minimal state of a run of the Algorithm to a single uncompressed .npz file,
+    namely the iteration reached, the actual iterate, the previous one if the iterations are inertial,
+    and the arrays modified in place by the operators, such as the Bregman state. Writes go to a
+    temporary file which is synced and renamed over the checkpoint, so a run killed while saving
+    leaves the previous checkpoint intact. The file also holds the key of the problem solved, so that
+    a checkpoint is only resumed by the same problem. It is removed once the run completes, together
+    with the temporary files of writes killed midway.
+    Parameters:
+        path                  Path of the checkpoint file
+        every                 Saves the state every this many iterations, 0 to only resume (Default: 10)
+    Public Methods:
+        due                   Whether the state should be saved after an iteration
+        save                  Saves the state atomically
+        load                  Returns the saved state, if any
+        clear                 Removes the checkpoint file
+    Private Methods:
+        prefix                Returns the prefix of the temporary files
+    """
+
+    def __init__(self, path: str, every: int = 10) -> None:
+        if every < 0:
+            raise ValueError("The interval of the checkpoints should be non-negative")
+        self.path: str = path
+        self.every: int = every
+        self.saves: int = 0
+
+    def __prefix(self) -> str:
+        """ @private
+        Returns the prefix of the temporary files of the checkpoint
+        """
+        return f".{os.path.basename(self.path)}."
+
+    def due(self, k: int) -> bool:
+        """ @public
+        Whether the state should be saved after iteration k
+        """
+        return self.every > 0 and (k + 1) % self.every == 0
+
+    def save(self, key: str, iteration: int, arrays: Dict[str, np.ndarray]) -> None:
+        """ @public
+        Saves the arrays of the state reached after iteration - 1 atomically, with the key of the problem
+        """
+        directory: str = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(prefix=self.__prefix(), suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(file, key=np.array(key), iteration=np.array(iteration), **arrays)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.saves += 1
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """ @public
+        Returns the saved arrays, with the iteration to resume from as "iteration", or None if there
+        is no checkpoint. A checkpoint of another problem than key raises a ValueError.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path) as data:
+            if str(data["key"]) != key:
+                raise ValueError(f"The checkpoint {self.path} was saved by another problem or parameters")
+            return {name: data[name] for name in data.files if name != "key"}
+
+    def clear(self) -> None:
+        """ @public
+        Removes the checkpoint file, if any, and the temporary files left by killed writes
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        directory: str = os.path.dirname(os.path.abspath(self.path))
+        for temporary in glob.glob(os.path.join(directory, f"{self.__prefix()}*.tmp")):
+            os.remove(temporary)
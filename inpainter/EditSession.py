@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+EditSession.py - Implements the EditSession Class, which re-inpaints an image incrementally while
+                 its mask is edited
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from time import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .Image import MaskedImage
+from .InPainter import InPainter
+from .Recorder import Recorder
+from .Shrinkage import Shrinkage
+from .TiledInPainter import blending_window
+from .masks import erase_blocks
+
+# Block (top, bottom, left, right), as fractions of the image size, see DeletedImage.add_block
+Block = Tuple[float, float, float, float]
+
+
+class EditSession:
+    """
+    Keeps the current mask and the last solution of an image whose mask is edited interactively.
+    Blocks are erased from, or restored to, the mask, and the next solve starts from the last
+    solution, its observed pixels replaced by the known ones, instead of the corrupt image. With
+    focus, only the bounding box of the pixels changed since the last solve, extended by margin
+    pixels of context, is solved, and blended into the last solution with weights decaying to zero
+    over the margin, see blending_window, so small edits cost a few iterations on a small crop.
+    Edits covering more than half the image are solved on the full image. The solves share their
+    shrinkage engines, see InPainter.get_engines, so they also start from the last ranks and subspaces.
+    Parameters:
+        image                 An instance of MaskedImage, whose image and initial mask are used
+        rho                   Value of rho of the solves (Default: 1)
+        lamb                  Value of lambda of the solves (Default: 0.5)
+        alpha_static          Whether alpha is static in the solves (Default: False)
+        bregman               Whether the solves use the Bregman update (Default: False)
+        focus                 Whether the solves after an edit only cover its neighbourhood (Default: True)
+        margin                Pixels of context around the changed pixels in a focused solve (Default: 64)
+        **options             Parameters of InPainter (max_it, tol, tol_bregman, shrinkage, ...)
+    Public Methods:
+        add_block             Erases a block from the mask
+        add_blocks            Erases a batch of blocks from the mask
+        remove_block          Restores a block of the mask
+        remove_blocks         Restores a batch of blocks of the mask
+        solve                 Inpaints the image with the current mask
+        get_mask              Returns the current mask
+        get_solution          Returns the last solution
+    Private Methods:
+        covered               Returns the pixels covered by blocks
+        edit                  Replaces the mask, tracking the changed pixels
+        region                Computes the region solved after an edit
+    """
+
+    def __init__(self,
+                 image: MaskedImage,
+                 rho: float = 1,
+                 lamb: float = 0.5,
+                 alpha_static: bool = False,
+                 bregman: bool = False,
+                 focus: bool = True,
+                 margin: int = 64,
+                 **options: Any) -> None:
+        if margin < 0:
+            raise ValueError("The margin of the focused solves should be non-negative")
+        self.__image: np.ndarray = image.get_image()
+        self.__mask: np.ndarray = image.mask
+        self.__parameters: Tuple[float, float, bool, bool] = (rho, lamb, alpha_static, bregman)
+        self.__focus: bool = focus
+        self.__margin: int = margin
+        self.__options: Dict[str, Any] = options
+        self.__solution: Optional[np.ndarray] = None
+        self.__engines: Optional[Tuple[Shrinkage, Shrinkage]] = None
+        self.__changed: np.ndarray = np.zeros(self.__mask.shape, dtype=bool)
+
+    def __covered(self, blocks: Union[np.ndarray, List[Block]]) -> np.ndarray:
+        """ @private
+        Returns the (N, M) boolean array of the pixels covered by blocks, given as in add_block
+        """
+        N, M = self.__mask.shape
+        fractions: np.ndarray = np.asarray(blocks, dtype=float).reshape(-1, 4)
+        return erase_blocks(np.ones((N, M), dtype=np.uint8), (fractions * [N, N, M, M]).astype(np.intp)) == 0
+
+    def __edit(self, mask: np.ndarray) -> None:
+        """ @private
+        Replaces the mask, adding the pixels whose observation changed to those to solve again
+        """
+        self.__changed |= mask != self.__mask
+        self.__mask = mask
+
+    def add_block(self, x: float, y: float, z: float, w: float) -> None:
+        """ @public
+        Erases a block from the mask, from rows x to y and columns z to w, as fractions of the image size
+        """
+        self.add_blocks([(x, y, z, w)])
+
+    def add_blocks(self, blocks: Union[np.ndarray, List[Block]]) -> None:
+        """ @public
+        Erases a batch of blocks from the mask, every block being given as in add_block
+        """
+        self.__edit(np.where(self.__covered(blocks), 0, self.__mask).astype(self.__mask.dtype, copy=False))
+
+    def remove_block(self, x: float, y: float, z: float, w: float) -> None:
+        """ @public
+        Restores a block of the mask, given as in add_block, its pixels being observed again
+        """
+        self.remove_blocks([(x, y, z, w)])
+
+    def remove_blocks(self, blocks: Union[np.ndarray, List[Block]]) -> None:
+        """ @public
+        Restores a batch of blocks of the mask, every block being given as in add_block
+        """
+        self.__edit(np.where(self.__covered(blocks), 1, self.__mask).astype(self.__mask.dtype, copy=False))
+
+    def __region(self) -> Tuple[int, int, int, int]:
+        """ @private
+        Computes the region (top, bottom, left, right) solved after an edit, the bounding box of the
+        changed pixels extended by the margin, or the full image if it covers more than half of it
+        """
+        N, M = self.__mask.shape
+        rows: np.ndarray = np.flatnonzero(self.__changed.any(axis=1))
+        cols: np.ndarray = np.flatnonzero(self.__changed.any(axis=0))
+        if not self.__focus or rows.size == 0:
+            return 0, N, 0, M
+        region: Tuple[int, int, int, int] = (max(rows[0] - self.__margin, 0), min(rows[-1] + 1 + self.__margin, N),
+                                             max(cols[0] - self.__margin, 0), min(cols[-1] + 1 + self.__margin, M))
+        if (region[1] - region[0]) * (region[3] - region[2]) > N * M / 2:
+            return 0, N, 0, M
+        return region
+
+    def solve(self) -> Tuple[np.ndarray, int, float]:
+        """ @public
+        Inpaints the image with the current mask, returns the solution, the number of iterations and
+        the time. The first solve starts from the corrupt image, the next ones from the last solution,
+        on the neighbourhood of the edits with focus. Without edits since the last solve, the last
+        solution is returned without any iteration.
+        """
+        start = time()
+        if self.__solution is not None and not self.__changed.any():
+            return self.__solution.copy(), 0, time() - start
+        N, M = self.__mask.shape
+        i0, i1, j0, j1 = self.__region() if self.__solution is not None else (0, N, 0, M)
+        image: MaskedImage = MaskedImage.from_arrays(self.__image[i0:i1, j0:j1], self.__mask[i0:i1, j0:j1])
+
+        Z_init: Optional[np.ndarray] = None
+        if self.__solution is not None:
+            Z_init = image.get_image_masked() + (1 - image.mask[..., None]) * self.__solution[i0:i1, j0:j1]
+        painter: InPainter = InPainter(image, engines=self.__engines, **self.__options)
+        solution, its, _, _ = painter.run(*self.__parameters, recorder=Recorder(every=0), Z_init=Z_init)
+        self.__engines = painter.get_engines()
+
+        if (i0, i1, j0, j1) == (0, N, 0, M):
+            self.__solution = solution
+        else:
+            window: np.ndarray = np.outer(blending_window(i0, i1, N, self.__margin),
+                                          blending_window(j0, j1, M, self.__margin))[..., None]
+            self.__solution[i0:i1, j0:j1] += window * (solution - self.__solution[i0:i1, j0:j1])
+        self.__changed[...] = False
+        return self.__solution.copy(), its, time() - start
+
+    def get_mask(self) -> np.ndarray:
+        """ @public
+        Returns the current (N, M) mask, 1 for the observed pixels
+        """
+        return self.__mask.copy()
+
+    def get_solution(self) -> Optional[np.ndarray]:
+        """ @public
+        Returns the last solution, None before the first solve
+        """
+        return None if self.__solution is None else self.__solution.copy()
@@ -5,34 +5,62 @@ Experiment.py - Implements certain experiments to select the parameters
 ~ Daniel Cortild, 26 November 2022
 """
 
+# Standard Imports
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
 # External Imports
 import numpy as np
-import matplotlib.pyplot as plt     # type: ignore
-import time
-from tqdm.auto import trange        # type: ignore
-from tabulate import tabulate       # type: ignore
-from typing import List, Tuple
 
 # Internal Imports
+from .lazy import pyplot, tabulate, tqdm
 from .InPainter import InPainter
-from .Image import MaskedImage
+from .Image import Image, MaskedImage
+from .Recorder import Recorder
+from .SolveCache import SolveCache
+
+# Environment variables limiting the threads of the BLAS libraries
+BLAS_THREAD_VARIABLES: List[str] = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                                    "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+# Image and pixel priorities of the running experiment, in the current process
+_shared: Dict[str, np.ndarray] = {}
+_memories: List[SharedMemory] = []
 
 
 class Experiment:
     """
     Creates a Experiment which allows to select a specific parameter for the Algorithm described.
+    The image is decoded once, and the masks of every run are obtained by erasing the pixels of
+    lowest priority in a single random permutation, so all runs share the same mask for a given ratio.
+    With workers > 0, the runs are spread over a process pool, the image and priorities being
+    published once through shared memory, and every worker limited to blas_threads BLAS threads.
+    With a cache directory, the runs are looked up in a SolveCache shared by the workers, so running
+    the experiment again with a few new values only solves those. The random permutation should then
+    be seeded, for the masks to be the same from one experiment to the next.
     Parameters:
         var_list              List of variables to test against others fixed
+        workers               Number of worker processes, 0 to run sequentially (Default: 0)
+        blas_threads          Number of BLAS threads of every worker (Default: 1)
+        cache                 Directory of the SolveCache, None to disable it (Default: None)
+        seed                  Seed of the random permutation of the masks (Default: None)
     Public Methods:
         run                   Runs the experiment 
     Private Methods:
-        run_single            Runs a single time the algorithm
+        parameters            Returns the ratio, rho and lambda of a single run
         run                   Runs all the algorithms
+        run_parallel          Runs all the algorithms in a process pool
         plot                  Plot the number of iterations and the time taken
         print                 Print the number of iterations and the time taken
     """
     
-    def __init__(self, var_list: List[float]) -> None:
+    def __init__(self, var_list: List[float], workers: int = 0, blas_threads: int = 1,
+                 cache: Optional[str] = None, seed: Optional[int] = None) -> None:
         # Define the experiment parameters
         self.var_list: List[float] = var_list
         self.var_name: str = ""
@@ -41,44 +69,76 @@ class Experiment:
         self.ratio: float = 0.5
         self.legend_loc: int = 1
         self.plot_min = True
+        self.image_string: str = "Houses.jpeg"
+        self.image_size: Tuple[int, int] = (512, 512)
+        self.workers: int = workers
+        self.blas_threads: int = blas_threads
+        self.cache: Optional[str] = cache
+        self.seed: Optional[int] = seed
 
-    def __run_single(self, i: int, alpha_static: bool, max_it: int, tol: float) -> Tuple[int, float]:
+    def __parameters(self, i: int) -> Tuple[float, float, float]:
         """ @private
-        Runs a single time the algorithm
+        Returns the ratio, rho and lambda of the i-th run
         """
         var: float = self.var_list[i]
-        
-        if self.var_name == "ratio":
-            self.ratio = var
-        if self.var_name == "rho":
-            self.rho = var
-            
-        Img: MaskedImage = MaskedImage(image_string="Houses.jpeg", image_size=(512, 512), erase_ratio=self.ratio)
-        start: float = time.time()
-        IP: InPainter = InPainter(Img, max_it, tol, verbose=False)
-        its: int = IP.run(rho=self.rho, lamb=self.lamb, alpha_static=alpha_static)[1]
-        times: float = time.time() - start
-        return its, times
-    
+        return (var if self.var_name == "ratio" else self.ratio,
+                var if self.var_name == "rho" else self.rho,
+                var if self.var_name == "lambda" else self.lamb)
+
     def __run(self, max_it: int, tol: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """ @private
         Runs all the algorithms
         """
-        its_list_static: np.ndarray = np.zeros_like(self.var_list)
-        time_list_static: np.ndarray = np.zeros_like(self.var_list)
-        its_list_inertial: np.ndarray = np.zeros_like(self.var_list)
-        time_list_inertial: np.ndarray = np.zeros_like(self.var_list)
-        
-        # Run the Static Algorithm for every value of rho
-        for i in trange(len(self.var_list), unit=f"Value of {self.var_name}", desc="Static Alpha", leave=False):
-            its_list_static[i], time_list_static[i] = self.__run_single(i, True, max_it, tol)
-        
-        # Run the Inertial Algorithm for every value of rho
-        for i in trange(len(self.var_list), unit=f"Value of {self.var_name}", desc="Inertial Alpha", leave=False):
-            its_list_inertial[i], time_list_inertial[i] = self.__run_single(i, False, max_it, tol)
-            
-        # Return the number of iterations per value of rho
-        return its_list_static, its_list_inertial, time_list_static, time_list_inertial
+        image: np.ndarray = Image(self.image_string, self.image_size).get_image()
+        permutation = np.random.permutation if self.seed is None else np.random.default_rng(self.seed).permutation
+        priority: np.ndarray = permutation(image.shape[0] * image.shape[1]).reshape(image.shape[:2])
+        jobs: List[Tuple[float, float, float, bool, int, float, Optional[str]]] = \
+            [(*self.__parameters(i), alpha_static, max_it, tol, self.cache)
+             for alpha_static in (True, False) for i in range(len(self.var_list))]
+
+        if self.workers > 0:
+            results: List[Tuple[int, float]] = self.__run_parallel(image, priority, jobs)
+        else:
+            _shared.update(image=image, priority=priority)
+            try:
+                results = [run_single(job) for job in tqdm(jobs, unit="Run", leave=False)]
+            finally:
+                _shared.clear()
+
+        # Return the number of iterations and times per value of the variable
+        its, times = np.array(results, dtype=float).T.reshape(2, 2, len(self.var_list))
+        return its[0], its[1], times[0], times[1]
+
+    def __run_parallel(self, image: np.ndarray, priority: np.ndarray,
+                       jobs: List[Tuple[float, float, float, bool, int, float, Optional[str]]]) \
+            -> List[Tuple[int, float]]:
+        """ @private
+        Runs all the algorithms in a pool of spawned processes, sharing the image and priorities
+        """
+        memories: List[SharedMemory] = []
+        previous: Dict[str, Optional[str]] = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+        try:
+            arrays: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+            for key, array in (("image", image), ("priority", priority)):
+                memory: SharedMemory = SharedMemory(create=True, size=array.nbytes)
+                memories.append(memory)
+                np.ndarray(array.shape, array.dtype, buffer=memory.buf)[...] = array
+                arrays[key] = (memory.name, array.shape, array.dtype.str)
+
+            # Spawned workers inherit the environment, and read it when loading their BLAS library
+            os.environ.update({name: str(self.blas_threads) for name in BLAS_THREAD_VARIABLES})
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=attach_shared, initargs=(arrays,)) as pool:
+                return list(tqdm(pool.map(run_single, jobs), total=len(jobs), unit="Run", leave=False))
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            for memory in memories:
+                memory.close()
+                memory.unlink()
     
     def __plot(self, 
                its_static: np.ndarray, 
@@ -92,6 +152,7 @@ class Experiment:
         Plot the number of iterations and the time taken
         """
         # General Figure
+        plt = pyplot()
         fig, axs = plt.subplots(1, 2, figsize=(12, 4), dpi=300)
         fig.suptitle(title, fontsize=16, y=1.04)
         
@@ -145,6 +206,10 @@ class ExperimentRho (Experiment):
         var_list              List of rhos to test against others fixed
         lamb                  Fixed value of lambda
         ratio                 Fixed value of ratio
+        workers               Number of worker processes, 0 to run sequentially
+        blas_threads          Number of BLAS threads of every worker
+        cache                 Directory of the SolveCache, None to disable it
+        seed                  Seed of the random permutation of the masks
     Public Methods:
     Protected Methods:
     Private Methods:
@@ -153,9 +218,13 @@ class ExperimentRho (Experiment):
     def __init__(self,
                  var_list: List[float],
                  lamb: float = 1,
-                 ratio: float = 0.5) -> None:
+                 ratio: float = 0.5,
+                 workers: int = 0,
+                 blas_threads: int = 1,
+                 cache: Optional[str] = None,
+                 seed: Optional[int] = None) -> None:
         # Define the experiment parameters
-        super().__init__(var_list)
+        super().__init__(var_list, workers, blas_threads, cache, seed)
         self.lamb: float = lamb
         self.ratio: float = ratio
         
@@ -172,6 +241,10 @@ class ExperimentRatio (Experiment):
         var_list              List of ratios to test against others fixed
         lamb                  Fixed value of lambda
         rho                   Fixed value of rho
+        workers               Number of worker processes, 0 to run sequentially
+        blas_threads          Number of BLAS threads of every worker
+        cache                 Directory of the SolveCache, None to disable it
+        seed                  Seed of the random permutation of the masks
     Public Methods:
     Protected Methods:
     Private Methods:
@@ -180,9 +253,13 @@ class ExperimentRatio (Experiment):
     def __init__(self,
                  var_list: List[float],
                  lamb: float = 1,
-                 rho: float = 1) -> None:
+                 rho: float = 1,
+                 workers: int = 0,
+                 blas_threads: int = 1,
+                 cache: Optional[str] = None,
+                 seed: Optional[int] = None) -> None:
         # Define the experiment
-        super().__init__(var_list)
+        super().__init__(var_list, workers, blas_threads, cache, seed)
         self.lamb: float = lamb
         self.rho: float = rho
         
@@ -199,6 +276,10 @@ class ExperimentLambda (Experiment):
         var_list              List of lambdas to test against others fixed
         ratio                 Fixed value of ratio
         rho                   Fixed value of rho
+        workers               Number of worker processes, 0 to run sequentially
+        blas_threads          Number of BLAS threads of every worker
+        cache                 Directory of the SolveCache, None to disable it
+        seed                  Seed of the random permutation of the masks
     Public Methods:
     Protected Methods:
     Private Methods:
@@ -207,9 +288,13 @@ class ExperimentLambda (Experiment):
     def __init__(self,
                  var_list: List[float],
                  ratio: float = 1,
-                 rho: float = 1) -> None:
+                 rho: float = 1,
+                 workers: int = 0,
+                 blas_threads: int = 1,
+                 cache: Optional[str] = None,
+                 seed: Optional[int] = None) -> None:
         # Define the experiment
-        super().__init__(var_list)
+        super().__init__(var_list, workers, blas_threads, cache, seed)
         self.ratio: float = ratio
         self.rho: float = rho
         
@@ -217,3 +302,46 @@ class ExperimentLambda (Experiment):
         self.var_name: str = "lambda"
         self.legend_loc: int = 2
         self.plot_min = True
+
+
+def attach_memory(name: str) -> SharedMemory:
+    """
+    Attaches to the shared memory segment name without registering it with the resource tracker, as
+    track=False does from Python 3.13. The segment belongs to the parent, which unlinks it, so a worker
+    tracking it could unlink it, or warn about its leak, when exiting. Unregistering it afterwards
+    would not do, as spawned workers share the tracker of the parent, whose registration it would drop.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach_shared(arrays: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> None:
+    """
+    Initialises a worker process by attaching to the shared image and priorities, given as
+    a dictionary of (shared memory name, shape, dtype)
+    """
+    for key, (name, shape, dtype) in arrays.items():
+        memory: SharedMemory = attach_memory(name)
+        _shared[key] = np.ndarray(shape, np.dtype(dtype), buffer=memory.buf)
+        _memories.append(memory)
+
+
+def run_single(job: Tuple[float, float, float, bool, int, float, Optional[str]]) -> Tuple[int, float]:
+    """
+    Runs a single time the algorithm given (ratio, rho, lambda, alpha_static, max_it, tol, cache), on the
+    image of the running experiment, returns the number of iterations and the time taken, which is
+    that of the first run if it comes from the cache
+    """
+    ratio, rho, lamb, alpha_static, max_it, tol, cache = job
+    image: np.ndarray = _shared["image"]
+    mask: np.ndarray = (_shared["priority"] >= int(_shared["priority"].size * ratio)).astype(int)
+    Img: MaskedImage = MaskedImage.from_arrays(image, mask)
+    IP: InPainter = InPainter(Img, max_it, tol, verbose=False, cache=SolveCache(cache) if cache else None)
+    _, its, times, _ = IP.run(rho=rho, lamb=lamb, alpha_static=alpha_static, recorder=Recorder(every=0))
+    return its, times
@@ -6,10 +6,13 @@ Image.py - Implements an Image Class
 """
 
 # External Imports
-from PIL import Image as ImagePIL     # type: ignore
 import numpy as np
-import matplotlib.pyplot as plt       # type: ignore
-from typing import Tuple, Any, Union
+from numpy.typing import DTypeLike
+from typing import Tuple, Any, Union, List, Optional
+
+# Internal Imports
+from .lazy import pyplot
+from .masks import Seed, random_pixels, erase_blocks
 
 
 class Image:
@@ -19,8 +22,9 @@ class Image:
     Parameters:
         image                 Name of image, located in the same directory as code file
         ratio                 The ratio, between 0 and 1, of pixels to delete using the mask
-        resize                If contains values, should contain a pair of integers, size
-                              to which the image should be resize (Default: False)
+        image_dims            Pair of integers, size to which the image should be resized, or None
+                              to keep its full resolution (Default: (256, 256))
+        dtype                 Floating point type of the image, and so of the solver (Default: np.float64)
     Public Methods:
         mask_image            Masks an image according to the created mask
         get_image_masked      Get the masked image
@@ -32,17 +36,22 @@ class Image:
     
     def __init__(self, 
                  image_string: str,
-                 image_dims: Tuple[int, int] = (256, 256)) -> None:
+                 image_dims: Optional[Tuple[int, int]] = (256, 256),
+                 dtype: DTypeLike = np.float64) -> None:
         self.image_dims = image_dims
-        self.__load_image(image_string, image_dims)
+        self.__load_image(image_string, image_dims, dtype)
 
-    def __load_image(self, image_string: str, image_dims: Tuple[int, int]) -> None:
+    def __load_image(self, image_string: str, image_dims: Optional[Tuple[int, int]], dtype: DTypeLike) -> None:
         """ @private
-        Loads the image
+        Loads the image, at its full resolution if image_dims is None
         """
+        from PIL import Image as ImagePIL     # type: ignore
         self.image: Any = ImagePIL.open(image_string)
-        self.image = self.image.resize(image_dims)
-        self.image = np.asarray(self.image, dtype=np.float64) / 255
+        if image_dims is not None:
+            self.image = self.image.resize(image_dims)
+        self.image = np.asarray(self.image, dtype=dtype) / 255
+        if image_dims is None:
+            self.image_dims = self.image.shape[:2]
 
     def get_dimensions(self):
         """ @public
@@ -60,6 +69,7 @@ class Image:
         """
         Prints the image to the console
         """
+        plt = pyplot()
         fig, axs = plt.subplots(1, 1, figsize=(8, 8), dpi=600)
         axs.title.set_text("Original Image")
         axs.imshow(self.image, vmin=0, vmax=1)
@@ -71,39 +81,134 @@ class Image:
 class MaskedImage (Image):
     """
     Creates a mask and methods to mask images, as well as getting the specific mask
+    The mask is stored as a packed bitmask, together with the flat indices of the observed pixels, so
+    the masking operator and its adjoint only touch the observed entries.
     Parameters:
+        image_string                Name of image, located in the same directory as code file
+        image_size                  Size to which the image should be resized, or None to keep it
+        erase_ratio                 The ratio, between 0 and 1, of pixels to erase
+        dtype                       Floating point type of the image (Default: np.float64)
+        seed                        Seed or generator of the erased pixels, see masks.make_rng (Default: None)
+    Properties:
+        mask                        The (N, M) mask, 1 for the observed pixels, unpacked on access and
+                                    read-only, an edited copy being assigned back or given to update_mask
     Public Methods:
+        from_arrays                 Creates a masked image from an image array and a mask
         mask_image                  Applies the mask to an image
+        restrict                    Returns the observed entries of an image
+        extend                      Scatters observed entries into an image, adjoint of restrict
         get_image_masked            Returns the masked image
+        update_mask                 Replaces the mask and masks the image again
+        save_mask                   Saves the mask to a packed file, see masks.load_mask
         show                        Outputs the original and masked image
     Private Methods:
         create_mask                 Creates the mask to be applied
+        get_observed_F              Returns the indices of the observed pixels in Fortran order
     """
 
-    def __init__(self, image_string: str, image_size: Tuple[int, int] = (0, 0), erase_ratio: float = 0.5) -> None:
-        super().__init__(image_string, image_size)
+    def __init__(self, image_string: str, image_size: Optional[Tuple[int, int]] = (0, 0), erase_ratio: float = 0.5,
+                 dtype: DTypeLike = np.float64, seed: Seed = None) -> None:
+        super().__init__(image_string, image_size, dtype)
         self.__erase_ratio: float = erase_ratio
-        self.create_mask()
+        self.create_mask(seed)
         self.image_masked: np.ndarray = self.mask_image(self.get_image())
 
-    def create_mask(self) -> np.ndarray:
+    @classmethod
+    def from_arrays(cls, image: np.ndarray, mask: np.ndarray) -> "MaskedImage":
+        """ @public
+        Creates a masked image from an (N, M, 3) image array and an (N, M) mask, without any file
+        """
+        masked: MaskedImage = cls.__new__(cls)
+        masked.image = image
+        masked.image_dims = image.shape[:2]
+        masked.mask = mask
+        masked.__erase_ratio = 1 - float(np.mean(mask))
+        masked.image_masked = masked.mask_image(image)
+        return masked
+
+    @property
+    def mask(self) -> np.ndarray:
+        """ @public
+        Returns the (N, M) mask, 1 for the observed pixels, unpacked from the bitmask. The returned
+        array is read-only, as it is not stored: a modified copy should be assigned back to mask.
+        """
+        mask: np.ndarray = np.unpackbits(self.__packed_mask, count=int(np.prod(self.__mask_shape)))
+        mask.setflags(write=False)
+        return mask.reshape(self.__mask_shape)
+
+    @mask.setter
+    def mask(self, mask: np.ndarray) -> None:
+        """ @public
+        Stores a mask as a packed bitmask and the indices of its observed pixels
+        """
+        observed: np.ndarray = np.asarray(mask) != 0
+        self.__mask_shape: Tuple[int, int] = observed.shape
+        self.__packed_mask: np.ndarray = np.packbits(observed, axis=None)
+        index_type = np.int32 if observed.size < np.iinfo(np.int32).max else np.intp
+        self.__observed: np.ndarray = np.flatnonzero(observed).astype(index_type)
+        self.__observed_F: Optional[np.ndarray] = None
+
+    def update_mask(self, mask: np.ndarray) -> None:
+        """ @public
+        Replaces the mask by an edited one, such as a copy of mask with pixels set to 0, repacking its bits,
+        rebuilding the indices of the observed pixels and masking the image again
+        """
+        self.mask = mask
+        self.image_masked = self.mask_image(self.get_image())
+
+    def create_mask(self, seed: Seed = None) -> None:
         """ @private
-        Create the mask
+        Create the mask, erasing pixels drawn at random
         """
-        dimensions: List[int] = self.get_dimensions()
-        total_pixels: int = np.prod(dimensions)
-        mask_size: int = int(total_pixels * self.__erase_ratio)
-        mask: np.ndarray = (np.array([0] * mask_size + [1] * (total_pixels - mask_size)))
-        np.random.shuffle(mask)
-        self.mask = mask.reshape(dimensions)
+        self.mask = random_pixels(tuple(self.get_dimensions()), self.__erase_ratio, seed)
+
+    def save_mask(self, path: str) -> None:
+        """ @public
+        Saves the mask to a compressed .npz file, to be loaded by masks.load_mask, without unpacking it
+        """
+        np.savez_compressed(path, packed=self.__packed_mask, shape=self.__mask_shape)
 
-    def mask_image(self, image: np.ndarray) -> np.ndarray:
+    def mask_image(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """ @public
         Method encoding a linear operator selecting the pixels we know to be correct.
-        Note this operator is self adjoint.
+        Note this operator is self adjoint. See extend for the use and layouts of out.
+        """
+        return self.extend(self.restrict(image), out)
+
+    def restrict(self, image: np.ndarray) -> np.ndarray:
+        """ @public
+        Returns the (K, 3) entries of an (N, M, 3) image at the K observed pixels.
+        Fortran ordered images, as produced by unfold, are read through their transpose without copy.
+        """
+        if image.flags.f_contiguous and not image.flags.c_contiguous:
+            return np.take(image.T.reshape(image.shape[-1], -1), self.__get_observed_F(), axis=1).T
+        return np.take(image.reshape(-1, image.shape[-1]), self.__observed, axis=0)
+
+    def extend(self, values: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ @public
+        Scatters the (K, 3) entries of the observed pixels into an (N, M, 3) image, adjoint of restrict.
+        If out is given, only its observed entries are written, so it should be zero elsewhere. A Fortran
+        ordered out is written through its transpose, any other layout than C or Fortran order raises a
+        ValueError, as the entries would be written to a copy.
+        """
+        if out is None:
+            out = np.zeros((*self.__mask_shape, values.shape[-1]), dtype=values.dtype)
+        if out.flags.c_contiguous:
+            out.reshape(-1, values.shape[-1])[self.__observed] = values
+        elif out.flags.f_contiguous:
+            out.T.reshape(values.shape[-1], -1)[:, self.__get_observed_F()] = values.T
+        else:
+            raise ValueError("The output of extend should be C or Fortran contiguous")
+        return out
+
+    def __get_observed_F(self) -> np.ndarray:
+        """ @private
+        Returns the flat indices of the observed pixels in Fortran order, computed on first use
         """
-        mask_3d: np.ndarray = np.repeat(self.mask[:, :, None], 3, axis=2)
-        return np.multiply(image, mask_3d)
+        if self.__observed_F is None:
+            rows, cols = np.divmod(self.__observed, self.__mask_shape[1])
+            self.__observed_F = (cols * self.__mask_shape[0] + rows).astype(self.__observed.dtype)
+        return self.__observed_F
 
     def get_image_masked(self) -> np.ndarray:
         """ @public
@@ -121,6 +226,7 @@ class MaskedImage (Image):
         """
         Prints the image to the console
         """
+        plt = pyplot()
         fig, axs = plt.subplots(1, 2, dpi=600)
         axs[0].title.set_text("Original Image")
         axs[0].imshow(self.image, vmin=0, vmax=1)
@@ -140,6 +246,7 @@ class MaskedImage (Image):
         - The in-painted image, technically the only one accessible
         - The corrected image
         """
+        plt = pyplot()
         fig, axs = plt.subplots(1, 4 if solution2 else 3, figsize=(12, 3.3 if solution2 else 4), dpi=600)
         fig.suptitle(title, fontsize=18)
         axs[0].title.set_text("Original Image")
@@ -163,7 +270,12 @@ class DeletedImage (MaskedImage):
     Creates a mask and methods to mask images, as well as getting the specific mask
     The image has a whole deleted section, as opposed to random deleted pixels
     Parameters:
+        image_string                Name of image, located in the same directory as code file
+        image_size                  Size to which the image should be resized
+        dtype                       Floating point type of the image (Default: np.float64)
     Public Methods:
+        add_block                   Erases a block from the mask
+        add_blocks                  Erases a batch of blocks from the mask
         mask_image                  Applies the mask to an image
         get_image_masked            Returns the masked image
         show                        Outputs the original and masked image
@@ -172,25 +284,34 @@ class DeletedImage (MaskedImage):
     """
 
     def __init__(self, image_string: str, 
-                 image_size: Tuple[int, int] = (0, 0)) -> None:
-        super().__init__(image_string, image_size, 0)
+                 image_size: Tuple[int, int] = (0, 0),
+                 dtype: DTypeLike = np.float64) -> None:
+        super().__init__(image_string, image_size, 0, dtype)
         self.__erase_ratio: float = 0
         self.create_mask()
         self.image_masked: np.ndarray = self.mask_image(self.get_image())
 
     def add_block(self, x: float, y: float, z: float, w: float) -> None:
         """ @public
-        Adds a block to the mask
+        Adds a block to the mask, from rows x to y and columns z to w, as fractions of the image size
         """
-        dimensions: List[int] = self.get_dimensions()
-        M, N = dimensions
-        self.mask[int(x*M):int(y*M), int(z*N):int(w*N)] = np.zeros_like(self.mask[int(x*M):int(y*M), int(z*N):int(w*N)])
-        self.image_masked: np.ndarray = self.mask_image(self.get_image())
-        
-    def create_mask(self) -> np.ndarray:
+        self.add_blocks([(x, y, z, w)])
+
+    def add_blocks(self, blocks: Union[np.ndarray, List[Tuple[float, float, float, float]]]) -> None:
+        """ @public
+        Adds a batch of blocks to the mask, every block being given as in add_block. The mask is
+        updated once, and only the newly erased pixels of the masked image are cleared.
+        """
+        M, N = self.get_dimensions()
+        fractions: np.ndarray = np.asarray(blocks, dtype=float).reshape(-1, 4)
+        mask: np.ndarray = erase_blocks(self.mask, (fractions * [M, M, N, N]).astype(np.intp))
+        self.mask = mask
+        self.image_masked[mask == 0] = 0
+
+    def create_mask(self, seed: Seed = None) -> None:
         """ @private
         Create the mask
         """
         dimensions: List[int] = self.get_dimensions()
         M, N = dimensions
-        self.mask: np.ndarray = np.zeros((M, N)) + 1
\ No newline at end of file
+        self.mask = np.ones((M, N))
\ No newline at end of file
@@ -9,20 +9,22 @@ InPainter.py - Implements the InPainter Class, which solves the InPainting probl
 # Standard Imports
 import warnings
 from time import time
-from typing import Callable, Tuple
+from typing import Any, Callable, Dict, Generator, Optional, Tuple
 
 # External Imports
 import numpy as np
-import scipy as sp
-import scipy.linalg
-import matplotlib.pyplot as plt
+from numpy.typing import DTypeLike
 
 # Internal Imports
-from .types import HistoryDict
+from .Recorder import Recorder
+from .Profiler import Profiler
+from .SolveCache import SolveCache
+from .Checkpoint import Checkpoint
 from .Image import MaskedImage
 from .Algorithm import Algorithm
-
-plt.rcParams.update({'axes.facecolor': 'white'})
+from .LowRank import LowRank
+from .Shrinkage import Shrinkage, SHRINKAGE_ENGINES, svd_shrink, tsvd_shrink, make_shrinkage
+from .types import ProgressDict
 
 
 class InPainter:
@@ -34,9 +36,32 @@ class InPainter:
         alpha_static          Whether alpha is static or not (Default: True)
         lamb                  Value of lambda in (0,1) (Default: 0.5)
         rho                   Value of rho in (0,2) (Default: 1)
+        shrinkage             Name of the shrinkage engine, see SHRINKAGE_ENGINES (Default: "exact")
+        shrinkage_tol         Tolerance of the partial shrinkage engines (Default: 1e-4)
+        regularizer           Regularizers f and g, "unfold" for the nuclear norms of the two unfoldings,
+                              or "tsvd" for the tensor nuclear norm of the t-SVD (Default: "unfold")
+        anderson              Memory of the Anderson acceleration, 0 to disable it (Default: 0)
+        anderson_type         Type (1 or 2) of the Anderson acceleration (Default: 2)
+        dtype                 Floating point type of the solver, np.float32 halving the memory and using
+                              single precision LAPACK, the initial guesses being cast to it
+                              (Default: None, the type of the image)
+        cache                 SolveCache in which the solutions are stored, and looked up for the runs
+                              whose recorder records no iteration, see Recorder.records (Default: None)
+        factored              Whether the outputs of the proximal operators are kept as low-rank factors,
+                              only materialised in the Fortran ordered buffers of the Algorithm, which
+                              avoids the copies of the unfoldings, see LowRank. The runs then only accept
+                              recorders of no iteration, such as Recorder(every=0) (Default: False)
+        engines               Shrinkage engines of the two unfoldings, of the shrinkage method, such as those
+                              of another InPainter, see get_engines (Default: None, new engines)
+    The engines are kept across the runs, so that the partial engines start every run from the rank,
+    and for SubspaceShrinkage the subspace, tracked by the previous one: a sweep over the parameters,
+    or a sequence of InPainters sharing their engines, is warm started.
     Public Methods:
         run                   Runs the algorithm
+        stream                Runs the algorithm as a generator of progress records
+        get_engines           Returns the shrinkage engines of the two unfoldings
     Private Methods:
+        cache_key             Computes the key of a run in the cache, or of its checkpoints
     """
 
     def __init__(self,
@@ -44,45 +69,197 @@ class InPainter:
                  max_it: int = 100,
                  tol: float = 1e-3,
                  tol_bregman: float = 5e-2,
-                 verbose: bool = False) -> None:
+                 verbose: bool = False,
+                 shrinkage: str = "exact",
+                 shrinkage_tol: float = 1e-4,
+                 regularizer: str = "unfold",
+                 anderson: int = 0,
+                 anderson_type: int = 2,
+                 dtype: Optional[DTypeLike] = None,
+                 cache: Optional[SolveCache] = None,
+                 factored: bool = False,
+                 engines: Optional[Tuple[Shrinkage, Shrinkage]] = None) -> None:
+        if regularizer not in ("unfold", "tsvd"):
+            raise ValueError(f"Unknown regularizer '{regularizer}', expected 'unfold' or 'tsvd'")
+        if factored and regularizer != "unfold":
+            raise ValueError("Only the proximal operators of the 'unfold' regularizer can be factored")
         # Save parameters
         self.__image = image
         self.__max_it: int = max_it
         self.__tol: float = tol
         self.__tol_bregman: float = tol_bregman
         self.__verbose: bool = verbose
+        self.__shrinkage: str = shrinkage
+        self.__shrinkage_tol: float = shrinkage_tol
+        self.__regularizer: str = regularizer
+        self.__anderson: int = anderson
+        self.__anderson_type: int = anderson_type
+        self.__cache: Optional[SolveCache] = cache
+        self.__factored: bool = factored
+        self.__digest: Optional[str] = None
 
-        # Set methods to be used in the Algorithm
-        self.__A: Callable[[np.ndarray], np.ndarray] = image.mask_image
+        # One engine per unfolding, as the engines track the rank of their unfolding
+        if engines is None:
+            engines = (make_shrinkage(shrinkage, tol=shrinkage_tol), make_shrinkage(shrinkage, tol=shrinkage_tol))
+        elif any(type(engine) is not SHRINKAGE_ENGINES.get(shrinkage) for engine in engines):
+            raise ValueError(f"The engines should be those of the shrinkage method '{shrinkage}'")
+        self.__engines: Tuple[Shrinkage, Shrinkage] = engines
 
-        # Set the corrupt image
+        # Set the corrupt image, and its observed entries used by the Algorithm
         self.__Z_corrupt: np.ndarray = image.get_image_masked()
-        
-    def run(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False) \
-            -> Tuple[np.ndarray, int, HistoryDict]:
+        if dtype is not None:
+            self.__Z_corrupt = self.__Z_corrupt.astype(dtype, copy=False)
+        self.__dtype: np.dtype = self.__Z_corrupt.dtype
+        if factored:
+            # The Algorithm iterates in Fortran order, in which the unfoldings are views
+            self.__Z_corrupt = np.asfortranarray(self.__Z_corrupt)
+        self.__Y_corrupt: np.ndarray = image.restrict(self.__Z_corrupt)
+
+    def __cache_key(self, rho: float, lamb: float, alpha_static: bool, bregman: bool,
+                    Z_init: Optional[np.ndarray], max_it: Optional[int]) -> str:
+        """ @private
+        Computes the key of a run in the cache, the corrupt image and mask being hashed only once.
+        Without max_it, computes the key of its checkpoints, which a run with more iterations may resume.
+        """
+        if self.__digest is None:
+            self.__digest = SolveCache.key([self.__Z_corrupt, np.packbits(self.__image.mask)], {})
+        parameters = {"image": self.__digest, "max_it": max_it, "tol": self.__tol,
+                      "tol_bregman": self.__tol_bregman if bregman else 0, "shrinkage": self.__shrinkage,
+                      "shrinkage_tol": self.__shrinkage_tol, "regularizer": self.__regularizer,
+                      "anderson": self.__anderson, "anderson_type": self.__anderson_type, "factored": self.__factored,
+                      "rho": rho, "lamb": lamb, "alpha_static": alpha_static, "bregman": bregman}
+        return SolveCache.key([] if Z_init is None else [Z_init], parameters)
+
+    def run(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False,
+            recorder: Optional[Recorder] = None, Z_init: Optional[np.ndarray] = None,
+            profiler: Optional[Profiler] = None,
+            checkpoint: Optional[Checkpoint] = None) -> Tuple[np.ndarray, int, float, Recorder]:
         """ @public
-        Run a certain amount of iterations of the Algorithm
+        Run a certain amount of iterations of the Algorithm, recording the history in recorder
+        (Default: HistoryRecorder, or Recorder(every=0) if factored), starting from Z_init (Default: the
+        corrupt image).
+        The default history records every iteration at the iterates, so an inertial run applies T twice
+        per iteration, see Algorithm.stream. A run of which only the solution is needed should pass
+        Recorder(every=0), as Experiment, TiledInPainter, PyramidInPainter and EditSession do, or
+        Recorder(at_inertial=True) to record the residuals at no extra cost.
+        If a profiler is given, the phases are timed and it is available as the profiler of the history.
+        With a cache, a run already solved returns its stored solution, iterations and time if its recorder
+        records no iteration, such as Recorder(every=0), which only gets the final result. Runs with
+        the default recorder, or any recorder of iterations, are always solved, so that their history
+        does not depend on the state of the cache; their results are still stored.
+        With a checkpoint, the state of the run, including the Bregman state, is saved periodically and
+        a run killed before completion resumes from it when run again, the time then being that of the
+        resumed part only.
         """
-        self.__Z_corrupt_copy: np.ndarray = self.__Z_corrupt.copy()
+        progress = self.stream(rho, lamb, alpha_static, bregman, recorder, Z_init, profiler, checkpoint,
+                               every=0, verbose=self.__verbose)
+        while True:
+            try:
+                next(progress)
+            except StopIteration as stop:
+                return stop.value
+
+    def stream(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False,
+               recorder: Optional[Recorder] = None, Z_init: Optional[np.ndarray] = None,
+               profiler: Optional[Profiler] = None, checkpoint: Optional[Checkpoint] = None,
+               every: int = 1, interval: float = 0, preview: int = 0,
+               verbose: bool = False) -> Generator[ProgressDict, Optional[Dict[str, Any]],
+                                                   Tuple[np.ndarray, int, float, Recorder]]:
+        """ @public
+        Runs the Algorithm as run does, as a generator of progress records, see Algorithm.stream, every
+        every iterations or interval seconds, with a preview downsampled by preview if positive. The last
+        record is done and holds the solution. A dictionary sent to the generator updates "tol" or
+        "tol_bregman", or with "stop" ends the run cleanly; closing the generator abandons the run.
+        The time only counts the iterations, not the time spent by the caller between records, and a
+        run whose tolerances were changed or which was stopped is not cached.
+        The generator returns the solution, iterations, time and history, as run does.
+        """
+        if Z_init is not None:
+            # The workspace takes the type of Z_init, which should be that of the solver
+            Z_init = np.asarray(Z_init, dtype=self.__dtype)
+        key: Optional[str] = None
+        if self.__cache is not None and profiler is None:
+            key = self.__cache_key(rho, lamb, alpha_static, bregman, Z_init, self.__max_it)
+            # A cached run only has a final result, which only satisfies recorders of no iteration
+            cached: Optional[Tuple[np.ndarray, int, float]] = \
+                self.__cache.get(key) if recorder is not None and not recorder.records() else None
+            if cached is not None:
+                solution, iterations, times = cached
+                recorder.finish(iterations - 1, solution, solution)
+                yield {"iteration": iterations, "residual": np.nan, "tol": self.__tol,
+                       "preview": solution[::preview, ::preview].copy() if preview > 0 else None,
+                       "done": True, "solution": solution}
+                return solution, iterations, times, recorder
+
+        # The gradient and Bregman state only differ from zero at the observed pixels
+        image: MaskedImage = self.__image
+        Y_corrupt_copy: np.ndarray = self.__Y_corrupt.copy()
+        # C ordered, as extend scatters through a C ordered view
+        gradient: np.ndarray = np.zeros_like(self.__Z_corrupt, order='C')
+
+        def LgradhL(Z: np.ndarray) -> np.ndarray:
+            return image.extend(np.subtract(image.restrict(Z), Y_corrupt_copy), out=gradient)
 
         def bregman_update(Z: np.ndarray) -> None:
-            self.__Z_corrupt_copy += rho * (self.__Z_corrupt - self.__A(Z))
+            residual: np.ndarray = np.subtract(self.__Y_corrupt, image.restrict(Z))
+            residual *= rho
+            np.add(Y_corrupt_copy, residual, out=Y_corrupt_copy)
+
+        shrink_f, shrink_g = self.__engines
 
-        algo = Algorithm(proxf=lambda Z, r: unfold(svd_shrink(fold(Z, axis=0), r), axis=0),
-                         proxg=lambda Z, r: unfold(svd_shrink(fold(Z, axis=1), r), axis=1),
-                         LgradhL=lambda Z: self.__A(Z - self.__Z_corrupt_copy),
+        proxf: Callable[[np.ndarray, float], np.ndarray] = lambda Z, r: unfold(shrink_f(fold(Z, axis=0), r), axis=0)
+        proxg: Callable[[np.ndarray, float], np.ndarray] = lambda Z, r: unfold(shrink_g(fold(Z, axis=1), r), axis=1)
+        if self.__regularizer == "tsvd":
+            proxf = proxg = tsvd_shrink
+        elif self.__factored:
+            proxf = lambda Z, r: LowRank(*shrink_f.factorize(fold(Z, axis=0), r), axis=0, shape=Z.shape)
+            proxg = lambda Z, r: LowRank(*shrink_g.factorize(fold(Z, axis=1), r), axis=1, shape=Z.shape)
+
+        algo = Algorithm(proxf=proxf,
+                         proxg=proxg,
+                         LgradhL=LgradhL,
                          update_LgradhL=bregman_update,
-                         Z_init=self.__Z_corrupt,
+                         Z_init=Z_init if Z_init is not None else self.__Z_corrupt,
                          lamb=lamb,
                          rho=rho,
                          beta=1,
-                         alpha_static=alpha_static)
+                         alpha_static=alpha_static,
+                         anderson=self.__anderson,
+                         anderson_type=self.__anderson_type,
+                         profiler=profiler,
+                         factored=self.__factored,
+                         state={"bregman": Y_corrupt_copy})
 
-        start = time()
+        progress = algo.stream(self.__max_it, self.__tol, self.__tol_bregman if bregman else 0, verbose,
+                               recorder, checkpoint,
+                               self.__cache_key(rho, lamb, alpha_static, bregman, Z_init, None)
+                               if checkpoint is not None else "",
+                               every=every, interval=interval, preview=preview)
+        command: Optional[Dict[str, Any]] = None
+        times: float = 0
+        while True:
+            start = time()
+            try:
+                record: ProgressDict = progress.send(command)
+            except StopIteration as stop:
+                iterations, history = stop.value
+                break
+            times += time() - start
+            if record["done"] and key is not None:
+                # Cached before the last record, after which the caller may not resume the generator
+                self.__cache.put(key, record["solution"], record["iteration"], times)
+            command = yield record
+            if command:
+                key = None
 
-        iterations, history = algo.run(self.__max_it, self.__tol, self.__tol_bregman if bregman else 0, self.__verbose)
+        return history.final, iterations, times, history
 
-        return history["TZ"][-1], iterations, time() - start, history
+    def get_engines(self) -> Tuple[Shrinkage, Shrinkage]:
+        """ @public
+        Returns the shrinkage engines of the unfoldings along the first and second axis, which another
+        InPainter of the same shrinkage method may share to be warm started
+        """
+        return self.__engines
     
 #     def show(self, title: str = "") -> None:
 #         """ @public
@@ -184,13 +361,3 @@ def unfold(Z: np.ndarray, axis: int) -> np.ndarray:
     (a, b) = (1, 3) if axis == 0 else (3, 1)
     return Z.reshape(Z.shape[0] // a, Z.shape[1] // b, 3, order='F')
 
-
-def svd_shrink(matrix: np.ndarray, rho: float) -> np.ndarray:
-    """
-    Computes the shrunken SVD of a matrix
-    """
-    U: np.ndarray
-    S: np.ndarray
-    VT: np.ndarray
-    U, S, VT = sp.linalg.svd(matrix, full_matrices=False)
-    return (U * np.maximum(S - rho, 0)) @ VT
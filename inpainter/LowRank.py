@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+LowRank.py - Implements the LowRank Class, a low-rank tensor stored as the factors of an unfolding
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Optional, Tuple
+
+# External Imports
+import numpy as np
+
+
+class LowRank:
+    """
+    Low-rank (N, M, 3) tensor, as produced by a shrinkage of one of its unfoldings, see fold. The
+    unfolding along axis is stored as the product left @ right of an (N, r) or (3N, r) matrix, the
+    left singular vectors scaled by the singular values, and an (r, 3M) or (r, M) matrix, the right
+    singular vectors. The tensor is only materialised when needed, directly into a given buffer: the
+    unfoldings of a Fortran ordered buffer are views, so no copy of the tensor is made.
+    No arithmetic is done on the factors: the Algorithm materialises both proximal outputs at every
+    iteration, as proxf needs a dense Zhalf, from which the gradient, the residuals and the images by T
+    are computed. The factors only save the copies of the unfoldings around the SVDs.
+    Parameters:
+        left                  Left factor of the unfolding
+        right                 Right factor of the unfolding
+        axis                  Axis of the unfolding, see fold
+        shape                 Shape (N, M, 3) of the tensor
+    Public Methods:
+        rank                  Returns the rank of the unfolding
+        nbytes                Returns the memory of the factors
+        dense                 Materialises the tensor, in a given buffer if any
+        __array__             Materialises the tensor, for numpy functions
+    """
+
+    def __init__(self, left: np.ndarray, right: np.ndarray, axis: int, shape: Tuple[int, ...]) -> None:
+        (a, b) = (1, 3) if axis == 0 else (3, 1)
+        if left.shape[0] != shape[0] * a or right.shape[1] != shape[1] * b or left.shape[1] != right.shape[0]:
+            raise ValueError(f"Factors of shapes {left.shape} and {right.shape} do not match the unfolding "
+                             f"along axis {axis} of a tensor of shape {shape}")
+        self.left: np.ndarray = left
+        self.right: np.ndarray = right
+        self.axis: int = axis
+        self.shape: Tuple[int, ...] = tuple(shape)
+        self.dtype: np.dtype = np.result_type(left, right)
+
+    @property
+    def rank(self) -> int:
+        """ @public
+        Returns the rank of the unfolding, i.e. the number of kept singular triplets
+        """
+        return self.left.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """ @public
+        Returns the memory, in bytes, of the factors
+        """
+        return self.left.nbytes + self.right.nbytes
+
+    def dense(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ @public
+        Materialises the tensor, in out if given (Default: a new Fortran ordered array). In a Fortran
+        ordered out, the product of the factors is written directly, otherwise it is copied in.
+        """
+        (a, b) = (1, 3) if self.axis == 0 else (3, 1)
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype, order='F')
+        if out.flags.f_contiguous:
+            # The transposed product is written in the C ordered transpose of the unfolding
+            unfolding: np.ndarray = out.reshape(self.shape[0] * a, self.shape[1] * b, order='F')
+            np.matmul(self.right.T, self.left.T, out=unfolding.T)
+        else:
+            out[...] = (self.left @ self.right).reshape(self.shape, order='F')
+        return out
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """ @public
+        Materialises the tensor, so that numpy functions accept a LowRank
+        """
+        return self.dense() if dtype is None else self.dense().astype(dtype, copy=False)
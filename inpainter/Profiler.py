@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Profiler.py - Implements the Profiler Class, timing the phases of a run of the Algorithm
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import json
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .lazy import tabulate
+
+
+class Profiler:
+    """
+    Times the phases of a run of the Algorithm (proxg, proxf, LgradhL, residuals, bregman, image_T),
+    every call being stored as an event with its iteration, start and duration. The phases are timed
+    by wrapping the operators, so a run without profiler is left untouched. Phases may be nested, as
+    image_T calls the operators, so their cumulative times are inclusive.
+    Parameters:
+        None
+    Public Methods:
+        wrap                  Wraps a function so that its calls are timed as a phase
+        start_iteration       Marks the start of an iteration
+        stop                  Marks the end of the run
+        totals                Returns the cumulative time of every phase
+        counts                Returns the number of calls of every phase
+        timeline              Returns the time spent in a phase at every iteration
+        summary               Prints and returns the cumulative times and counts of the phases
+        to_chrome_trace       Writes the events as a Chrome trace, to inspect in chrome://tracing or Perfetto
+    """
+
+    def __init__(self) -> None:
+        self.iteration: int = -1
+        self.events: List[Tuple[str, int, float, float]] = []
+        self.__origin: float = perf_counter()
+        self.__iteration_start: Optional[float] = None
+
+    def wrap(self, name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """ @public
+        Returns function, with every call recorded as an event of the phase name
+        """
+        events: List[Tuple[str, int, float, float]] = self.events
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start: float = perf_counter()
+            result: Any = function(*args, **kwargs)
+            events.append((name, self.iteration, start, perf_counter() - start))
+            return result
+        return timed
+
+    def start_iteration(self, k: int) -> None:
+        """ @public
+        Marks the start of iteration k, and so the end of the previous one
+        """
+        self.stop()
+        self.iteration = k
+        self.__iteration_start = perf_counter()
+
+    def stop(self) -> None:
+        """ @public
+        Marks the end of the actual iteration, if any, which is recorded as an event of the phase iteration
+        """
+        if self.__iteration_start is not None:
+            self.events.append(("iteration", self.iteration, self.__iteration_start,
+                                perf_counter() - self.__iteration_start))
+            self.__iteration_start = None
+
+    def totals(self) -> Dict[str, float]:
+        """ @public
+        Returns the cumulative time, in seconds, of every phase
+        """
+        totals: DefaultDict[str, float] = defaultdict(float)
+        for name, _, _, duration in self.events:
+            totals[name] += duration
+        return dict(totals)
+
+    def counts(self) -> Dict[str, int]:
+        """ @public
+        Returns the number of calls of every phase
+        """
+        counts: DefaultDict[str, int] = defaultdict(int)
+        for name, _, _, _ in self.events:
+            counts[name] += 1
+        return dict(counts)
+
+    def timeline(self, name: str) -> np.ndarray:
+        """ @public
+        Returns the time spent in the phase name at every iteration, the calls before the first
+        iteration being left out
+        """
+        timeline: np.ndarray = np.zeros(self.iteration + 1)
+        for event, k, _, duration in self.events:
+            if event == name and k >= 0:
+                timeline[k] += duration
+        return timeline
+
+    def summary(self, verbose: bool = True) -> List[List[Any]]:
+        """ @public
+        Returns, and prints if verbose, the phases with their cumulative time, number of calls, time
+        per call and share of the total time of the iterations
+        """
+        totals: Dict[str, float] = self.totals()
+        counts: Dict[str, int] = self.counts()
+        total: float = totals.get("iteration", sum(totals.values()))
+        rows: List[List[Any]] = [[name, totals[name], counts[name], totals[name] / counts[name],
+                                  100 * totals[name] / total if total > 0 else 0]
+                                 for name in sorted(totals, key=totals.get, reverse=True)]
+        if verbose:
+            print(tabulate(rows, headers=["phase", "time (s)", "calls", "time per call (s)", "% of iterations"],
+                           floatfmt=".4g"))
+        return rows
+
+    def to_chrome_trace(self, path: str) -> None:
+        """ @public
+        Writes the events to path in the Chrome trace event format, as complete events in microseconds
+        """
+        trace: Dict[str, Any] = {"traceEvents": [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                                                  "ts": (start - self.__origin) * 1e6, "dur": duration * 1e6,
+                                                  "args": {"iteration": k}}
+                                                 for name, k, start, duration in self.events],
+                                 "displayTimeUnit": "ms"}
+        with open(path, "w") as file:
+            json.dump(trace, file)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+PyramidInPainter.py - Implements the PyramidInPainter Class, which solves the InPainting problem
+                      from coarse to fine resolutions
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from time import time
+from typing import Any, List, Optional, Tuple
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .types import LevelDict
+from .Image import MaskedImage
+from .InPainter import InPainter
+from .Recorder import Recorder
+from .Shrinkage import Shrinkage
+
+
+class PyramidInPainter:
+    """
+    Solves the inpainting problem from coarse to fine resolutions. The image and its mask are
+    downsampled levels - 1 times by a factor 2, averaging the observed pixels of every 2x2 block,
+    and the coarsest level is solved from its corrupt image. The solution of every level is
+    upsampled, its observed pixels replaced by the known ones, and used as initial Z of the next
+    level, so the full resolution solve starts close to its solution. The levels share their
+    shrinkage engines, see InPainter.get_engines, which also carry the ranks from level to level.
+    Parameters:
+        image                 An instance of MaskedImage, to be inpainted
+        levels                Number of levels, including the full resolution (Default: 3)
+        **options             Parameters of InPainter (max_it, tol, tol_bregman, shrinkage, ...)
+    Public Methods:
+        run                   Runs the algorithm on every level
+    Private Methods:
+    """
+
+    def __init__(self, image: MaskedImage, levels: int = 3, **options: Any) -> None:
+        self.__options = options
+        self.__engines: Optional[Tuple[Shrinkage, Shrinkage]] = None
+
+        # Build the pyramid, from the full resolution to the coarsest level
+        self.__images: List[MaskedImage] = [image]
+        for _ in range(levels - 1):
+            self.__images.append(MaskedImage.from_arrays(*downsample(self.__images[-1].get_image_masked(),
+                                                                     self.__images[-1].mask)))
+
+    def run(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False) \
+            -> Tuple[np.ndarray, int, float, List[LevelDict]]:
+        """ @public
+        Run the InPainter on every level from the coarsest, returns the solution, the number of
+        iterations at full resolution, the total time, and the size, iterations and time per level
+        """
+        report: List[LevelDict] = []
+        solution: Optional[np.ndarray] = None
+        start = time()
+
+        for image in reversed(self.__images):
+            Z_init = None
+            if solution is not None:
+                Z_init = image.get_image_masked() + (1 - image.mask[..., None]) * upsample(solution, image.mask.shape)
+            painter: InPainter = InPainter(image, engines=self.__engines, **self.__options)
+            solution, its, times, _ = painter.run(rho, lamb, alpha_static, bregman,
+                                                   recorder=Recorder(every=0), Z_init=Z_init)
+            self.__engines = painter.get_engines()
+            report.append({"size": image.mask.shape, "iterations": its, "time": times})
+
+        return solution, report[-1]["iterations"], time() - start, report
+
+
+def downsample(image: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Halves the resolution of a masked (N, M, 3) image and its (N, M) mask. Every pixel of the result
+    averages the observed pixels of a 2x2 block, and is observed if one of them is.
+    Odd sizes are padded by repeating the last row or column.
+    """
+    N, M = mask.shape
+    pad = ((0, N % 2), (0, M % 2))
+    image = np.pad(image, pad + ((0, 0),), mode="edge")
+    mask = np.pad(mask, pad, mode="edge")
+    counts: np.ndarray = mask.reshape(image.shape[0] // 2, 2, image.shape[1] // 2, 2).sum(axis=(1, 3))
+    sums: np.ndarray = (image * mask[..., None]).reshape(image.shape[0] // 2, 2, image.shape[1] // 2, 2, 3) \
+        .sum(axis=(1, 3))
+    return (sums / np.maximum(counts, 1)[..., None]).astype(image.dtype, copy=False), (counts > 0).astype(int)
+
+
+def upsample(image: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Doubles the resolution of an (N, M, 3) image by repeating its pixels, cropped to the given shape
+    """
+    return image.repeat(2, axis=0).repeat(2, axis=1)[:shape[0], :shape[1]]
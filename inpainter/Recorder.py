@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Recorder.py - Implements the recorders storing the history of the Algorithm
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Union, TYPE_CHECKING
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .quality import psnr_from_error, ssim
+from .types import ConvergenceDict, HistoryDict
+if TYPE_CHECKING:
+    from .Profiler import Profiler
+
+
+class Recorder:
+    """
+    Records the history of a run of the Algorithm. The base recorder only keeps scalar metrics, computed
+    online in compact arrays, namely the fixed-point residual |z_k - Tz_k| and, if a reference image
+    is given, the error |Tz_k - z*|, the PSNR and optionally the SSIM of Tz_k, for every iteration k
+    multiple of every. With every=0 nothing is recorded and only the final iterate and its image are
+    kept. Subclasses additionally keep snapshots. The recorded z_k are the iterates, which costs one
+    application of T per recorded inertial iteration, see Algorithm.stream, and point is "z". With
+    at_inertial, the residuals of inertial iterations are instead those of the inertial variables u_k
+    to which the Algorithm applies T anyway, which costs none but is another quantity, and point is "u".
+    If the run was profiled, its Profiler is available as profiler.
+    Parameters:
+        every                 Records one iteration out of every (Default: 1)
+        reference             Reference image z*, to compute the error online (Default: None)
+        ssim                  Whether the SSIM to the reference is computed, which costs a few passes over
+                              the image per recorded iteration (Default: False)
+        peak                  Peak value of the images, for the PSNR and SSIM (Default: 1)
+        at_inertial           Whether the residuals of inertial iterations are recorded at the inertial
+                              variables instead of the iterates (Default: False)
+    Public Methods:
+        wants                 Whether an iteration should be recorded
+        records               Whether any iteration is recorded
+        record                Records an iterate and its image by T
+        finish                Stores the final iterate and its image by T
+        has_reference         Whether the errors to an image are computed online
+        get_metrics           Returns the recorded iterations and metrics as arrays
+        get_fpr               Returns the recorded iterations and squared fixed-point residuals
+        get_errors            Returns the recorded iterations and squared errors to a reference
+        __getitem__           Returns the snapshots "Z" or "TZ", or the residuals "FPR"
+    Protected Methods:
+        store                 Stores the snapshot of an iteration
+        snapshots             Returns the stored snapshots and their iterations
+    Private Methods:
+        grow                  Doubles the capacity of the arrays of metrics
+    """
+
+    # Columns of the array of metrics
+    FPR, ERROR, SSIM = 0, 1, 2
+
+    def __init__(self, every: int = 1, reference: Optional[np.ndarray] = None, ssim: bool = False,
+                 peak: float = 1, at_inertial: bool = False) -> None:
+        if ssim and reference is None:
+            raise ValueError("The SSIM can only be computed with a reference image")
+        self.every: int = every
+        self.reference: Optional[np.ndarray] = reference
+        self.ssim: bool = ssim
+        self.peak: float = peak
+        self.at_inertial: bool = at_inertial
+        self.point: str = "z"
+        self.iterations: int = 0
+        self.final: Optional[np.ndarray] = None
+        self.profiler: Optional["Profiler"] = None
+        self.__count: int = 0
+        self.__its: np.ndarray = np.empty(0, dtype=np.int64)
+        self.__metrics: np.ndarray = np.empty((0, 3))
+
+    def wants(self, k: int) -> bool:
+        """ @public
+        Whether iteration k should be recorded
+        """
+        return self.every > 0 and k % self.every == 0
+
+    def records(self) -> bool:
+        """ @public
+        Whether any iteration is recorded, a recorder recording none being satisfied by the final
+        iterate alone, as served by a SolveCache
+        """
+        return self.every > 0
+
+    def __grow(self) -> None:
+        """ @private
+        Doubles the capacity of the arrays of metrics, amortising the cost of a record to a constant
+        """
+        capacity: int = max(64, 2 * self.__its.size)
+        its: np.ndarray = np.empty(capacity, dtype=np.int64)
+        metrics: np.ndarray = np.full((capacity, 3), np.nan)
+        its[:self.__count], metrics[:self.__count] = self.__its[:self.__count], self.__metrics[:self.__count]
+        self.__its, self.__metrics = its, metrics
+
+    def record(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @public
+        Records the iterate Z of iteration k and its image TZ
+        """
+        if self.__count == self.__its.size:
+            self.__grow()
+        row: np.ndarray = self.__metrics[self.__count]
+        self.__its[self.__count] = k + 1
+        row[self.FPR] = np.linalg.norm(Z - TZ)
+        if self.reference is not None:
+            row[self.ERROR] = np.linalg.norm(TZ - self.reference)
+            if self.ssim:
+                row[self.SSIM] = ssim(TZ, self.reference, self.peak)
+        self.__count += 1
+        self._store(k, Z, TZ)
+
+    def finish(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @public
+        Stores the final iterate, of iteration k, and its image TZ
+        """
+        self.iterations = k + 1
+        self.final = TZ
+
+    def _store(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @protected
+        Stores the snapshot of iteration k, the base recorder keeps none.
+        The Algorithm reuses its buffers, so Z and TZ should be copied to be kept.
+        """
+        pass
+
+    def _snapshots(self, key: str) -> Tuple[List[int], List[np.ndarray]]:
+        """ @protected
+        Returns the iterations and snapshots stored under key ("Z" or "TZ")
+        """
+        raise KeyError(f"{type(self).__name__} does not keep snapshots of {key}")
+
+    def has_reference(self, image: Optional[np.ndarray]) -> bool:
+        """ @public
+        Whether the errors to image are computed online, that is whether image is the reference
+        """
+        return self.reference is not None and image is not None and \
+            (image is self.reference or np.array_equal(image, self.reference))
+
+    def get_metrics(self) -> ConvergenceDict:
+        """ @public
+        Returns the recorded iterations, squared fixed-point residuals |z_k - Tz_k|^2 and, if computed,
+        squared errors |Tz_k - z*|^2, PSNR and SSIM to the reference, as arrays
+        """
+        its: np.ndarray = self.__its[:self.__count].copy()
+        metrics: np.ndarray = self.__metrics[:self.__count]
+        error: Optional[np.ndarray] = metrics[:, self.ERROR] if self.reference is not None else None
+        return {"iterations": its,
+                "fpr": np.square(metrics[:, self.FPR]),
+                "error": np.square(error) if error is not None else None,
+                "psnr": psnr_from_error(error, self.reference.size, self.peak) if error is not None else None,
+                "ssim": metrics[:, self.SSIM].copy() if self.ssim else None}
+
+    def get_fpr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Returns the recorded iterations and the squared fixed-point residuals |z_k - Tz_k|^2
+        """
+        return self.__its[:self.__count].copy(), np.square(self.__metrics[:self.__count, self.FPR])
+
+    def get_errors(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Returns the recorded iterations and the squared errors |Tz_k - z*|^2 to the image z*.
+        They are computed online if image is the reference, and from the snapshots otherwise.
+        """
+        if self.has_reference(image):
+            return self.__its[:self.__count].copy(), np.square(self.__metrics[:self.__count, self.ERROR])
+        its, snapshots = self._snapshots("TZ")
+        return np.array(its), np.array([np.linalg.norm(TZ - image) ** 2 for TZ in snapshots])
+
+    def __getitem__(self, key: str) -> Union[List[float], List[np.ndarray]]:
+        """ @public
+        Returns the snapshots "Z" or "TZ", or the fixed-point residuals "FPR", as a HistoryDict would
+        """
+        if key == "FPR":
+            return self.__metrics[:self.__count, self.FPR].tolist()
+        return self._snapshots(key)[1]
+
+
+class HistoryRecorder (Recorder):
+    """
+    Records every iterate and its image by T in memory, or one out of every iterations.
+    Parameters:
+        every                 Records one iteration out of every (Default: 1)
+        reference             Reference image z*, to compute the error online (Default: None)
+        ssim                  Whether the SSIM to the reference is computed (Default: False)
+        peak                  Peak value of the images, for the PSNR and SSIM (Default: 1)
+        at_inertial           Whether the residuals are recorded at the inertial variables, see Recorder
+                              (Default: False)
+    Public Methods:
+        history               Returns the history as a HistoryDict
+    """
+
+    def __init__(self, every: int = 1, reference: Optional[np.ndarray] = None, ssim: bool = False,
+                 peak: float = 1, at_inertial: bool = False) -> None:
+        super().__init__(every, reference, ssim, peak, at_inertial)
+        self.__its: List[int] = []
+        self.__history: HistoryDict = {"Z": [], "TZ": [], "FPR": []}
+
+    def _store(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @protected
+        Stores the snapshot of iteration k
+        """
+        self.__its.append(k + 1)
+        self.__history["Z"].append(Z.copy())
+        self.__history["TZ"].append(TZ.copy())
+
+    def _snapshots(self, key: str) -> Tuple[List[int], List[np.ndarray]]:
+        """ @protected
+        Returns the iterations and snapshots stored under key ("Z" or "TZ")
+        """
+        return self.__its, self.__history[key]
+
+    def history(self) -> HistoryDict:
+        """ @public
+        Returns the history as a HistoryDict
+        """
+        self.__history["FPR"] = self["FPR"]
+        return self.__history
+
+
+class RingRecorder (Recorder):
+    """
+    Records the scalar metrics of every iteration, but only keeps the last size snapshots.
+    Parameters:
+        size                  Number of snapshots kept
+        every                 Records one iteration out of every (Default: 1)
+        reference             Reference image z*, to compute the error online (Default: None)
+        ssim                  Whether the SSIM to the reference is computed (Default: False)
+        peak                  Peak value of the images, for the PSNR and SSIM (Default: 1)
+        at_inertial           Whether the residuals are recorded at the inertial variables, see Recorder
+                              (Default: False)
+    """
+
+    def __init__(self, size: int, every: int = 1, reference: Optional[np.ndarray] = None, ssim: bool = False,
+                 peak: float = 1, at_inertial: bool = False) -> None:
+        super().__init__(every, reference, ssim, peak, at_inertial)
+        self.__ring: Deque[Tuple[int, np.ndarray, np.ndarray]] = deque(maxlen=size)
+
+    def _store(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @protected
+        Stores the snapshot of iteration k, dropping the oldest one if full
+        """
+        self.__ring.append((k + 1, Z.copy(), TZ.copy()))
+
+    def _snapshots(self, key: str) -> Tuple[List[int], List[np.ndarray]]:
+        """ @protected
+        Returns the iterations and snapshots stored under key ("Z" or "TZ")
+        """
+        index: int = {"Z": 1, "TZ": 2}[key]
+        return [entry[0] for entry in self.__ring], [entry[index] for entry in self.__ring]
+
+
+class DiskRecorder (Recorder):
+    """
+    Streams the snapshots to .npy files in a directory, named Z_{k:06d}.npy and TZ_{k:06d}.npy for
+    iteration k counted from 1, such as Z_000001.npy for the first one, and reads them back memory-mapped.
+    Parameters:
+        directory             Directory in which the snapshots are written, created if needed
+        every                 Records one iteration out of every (Default: 1)
+        reference             Reference image z*, to compute the error online (Default: None)
+        ssim                  Whether the SSIM to the reference is computed (Default: False)
+        peak                  Peak value of the images, for the PSNR and SSIM (Default: 1)
+        at_inertial           Whether the residuals are recorded at the inertial variables, see Recorder
+                              (Default: False)
+    """
+
+    def __init__(self, directory: str, every: int = 1, reference: Optional[np.ndarray] = None,
+                 ssim: bool = False, peak: float = 1, at_inertial: bool = False) -> None:
+        super().__init__(every, reference, ssim, peak, at_inertial)
+        self.directory: str = directory
+        self.__its: List[int] = []
+        os.makedirs(directory, exist_ok=True)
+
+    def _store(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @protected
+        Writes the snapshot of iteration k to disk
+        """
+        self.__its.append(k + 1)
+        np.save(os.path.join(self.directory, f"Z_{k + 1:06d}.npy"), Z)
+        np.save(os.path.join(self.directory, f"TZ_{k + 1:06d}.npy"), TZ)
+
+    def _snapshots(self, key: str) -> Tuple[List[int], List[np.ndarray]]:
+        """ @protected
+        Returns the iterations and memory-mapped snapshots stored under key ("Z" or "TZ")
+        """
+        if key not in ("Z", "TZ"):
+            raise KeyError(key)
+        return self.__its, [np.load(os.path.join(self.directory, f"{key}_{k:06d}.npy"), mmap_mode="r")
+                            for k in self.__its]
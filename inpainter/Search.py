@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Search.py - Implements the HyperbandSearch Class, which selects the parameters of the Algorithm by
+            successive halving on partial runs
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import itertools
+import math
+import os
+from time import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .lazy import tabulate, tqdm
+from .Image import MaskedImage
+from .InPainter import InPainter
+from .Recorder import Recorder
+from .types import TrialDict
+
+# Configuration (rho, lambda, alpha_static, bregman) of a run
+Configuration = Tuple[float, float, bool, bool]
+
+
+class ResidualRecorder (Recorder):
+    """
+    Records the fixed-point residual |z_k - Tz_k| at a single iteration and at the final iterate, from
+    which the linear convergence rate of the run is estimated, together with the relative residual
+    |z - Tz| / |z| of the final iterate. Both residuals are taken at iterates, never at inertial
+    variables, see Recorder, so that the rates of inertial and static configurations compare.
+    Parameters:
+        at                    Iteration at which the residual is recorded
+    Public Methods:
+        wants                 Whether an iteration should be recorded
+        records               Whether any iteration is recorded
+        finish                Stores the final iterate, its residual and the convergence rate
+    """
+
+    def __init__(self, at: int) -> None:
+        super().__init__(every=0, at_inertial=False)
+        self.at: int = at
+        self.residual: float = np.inf
+        self.rate: float = np.nan
+
+    def wants(self, k: int) -> bool:
+        """ @public
+        Whether iteration k should be recorded
+        """
+        return k == self.at
+
+    def records(self) -> bool:
+        """ @public
+        Whether any iteration is recorded, which the rate needs
+        """
+        return True
+
+    def finish(self, k: int, Z: np.ndarray, TZ: np.ndarray) -> None:
+        """ @public
+        Stores the final iterate, of iteration k, its image TZ, its relative residual and the rate of
+        decrease of the residual per iteration since the recorded one
+        """
+        super().finish(k, Z, TZ)
+        residual: float = float(np.linalg.norm(Z - TZ))
+        self.residual = residual / float(np.linalg.norm(Z))
+        its, fpr = self.get_fpr()
+        if its.size > 0 and k + 1 > its[0] and fpr[0] > 0:
+            self.rate = (residual / np.sqrt(fpr[0])) ** (1 / (k + 1 - its[0]))
+
+
+class HyperbandSearch:
+    """
+    Searches the configuration (rho, lambda, alpha_static, bregman) solving an inpainting problem in
+    the fewest iterations, by successive halving: all the configurations are run for min_it iterations,
+    the best 1/eta are continued up to eta times more iterations, and so on, the last rung running the
+    remaining ones up to max_it, i.e. the rungs run min(min_it * eta^k, max_it) iterations. The runs
+    are ranked by their number of iterations if they converged, and otherwise by the number of
+    iterations they would need at the rate their fixed-point residual decreased, so configurations
+    that do not converge are stopped after a few iterations. A continued run resumes
+    from the last image by T of its previous rung, saved in memory or in a directory, instead of
+    restarting; the inertia and the Bregman state restart from it. Hyperband runs several brackets of
+    successive halving, from many configurations on small budgets to a few on the full budget, which
+    hedges against configurations that only pull ahead late: a bracket starts at a later rung of the
+    same ladder.
+    Parameters:
+        image                 MaskedImage to inpaint
+        rhos                  Values of rho searched (Default: (0.25, 0.5, 1, 1.5, 1.9))
+        lambdas               Values of lambda searched (Default: (0.25, 0.5, 0.75, 1))
+        alpha_static          Values of alpha_static searched (Default: (True, False))
+        bregman               Values of bregman searched (Default: (False, True))
+        max_it                Maximal number of iterations of a configuration (Default: 100)
+        min_it                Number of iterations of the first rung (Default: 5)
+        eta                   Factor of the halving, 1/eta configurations continuing with eta times more
+                              iterations at every rung (Default: 3)
+        tol                   Tolerance of the stopping criterion (Default: 1e-3)
+        tol_bregman           Tolerance of the Bregman update (Default: 5e-2)
+        directory             Directory in which the iterates are saved, None to keep them in memory
+                              (Default: None)
+        seed                  Seed of the sampling of the configurations by Hyperband (Default: None)
+        verbose               Whether the progress and results are printed (Default: True)
+        options               Other options of the InPainter, such as shrinkage or dtype
+    Public Methods:
+        halving               Runs successive halving on all the configurations
+        hyperband             Runs Hyperband
+        results               Returns the configurations evaluated, best first
+        spent                 Returns the number of iterations run
+    Private Methods:
+        advance               Runs a configuration up to a number of iterations, resuming it
+        rungs                 Returns the number of rungs of the ladder
+        budget                Returns the number of iterations of a rung
+        bracket               Runs successive halving on some configurations
+        score                 Returns the key ranking a configuration
+        save                  Saves the iterate of a configuration
+        load                  Loads the iterate of a configuration
+        drop                  Forgets the iterate of a configuration
+        report                Prints the results
+    """
+
+    def __init__(self,
+                 image: MaskedImage,
+                 rhos: Sequence[float] = (0.25, 0.5, 1, 1.5, 1.9),
+                 lambdas: Sequence[float] = (0.25, 0.5, 0.75, 1),
+                 alpha_static: Sequence[bool] = (True, False),
+                 bregman: Sequence[bool] = (False, True),
+                 max_it: int = 100,
+                 min_it: int = 5,
+                 eta: int = 3,
+                 tol: float = 1e-3,
+                 tol_bregman: float = 5e-2,
+                 directory: Optional[str] = None,
+                 seed: Optional[int] = None,
+                 verbose: bool = True,
+                 **options: Any) -> None:
+        if eta < 2:
+            raise ValueError("The factor eta of the halving should be at least 2")
+        if not 0 < min_it <= max_it:
+            raise ValueError("The numbers of iterations should satisfy 0 < min_it <= max_it")
+        self.image: MaskedImage = image
+        self.configurations: List[Configuration] = list(itertools.product(rhos, lambdas, alpha_static, bregman))
+        self.max_it: int = max_it
+        self.min_it: int = min_it
+        self.eta: int = eta
+        self.tol: float = tol
+        self.tol_bregman: float = tol_bregman
+        self.directory: Optional[str] = directory
+        self.verbose: bool = verbose
+        self.options: Dict[str, Any] = options
+        self.__rng: np.random.Generator = np.random.default_rng(seed)
+        self.__trials: Dict[Configuration, TrialDict] = {}
+        self.__iterates: Dict[Configuration, np.ndarray] = {}
+        self.__spent: int = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __path(self, configuration: Configuration) -> str:
+        """ @private
+        Returns the path of the saved iterate of a configuration
+        """
+        rho, lamb, alpha_static, bregman = configuration
+        return os.path.join(self.directory, f"rho{rho:g}_lamb{lamb:g}_static{alpha_static:d}_bregman{bregman:d}.npy")
+
+    def __save(self, configuration: Configuration, iterate: np.ndarray) -> None:
+        """ @private
+        Saves the iterate of a configuration, to resume it
+        """
+        if self.directory is None:
+            self.__iterates[configuration] = iterate
+        else:
+            np.save(self.__path(configuration), iterate)
+
+    def __load(self, configuration: Configuration) -> Optional[np.ndarray]:
+        """ @private
+        Loads the saved iterate of a configuration, None if it was not saved or dropped
+        """
+        if self.directory is None:
+            return self.__iterates.get(configuration)
+        path: str = self.__path(configuration)
+        return np.load(path) if os.path.exists(path) else None
+
+    def __drop(self, configuration: Configuration) -> None:
+        """ @private
+        Forgets the saved iterate of a configuration, which will not be resumed
+        """
+        self.__iterates.pop(configuration, None)
+        if self.directory is not None and os.path.exists(self.__path(configuration)):
+            os.remove(self.__path(configuration))
+
+    def __advance(self, configuration: Configuration, budget: int) -> TrialDict:
+        """ @private
+        Runs a configuration up to budget iterations in total, resuming from its saved iterate.
+        A configuration which converged, or already ran budget iterations, is not run again.
+        """
+        trial: Optional[TrialDict] = self.__trials.get(configuration)
+        if trial is not None and (trial["converged"] or trial["iterations"] >= budget):
+            return trial
+        iterate: Optional[np.ndarray] = self.__load(configuration)
+        if trial is None or iterate is None:
+            trial = {"rho": configuration[0], "lamb": configuration[1], "alpha_static": configuration[2],
+                     "bregman": configuration[3], "iterations": 0, "residual": np.inf, "converged": False,
+                     "estimate": np.inf, "time": 0}
+
+        rho, lamb, alpha_static, bregman = configuration
+        increment: int = budget - trial["iterations"]
+        painter: InPainter = InPainter(self.image, increment, self.tol, self.tol_bregman, verbose=False,
+                                       **self.options)
+        recorder: ResidualRecorder = ResidualRecorder(at=increment // 2)
+        start: float = time()
+        solution, its, _, _ = painter.run(rho, lamb, alpha_static, bregman, recorder=recorder, Z_init=iterate)
+        self.__spent += its
+
+        # Rate of the run, or since the previous rung if the run was too short to measure it
+        rate: float = recorder.rate
+        if np.isnan(rate) and np.isfinite(trial["residual"]) and trial["residual"] > 0:
+            rate = (recorder.residual / trial["residual"]) ** (1 / its)
+        converged: bool = its < increment or recorder.residual < self.tol
+        estimate: float = trial["iterations"] + its
+        if not converged:
+            estimate += np.log(self.tol / recorder.residual) / np.log(rate) if rate < 1 else np.inf
+        trial.update(iterations=trial["iterations"] + its, residual=recorder.residual, converged=converged,
+                     estimate=estimate, time=trial["time"] + time() - start)
+        self.__trials[configuration] = trial
+        self.__save(configuration, solution)
+        return trial
+
+    @staticmethod
+    def __score(trial: TrialDict) -> float:
+        """ @private
+        Returns the key ranking a configuration, its number of iterations if it converged, and otherwise
+        the number of iterations it would need at its observed convergence rate
+        """
+        return trial["estimate"]
+
+    def __rungs(self) -> int:
+        """ @private
+        Returns the number of rungs of the ladder from min_it to max_it
+        """
+        return int(math.ceil(math.log(self.max_it / self.min_it, self.eta) - 1e-9)) + 1
+
+    def __budget(self, rung: int) -> int:
+        """ @private
+        Returns the number of iterations of a rung of the ladder, min_it * eta^rung capped at max_it
+        """
+        return min(self.min_it * self.eta ** rung, self.max_it)
+
+    def __bracket(self, configurations: List[Configuration], first: int) -> None:
+        """ @private
+        Runs successive halving on configurations from the rung first of the ladder to its last rung,
+        with max_it iterations
+        """
+        rungs: int = self.__rungs()
+        for rung in range(first, rungs):
+            budget: int = self.__budget(rung)
+            trials: List[TrialDict] = [self.__advance(configuration, budget) for configuration in
+                                       tqdm(configurations, disable=not self.verbose, unit="Run", leave=False,
+                                            desc=f"{len(configurations)} runs of {budget} its")]
+            order: List[int] = sorted(range(len(configurations)), key=lambda i: self.__score(trials[i]))
+            kept: int = max(1, len(configurations) // self.eta) if rung + 1 < rungs else len(configurations)
+            for i in order[kept:]:
+                self.__drop(configurations[i])
+            configurations = [configurations[i] for i in order[:kept]]
+
+    def halving(self) -> List[TrialDict]:
+        """ @public
+        Runs successive halving on all the configurations, from min_it to max_it iterations, and returns
+        the configurations evaluated, best first
+        """
+        self.__bracket(list(self.configurations), 0)
+        return self.__report()
+
+    def hyperband(self) -> List[TrialDict]:
+        """ @public
+        Runs Hyperband, i.e. brackets of successive halving from many configurations sampled on min_it
+        iterations to a few on max_it iterations, and returns the configurations evaluated, best first.
+        The runs of a configuration sampled again are resumed across brackets.
+        """
+        s_max: int = self.__rungs() - 1
+        for s in range(s_max, -1, -1):
+            n: int = min(len(self.configurations), int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s)))
+            sample: np.ndarray = self.__rng.choice(len(self.configurations), n, replace=False)
+            self.__bracket([self.configurations[i] for i in sample], s_max - s)
+        return self.__report()
+
+    def results(self) -> List[TrialDict]:
+        """ @public
+        Returns the configurations evaluated, best first
+        """
+        return sorted(self.__trials.values(), key=self.__score)
+
+    def spent(self) -> int:
+        """ @public
+        Returns the number of iterations run by the search
+        """
+        return self.__spent
+
+    def __report(self) -> List[TrialDict]:
+        """ @private
+        Returns, and prints if verbose, the configurations evaluated, best first, and the iterations
+        spent compared to a grid running every configuration for max_it iterations
+        """
+        results: List[TrialDict] = self.results()
+        if self.verbose:
+            print(tabulate([list(trial.values()) for trial in results], headers=list(TrialDict.__annotations__),
+                           floatfmt=".4g"))
+            print(f"{self.__spent} iterations spent, {len(self.configurations) * self.max_it} for the full grid")
+        return results
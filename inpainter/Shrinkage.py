@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Shrinkage.py - Implements the singular value shrinkage engines used as proximal operators
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple, Type
+
+# External Imports
+import numpy as np
+import scipy as sp
+import scipy.linalg
+
+# Internal Imports
+from .backends import svd
+
+
+def svd_shrink(matrix: np.ndarray, rho: float) -> np.ndarray:
+    """
+    Computes the shrunken SVD of a matrix, with the SVD backend selected for its shape and type
+    """
+    U: np.ndarray
+    S: np.ndarray
+    VT: np.ndarray
+    U, S, VT = svd(matrix, rho)
+    return (U * np.maximum(S - rho, 0)) @ VT
+
+
+def svd_shrink_batch(matrices: np.ndarray, rho: float) -> np.ndarray:
+    """
+    Computes the shrunken SVD of every matrix of a (B, N, M) stack, through a single stacked SVD
+    """
+    U: np.ndarray
+    S: np.ndarray
+    VT: np.ndarray
+    U, S, VT = np.linalg.svd(matrices, full_matrices=False)
+    return (U * np.maximum(S - rho, 0)[:, None, :]) @ VT
+
+
+def tsvd_shrink(tensor: np.ndarray, rho: float) -> np.ndarray:
+    """
+    Computes the proximal operator of rho times the tensor nuclear norm of an (N, M, 3) tensor, based
+    on the t-SVD: the singular values of every (N, M) slice of its FFT along the colour axis are shrunk
+    by rho. The slices are conjugate symmetric, so only the non-redundant ones of the real FFT are used,
+    the first one being real.
+    """
+    slices: np.ndarray = np.fft.rfft(tensor, axis=2)
+    slices[:, :, 0] = svd_shrink(slices[:, :, 0].real, rho)
+    for k in range(1, slices.shape[2]):
+        slices[:, :, k] = svd_shrink(slices[:, :, k], rho)
+    return np.fft.irfft(slices, n=tensor.shape[2], axis=2)
+
+
+class Shrinkage:
+    """
+    Computes the proximal operator of rho times the nuclear norm, i.e. soft-thresholds the singular
+    values of a matrix at rho. This base engine computes the full SVD, subclasses only compute the
+    leading singular triplets. An engine is stateful, so one instance should be used per unfolding.
+    Parameters:
+        tol                   Tolerance on the relative residual of the kept singular triplets
+    Public Methods:
+        factorize             Computes the factors of the shrunken matrix
+        __call__              Computes the shrunken matrix
+    Protected Methods:
+        full_svd              Computes the thin SVD
+        factors               Soft-thresholds a (partial) SVD at rho into the factors of the shrunken matrix
+    """
+
+    def __init__(self, tol: float = 1e-4) -> None:
+        self.tol: float = tol
+        self.rank: int = 0
+
+    def _full_svd(self, matrix: np.ndarray, floor: float = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ @protected
+        Computes the thin SVD of a matrix, at least its triplets with singular value above floor,
+        with the SVD backend selected for its shape and type
+        """
+        return svd(matrix, floor)
+
+    def _factors(self, U: np.ndarray, S: np.ndarray, VT: np.ndarray, rho: float) -> Tuple[np.ndarray, np.ndarray]:
+        """ @protected
+        Soft-thresholds a (partial) SVD at rho, stores the surviving rank and returns the factors of
+        the shrunken matrix, the left singular vectors scaled by the shrunken singular values and the
+        right singular vectors
+        """
+        self.rank = int(np.count_nonzero(S > rho))
+        r: int = self.rank
+        return U[:, :r] * (S[:r] - rho), VT[:r]
+
+    def factorize(self, matrix: np.ndarray, rho: float) -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Computes the factors (left, right) of the shrunken SVD of a matrix, whose product is the shrunken matrix
+        """
+        U, S, VT = self._full_svd(matrix, rho)
+        return self._factors(U, S, VT, rho)
+
+    def __call__(self, matrix: np.ndarray, rho: float) -> np.ndarray:
+        """ @public
+        Computes the shrunken SVD of a matrix
+        """
+        left, right = self.factorize(matrix, rho)
+        return left @ right
+
+
+class PartialShrinkage (Shrinkage, ABC):
+    """
+    Rank-adaptive shrinkage engine computing only the leading singular triplets. The rank computed
+    is the surviving rank of the previous call plus a margin, and is doubled as long as the smallest
+    computed singular value is still above rho. The result is accepted once every kept triplet
+    satisfies |A v - s u| <= tol * s_max, and the exact SVD is used otherwise, or as soon as the
+    rank to compute exceeds max_rank_ratio times the smallest dimension of the matrix. The engines
+    implement partial_svd, which is abstract.
+    Parameters:
+        tol                   Tolerance on the relative residual of the kept singular triplets
+        min_rank              Minimal number of triplets computed, also used as margin
+        max_rank_ratio        Fraction of the full rank above which the exact SVD is used
+        seed                  Seed of the random starting vectors
+    Public Methods:
+        factorize             Computes the factors of the shrunken matrix
+        __call__              Computes the shrunken matrix
+    Protected Methods:
+        partial_svd           Computes the k leading singular triplets
+        refine                Adapts the engine after an inaccurate partial SVD
+    Private Methods:
+        accurate              Checks the residual of the kept singular triplets
+    """
+
+    def __init__(self,
+                 tol: float = 1e-4,
+                 min_rank: int = 8,
+                 max_rank_ratio: float = 0.5,
+                 seed: int = 0) -> None:
+        super().__init__(tol)
+        self.min_rank: int = min_rank
+        self.max_rank_ratio: float = max_rank_ratio
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+
+    @abstractmethod
+    def _partial_svd(self, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ @protected
+        Computes the k leading singular triplets, sorted by decreasing singular value
+        """
+
+    def _refine(self) -> bool:
+        """ @protected
+        Adapts the engine after an inaccurate partial SVD, returns whether to retry
+        """
+        return False
+
+    def __accurate(self, matrix: np.ndarray, U: np.ndarray, S: np.ndarray, VT: np.ndarray, rho: float) -> bool:
+        """ @private
+        Checks the residual |A v - s u| of the singular triplets kept after thresholding
+        """
+        r: int = int(np.count_nonzero(S > rho))
+        if r == 0:
+            return True
+        residuals: np.ndarray = np.linalg.norm(matrix @ VT[:r].T - U[:, :r] * S[:r], axis=0)
+        return bool(np.max(residuals) <= self.tol * S[0])
+
+    def factorize(self, matrix: np.ndarray, rho: float) -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Computes the factors (left, right) of the shrunken SVD of a matrix, whose product is the shrunken matrix
+        """
+        k: int = max(self.min_rank, self.rank + self.min_rank)
+        while k <= self.max_rank_ratio * min(matrix.shape):
+            U, S, VT = self._partial_svd(matrix, k)
+            if S[-1] > rho:
+                k *= 2
+            elif self.__accurate(matrix, U, S, VT, rho):
+                return self._factors(U, S, VT, rho)
+            elif not self._refine():
+                break
+        return super().factorize(matrix, rho)
+
+
+class RandomizedShrinkage (PartialShrinkage):
+    """
+    Rank-adaptive shrinkage engine based on a randomized range-finder with power iterations.
+    Parameters:
+        tol                   Tolerance on the relative residual of the kept singular triplets
+        min_rank              Minimal number of triplets computed, also used as margin
+        max_rank_ratio        Fraction of the full rank above which the exact SVD is used
+        seed                  Seed of the random test matrices
+        oversampling          Number of extra columns of the test matrix
+        power_its             Number of power iterations, increased for the retries of an inaccurate call
+        max_power_its         Maximal number of power iterations
+    Public Methods:
+        factorize             Computes the factors of the shrunken matrix, from power_its power iterations
+        __call__              Computes the shrunken matrix
+    Protected Methods:
+        partial_svd           Computes the k leading singular triplets
+        refine                Adds a power iteration to the retries after an inaccurate partial SVD
+        test_matrix           Creates the test matrix whose range is iterated
+        store_subspace        Receives the right singular vectors computed
+    """
+
+    def __init__(self,
+                 tol: float = 1e-4,
+                 min_rank: int = 8,
+                 max_rank_ratio: float = 0.5,
+                 seed: int = 0,
+                 oversampling: int = 10,
+                 power_its: int = 2,
+                 max_power_its: int = 8) -> None:
+        super().__init__(tol, min_rank, max_rank_ratio, seed)
+        self.oversampling: int = oversampling
+        self.power_its: int = power_its
+        self.max_power_its: int = max_power_its
+        self.__extra_its: int = 0
+
+    def factorize(self, matrix: np.ndarray, rho: float) -> Tuple[np.ndarray, np.ndarray]:
+        """ @public
+        Computes the factors (left, right) of the shrunken SVD of a matrix, whose product is the shrunken
+        matrix, every call starting from power_its power iterations
+        """
+        self.__extra_its = 0
+        return super().factorize(matrix, rho)
+
+    def _partial_svd(self, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ @protected
+        Computes the k leading singular triplets through a randomized range-finder
+        """
+        p: int = min(k + self.oversampling, min(matrix.shape))
+        Q: np.ndarray = np.linalg.qr(matrix @ self._test_matrix(matrix.shape[1], p, matrix.dtype))[0]
+        for _ in range(self.power_its + self.__extra_its):
+            Q = np.linalg.qr(matrix.T @ Q)[0]
+            Q = np.linalg.qr(matrix @ Q)[0]
+        U, S, VT = sp.linalg.svd(Q.T @ matrix, full_matrices=False)
+        self._store_subspace(VT)
+        return (Q @ U[:, :k]), S[:k], VT[:k]
+
+    def _test_matrix(self, n: int, p: int, dtype: np.dtype) -> np.ndarray:
+        """ @protected
+        Creates the (n, p) test matrix whose range is iterated
+        """
+        return self._rng.standard_normal((n, p)).astype(dtype, copy=False)
+
+    def _store_subspace(self, VT: np.ndarray) -> None:
+        """ @protected
+        Receives the right singular vectors computed, unused by the randomized engine
+        """
+        pass
+
+    def _refine(self) -> bool:
+        """ @protected
+        Adds a power iteration to the retries of the actual call after an inaccurate partial SVD
+        """
+        if self.power_its + self.__extra_its >= self.max_power_its:
+            return False
+        self.__extra_its += 1
+        return True
+
+
+class SubspaceShrinkage (RandomizedShrinkage):
+    """
+    Rank-adaptive shrinkage engine tracking the right singular subspace across calls. Consecutive
+    iterates change little, so the subspace of the previous call, padded with random vectors if the
+    rank grows, is refined with a few block power iterations instead of starting from a random
+    test matrix. When the kept triplets are inaccurate, power iterations are added, and after
+    max_power_its the exact SVD is computed and used to restart the tracking. Only the right subspace
+    is tracked: the left one is the range of the matrix times the right one, which the first product
+    of the refinement computes for the actual matrix, so tracking that of the previous matrix as well
+    would save no product. The engine is kept across runs by InPainter, see InPainter.get_engines.
+    Parameters:
+        tol                   Tolerance on the relative residual of the kept singular triplets
+        min_rank              Minimal number of triplets computed, also used as margin
+        max_rank_ratio        Fraction of the full rank above which the exact SVD is used
+        seed                  Seed of the random padding vectors
+        oversampling          Number of extra tracked vectors
+        power_its             Number of subspace iterations, increased for the retries of an inaccurate call
+        max_power_its         Maximal number of subspace iterations
+    Public Methods:
+        factorize             Computes the factors of the shrunken matrix
+        __call__              Computes the shrunken matrix
+        reset                 Forgets the tracked subspace
+    Protected Methods:
+        full_svd              Computes the thin SVD and restarts the tracking from it
+        test_matrix           Returns the tracked subspace, padded to the requested size
+        store_subspace        Stores the right singular vectors computed
+    """
+
+    def __init__(self,
+                 tol: float = 1e-4,
+                 min_rank: int = 8,
+                 max_rank_ratio: float = 0.5,
+                 seed: int = 0,
+                 oversampling: int = 10,
+                 power_its: int = 1,
+                 max_power_its: int = 4) -> None:
+        super().__init__(tol, min_rank, max_rank_ratio, seed, oversampling, power_its, max_power_its)
+        self.__V: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        """ @public
+        Forgets the tracked subspace
+        """
+        self.__V = None
+
+    def _full_svd(self, matrix: np.ndarray, floor: float = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ @protected
+        Computes the thin SVD of a matrix and restarts the tracking from it
+        """
+        U, S, VT = super()._full_svd(matrix, floor)
+        # Sized from the rank of this matrix, which the engine only stores once thresholded
+        rank: int = int(np.count_nonzero(S > floor))
+        self.__V = None
+        self._store_subspace(VT[:rank + self.min_rank + self.oversampling])
+        return U, S, VT
+
+    def _test_matrix(self, n: int, p: int, dtype: np.dtype) -> np.ndarray:
+        """ @protected
+        Returns the tracked subspace, padded with random vectors or truncated to p columns
+        """
+        if self.__V is None or self.__V.shape[0] != n:
+            return super()._test_matrix(n, p, dtype)
+        if self.__V.shape[1] >= p:
+            return self.__V[:, :p].astype(dtype, copy=False)
+        return np.hstack((self.__V, super()._test_matrix(n, p - self.__V.shape[1], dtype))).astype(dtype, copy=False)
+
+    def _store_subspace(self, VT: np.ndarray) -> None:
+        """ @protected
+        Stores the right singular vectors computed
+        """
+        self.__V = VT.T.copy()
+
+
+class LanczosShrinkage (PartialShrinkage):
+    """
+    Rank-adaptive shrinkage engine based on the Lanczos (ARPACK) partial SVD.
+    Parameters:
+        tol                   Tolerance on the relative residual of the kept singular triplets
+        min_rank              Minimal number of triplets computed, also used as margin
+        max_rank_ratio        Fraction of the full rank above which the exact SVD is used
+        seed                  Seed of the random starting vector
+    Public Methods:
+        factorize             Computes the factors of the shrunken matrix
+        __call__              Computes the shrunken matrix
+    Protected Methods:
+        partial_svd           Computes the k leading singular triplets
+    """
+
+    def _partial_svd(self, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ @protected
+        Computes the k leading singular triplets through ARPACK
+        """
+        import scipy.sparse.linalg
+        U, S, VT = sp.sparse.linalg.svds(matrix, k=k, tol=self.tol / 10, random_state=self._rng)
+        order: np.ndarray = np.argsort(S)[::-1]
+        return U[:, order], S[order], VT[order]
+
+
+SHRINKAGE_ENGINES: Dict[str, Type[Shrinkage]] = {
+    "exact": Shrinkage,
+    "randomized": RandomizedShrinkage,
+    "lanczos": LanczosShrinkage,
+    "subspace": SubspaceShrinkage,
+}
+
+
+def make_shrinkage(method: str, **options) -> Shrinkage:
+    """
+    Creates a shrinkage engine from its name, see SHRINKAGE_ENGINES
+    """
+    if method not in SHRINKAGE_ENGINES:
+        raise ValueError(f"Unknown shrinkage method '{method}', expected one of {list(SHRINKAGE_ENGINES)}")
+    return SHRINKAGE_ENGINES[method](**options)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+SolveCache.py - Implements the SolveCache Class, an on-disk cache of the solutions of InPainter
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+# External Imports
+import numpy as np
+
+
+class SolveCache:
+    """
+    Stores the solutions of InPainter.run in a directory, one .npz file per solve holding the solution,
+    in the type of the solver, with its number of iterations and time. A solve is identified by a hash
+    of the content of the corrupt image, of the mask and of all the parameters of the solver and of
+    the run. When the files exceed max_bytes, the least recently used ones are evicted, a hit
+    refreshing the modification time of its file. Writes are atomic, so the cache may be shared by
+    the processes of a pool. As no history is stored, InPainter only serves the runs whose recorder
+    records no iteration from the cache, see Recorder.records.
+    Parameters:
+        directory             Directory of the cache, created if needed
+        max_bytes             Maximal total size of the cached files (Default: 1 GiB)
+    Public Methods:
+        key                   Computes the key of a solve
+        get                   Returns a cached solve, if any
+        put                   Stores a solve
+        size                  Returns the total size of the cached files
+        clear                 Removes every cached solve
+    Private Methods:
+        path                  Returns the path of the file of a key
+        entries               Returns the modification time, size and path of the cached files
+        evict                 Removes the least recently used files until the cache fits
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 ** 30) -> None:
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(arrays: List[np.ndarray], parameters: Dict[str, Any]) -> str:
+        """ @public
+        Computes the key of a solve from the content, shape and type of its arrays and its parameters
+        """
+        digest = hashlib.sha256()
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.data)
+        digest.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def __path(self, key: str) -> str:
+        """ @private
+        Returns the path of the file of a key
+        """
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int, float]]:
+        """ @public
+        Returns the solution, number of iterations and time of the solve of the given key, or None
+        """
+        try:
+            with np.load(self.__path(key)) as data:
+                result: Tuple[np.ndarray, int, float] = (data["solution"], int(data["iterations"]),
+                                                         float(data["time"]))
+            os.utime(self.__path(key))
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, solution: np.ndarray, iterations: int, time: float) -> None:
+        """ @public
+        Stores the solution, number of iterations and time of the solve of the given key, the
+        temporary file of the write being removed if it fails
+        """
+        descriptor, temporary = tempfile.mkstemp(suffix=".npz.tmp", dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(file, solution=solution, iterations=iterations, time=time)
+            os.replace(temporary, self.__path(key))
+        except BaseException:
+            # Eviction only sees the .npz files, so a failed write would never be removed
+            os.remove(temporary)
+            raise
+        self.__evict()
+
+    def __entries(self) -> List[Tuple[float, int, str]]:
+        """ @private
+        Returns the modification time, size and path of every cached file
+        """
+        entries: List[Tuple[float, int, str]] = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    status = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, os.path.join(self.directory, name)))
+        return entries
+
+    def __evict(self) -> None:
+        """ @private
+        Removes the least recently used files until the total size is at most max_bytes
+        """
+        entries: List[Tuple[float, int, str]] = sorted(self.__entries())
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self) -> int:
+        """ @public
+        Returns the total size, in bytes, of the cached files
+        """
+        return sum(size for _, size, _ in self.__entries())
+
+    def clear(self) -> None:
+        """ @public
+        Removes every cached solve
+        """
+        for _, _, path in self.__entries():
+            os.remove(path)
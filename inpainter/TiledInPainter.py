@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+TiledInPainter.py - Implements the TiledInPainter Class, which solves the InPainting problem
+                    on overlapping tiles of a large image
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from time import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .Image import MaskedImage
+from .InPainter import InPainter
+from .Recorder import Recorder
+
+
+class TiledInPainter:
+    """
+    Solves the inpainting problem on an image too large for a single solve, by splitting it into
+    overlapping tiles which are solved independently with InPainter, optionally in a process pool,
+    and blended back with a window decaying to zero over the overlap. The SVDs, and so the memory
+    and time per solve, only depend on the tile size. In the pool, at most twice as many tiles as
+    workers are submitted at once, and every solution is blended as soon as it completes, so the
+    tiles in flight are bounded by the number of workers rather than by the image size.
+    Parameters:
+        image                 An instance of MaskedImage, to be inpainted
+        tile_size             Size of the square tiles (Default: 256)
+        overlap               Number of pixels shared by neighbouring tiles (Default: 32)
+        workers               Number of worker processes, 0 to solve the tiles in this process (Default: 0)
+        **options             Parameters of InPainter (max_it, tol, tol_bregman, shrinkage, ...)
+    Public Methods:
+        run                   Runs the algorithm on every tile and blends the results
+    Private Methods:
+        starts                Computes the starting indices of the tiles along an axis
+        blend                 Accumulates the weighted tile solutions, see blending_window
+    """
+
+    def __init__(self,
+                 image: MaskedImage,
+                 tile_size: int = 256,
+                 overlap: int = 32,
+                 workers: int = 0,
+                 **options: Any) -> None:
+        if not 0 <= overlap < tile_size:
+            raise ValueError("The overlap should be non-negative and smaller than the tile size")
+        self.__image: MaskedImage = image
+        self.__tile_size: int = tile_size
+        self.__overlap: int = overlap
+        self.__workers: int = workers
+        self.__options: Dict[str, Any] = options
+
+    def __starts(self, length: int) -> List[int]:
+        """ @private
+        Computes the starting indices of the tiles along an axis of the given length
+        """
+        if length <= self.__tile_size:
+            return [0]
+        step: int = self.__tile_size - self.__overlap
+        starts: List[int] = list(range(0, length - self.__tile_size, step))
+        return starts + [length - self.__tile_size]
+
+    def run(self, rho: float, lamb: float, alpha_static: bool, bregman: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray, float]:
+        """ @public
+        Run the InPainter on every tile, returns the blended solution, the number of iterations
+        of every tile and the total time
+        """
+        image: np.ndarray = self.__image.get_image()
+        mask: np.ndarray = self.__image.mask
+        N, M = image.shape[:2]
+        tiles: List[Tuple[int, int, int, int]] = [(i, min(i + self.__tile_size, N), j, min(j + self.__tile_size, M))
+                                                  for i in self.__starts(N) for j in self.__starts(M)]
+        jobs = ((image[i0:i1, j0:j1], mask[i0:i1, j0:j1], self.__options,
+                 rho, lamb, alpha_static, bregman) for (i0, i1, j0, j1) in tiles)
+
+        start = time()
+
+        if self.__workers > 0:
+            with ProcessPoolExecutor(self.__workers) as pool:
+                results = bounded_map(pool, solve_tile, jobs, 2 * self.__workers)
+                solution, iterations = self.__blend(tiles, results, image.shape)
+        else:
+            solution, iterations = self.__blend(tiles, enumerate(map(solve_tile, jobs)), image.shape)
+
+        return solution, iterations, time() - start
+
+    def __blend(self, tiles: List[Tuple[int, int, int, int]], results: Iterable[Tuple[int, Tuple[np.ndarray, int]]],
+                shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """ @private
+        Accumulates the weighted tile solutions as they arrive, as pairs of the index of their tile and
+        their result, in any order, and normalises by the total weight
+        """
+        N, M = shape[:2]
+        solution: np.ndarray = np.zeros(shape, dtype=self.__image.get_image().dtype)
+        weights: np.ndarray = np.zeros((N, M, 1), dtype=solution.dtype)
+        iterations: np.ndarray = np.zeros(len(tiles), dtype=int)
+        for index, (tile, its) in results:
+            i0, i1, j0, j1 = tiles[index]
+            window: np.ndarray = np.outer(blending_window(i0, i1, N, self.__overlap),
+                                          blending_window(j0, j1, M, self.__overlap))[..., None]
+            solution[i0:i1, j0:j1] += window * tile
+            weights[i0:i1, j0:j1] += window
+            iterations[index] = its
+        return solution / weights, iterations
+
+
+def blending_window(start: int, stop: int, length: int, overlap: int) -> np.ndarray:
+    """
+    Computes the blending weights of the range [start, stop) of an axis of the given length, which ramp
+    up as sin^2 over overlap pixels on the sides inside the axis, the range being wider than overlap
+    on these sides. Weights of ranges overlapping by overlap pixels sum to one.
+    """
+    weights: np.ndarray = np.ones(stop - start)
+    ramp: np.ndarray = np.sin(np.pi / 2 * (np.arange(overlap) + 0.5) / max(overlap, 1)) ** 2
+    if start > 0:
+        weights[:overlap] = ramp
+    if stop < length:
+        weights[stop - start - overlap:] = ramp[::-1]
+    return weights
+
+
+def bounded_map(pool: Executor, function: Callable[[Any], Any], jobs: Iterable[Any],
+                limit: int) -> Iterator[Tuple[int, Any]]:
+    """
+    Maps function over the jobs in the pool, yielding the pairs of the index of a job and its result
+    as they complete. At most limit jobs are submitted at once, the next ones being only taken from
+    jobs, which may be a generator, as results are consumed.
+    """
+    pending: Dict[Future, int] = {}
+    for index, job in enumerate(jobs):
+        if len(pending) >= limit:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+        pending[pool.submit(function, job)] = index
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
+
+
+def solve_tile(job: Tuple[np.ndarray, np.ndarray, Dict[str, Any], float, float, bool, bool]) -> Tuple[np.ndarray, int]:
+    """
+    Solves the inpainting problem on a single tile, given its image, mask, the parameters of
+    InPainter and those of InPainter.run. Defined at module level to be usable by a process pool.
+    """
+    image, mask, options, rho, lamb, alpha_static, bregman = job
+    painter: InPainter = InPainter(MaskedImage.from_arrays(image, mask), **options)
+    solution, its, _, _ = painter.run(rho, lamb, alpha_static, bregman, recorder=Recorder(every=0))
+    return solution, its
@@ -2,13 +2,45 @@
 # encoding: utf-8
 """
 __init__.py - __init__ file for the inpainter module
+The solver is imported eagerly, see solver.py, while the experiments, plots and metrics are only
+imported when first accessed, and matplotlib, tabulate and tqdm when first used, see lazy.py
 ~ Daniel Cortild, 26 November 2022
 """
 
-from .Image import Image, MaskedImage, DeletedImage
-from .Algorithm import Algorithm
-from .InPainter import InPainter
-from .Experiment import ExperimentRho as ExpRho, \
-                        ExperimentRatio as ExpRatio, \
-                        ExperimentLambda as ExpLambda
-from .convergence import plot_convergence
+# Standard Imports
+from importlib import import_module
+from typing import Any, Dict, Tuple
+
+# Internal Imports
+from .solver import Image, MaskedImage, DeletedImage, Algorithm, LowRank, Autotuner, SVD_BACKENDS, Shrinkage, \
+                    RandomizedShrinkage, SubspaceShrinkage, LanczosShrinkage, svd_shrink, tsvd_shrink, Recorder, \
+                    HistoryRecorder, RingRecorder, DiskRecorder, Profiler, SolveCache, Checkpoint, InPainter, \
+                    BatchInPainter, TiledInPainter, PyramidInPainter, EditSession, masks
+
+# Lazily imported names, with their module and name in the module
+_LAZY: Dict[str, Tuple[str, str]] = {
+    "ExpRho": (".Experiment", "ExperimentRho"),
+    "ExpRatio": (".Experiment", "ExperimentRatio"),
+    "ExpLambda": (".Experiment", "ExperimentLambda"),
+    "HyperbandSearch": (".Search", "HyperbandSearch"),
+    "plot_convergence": (".convergence", "plot_convergence"),
+    "psnr": (".metrics", "psnr"),
+    "ssim": (".metrics", "ssim"),
+    "precision_report": (".metrics", "precision_report"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports the lazily imported names on first access
+    """
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _LAZY[name]
+    value: Any = getattr(import_module(module, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted([*globals(), *_LAZY])
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+backends.py - Implements the registry of SVD backends and the Autotuner selecting the fastest one
+              for every shape and type of matrix on the current machine
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import json
+import os
+import platform
+import tempfile
+import warnings
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# External Imports
+import numpy as np
+import scipy as sp
+import scipy.linalg
+
+# Triplets (U, S, VT) of a thin SVD, possibly truncated to the singular values above a floor
+SVDTriplets = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Environment variables setting the number of BLAS threads, which changes the fastest backend
+BLAS_THREAD_VARIABLES: Tuple[str, ...] = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# Environment variable overriding the JSON file in which AUTOTUNER caches its choices, "off" disabling
+# its tuning and its cache
+SVD_CACHE_VARIABLE: str = "INPAINTER_SVD_CACHE"
+
+# Default JSON file in which AUTOTUNER caches its choices
+SVD_CACHE_PATH: str = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                   "inpainter", "svd_backends.json")
+
+# Relative accuracy of the singular values kept by gram_svd, at most the square root of the precision
+GRAM_ACCURACY: float = 1e-5
+
+
+def lapack_svd(driver: str) -> Callable[[np.ndarray, float], SVDTriplets]:
+    """
+    Returns the thin SVD of scipy with the given LAPACK driver, gesdd or gesvd, as a backend
+    """
+    def backend(matrix: np.ndarray, floor: float = 0) -> SVDTriplets:
+        return sp.linalg.svd(matrix, full_matrices=False, lapack_driver=driver, check_finite=False)
+    return backend
+
+
+def numpy_svd(matrix: np.ndarray, floor: float = 0) -> SVDTriplets:
+    """
+    Computes the thin SVD of a matrix with numpy
+    """
+    return np.linalg.svd(matrix, full_matrices=False)
+
+
+def gram_svd(matrix: np.ndarray, floor: float = 0) -> SVDTriplets:
+    """
+    Computes the singular triplets of a matrix with singular value above floor, from the eigenpairs
+    of its smaller Gram matrix, the other singular vectors being the image of the eigenvectors.
+    Squaring the matrix squares its condition number: a singular value s is computed with a relative
+    error of about eps * (s_max / s)^2. As an accuracy guard, checked on every matrix, the exact SVD
+    is computed instead if a kept singular value would have a relative error above min(sqrt(eps),
+    GRAM_ACCURACY), i.e. below s_max * eps^(1/4) in double precision and s_max / 9 in single precision.
+    """
+    eps: float = float(np.finfo(matrix.dtype).eps)
+    accuracy: float = min(np.sqrt(eps), GRAM_ACCURACY)
+    transpose: bool = matrix.shape[0] > matrix.shape[1]
+    A: np.ndarray = matrix.conj().T if transpose else matrix
+    # The divide and conquer driver computing all the eigenpairs is faster than selecting them by value
+    eigenvalues, U = sp.linalg.eigh(A @ A.conj().T, driver="evd", check_finite=False)
+    r: int = int(np.count_nonzero(eigenvalues > floor ** 2))
+    S: np.ndarray = np.sqrt(eigenvalues[:-r - 1:-1]) if r > 0 else eigenvalues[:0]
+    U = U[:, :-r - 1:-1]
+    if S.size > 0 and S[-1] < np.sqrt(eps / accuracy) * S[0]:
+        return lapack_svd("gesdd")(matrix, floor)
+    VT: np.ndarray = (U.conj().T @ A) / S[:, None]
+    return (VT.conj().T, S, U.conj().T) if transpose else (U, S, VT)
+
+
+# Backends, in the order in which they are tried, the usually fastest first as a tuning may run out of time
+SVD_BACKENDS: Dict[str, Callable[[np.ndarray, float], SVDTriplets]] = {
+    "gesdd": lapack_svd("gesdd"),
+    "gram": gram_svd,
+    "numpy": numpy_svd,
+    "gesvd": lapack_svd("gesvd"),
+}
+
+
+class Autotuner:
+    """
+    Selects the SVD backend of every shape and type of matrix. Tuning decomposes a matrix by every
+    candidate backend, and keeps the fastest one whose shrunken matrix agrees with that of gesdd up to
+    half of the significant digits for all the matrices of its shape and type. It happens transparently
+    in svd, on the first matrix of every shape and type, within a time budget: the candidates left once
+    it is spent are not tried, and the first matrix is decomposed by gesdd, whose triplets are reused
+    if it wins. tune does it without budget, for instance tune(fold(Z, axis)) for both axes of an image
+    Z, or python -m benchmarks.benchmark --tune. The choices are cached in a JSON file, per machine,
+    library versions and number of BLAS threads, so the tuning only happens once. A backend may also
+    be forced.
+    Parameters:
+        path                  JSON file caching the choices, None to keep them in memory, as is done with a
+                              warning if the file cannot be written (Default: None)
+        candidates            Names of the backends tried, see SVD_BACKENDS (Default: all of them)
+        repeats               Number of timings of every candidate, the best being kept (Default: 3)
+        backend               Name of a backend to use for every matrix, None to use the tuned ones
+                              (Default: None)
+        default               Name of the backend of the shapes which were not tuned (Default: "gesdd")
+        budget                Time, in seconds, of the tuning of a shape by svd, 0 never to tune there, in
+                              which case the shapes which were not tuned use the default backend (Default: 0.5)
+    Public Methods:
+        select                Returns the name of the backend of a matrix
+        tune                  Times the candidate backends on a matrix and stores the fastest
+        svd                   Computes the SVD of a matrix with the selected backend, tuning it first if needed
+    Private Methods:
+        key                   Returns the key of the shape and type of a matrix
+        time                  Times the candidate backends on a matrix within a budget
+        fingerprint           Returns the key of the machine in the cache file
+        read                  Reads the cache file
+        load                  Loads the choices of this machine from the cache file
+        save                  Merges the choices into the cache file
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 candidates: Optional[Sequence[str]] = None,
+                 repeats: int = 3,
+                 backend: Optional[str] = None,
+                 default: str = "gesdd",
+                 budget: float = 0.5) -> None:
+        for name in [*(candidates or []), *([backend] if backend else []), default]:
+            if name not in SVD_BACKENDS:
+                raise ValueError(f"Unknown SVD backend '{name}', expected one of {list(SVD_BACKENDS)}")
+        self.path: Optional[str] = path
+        self.candidates: List[str] = list(candidates or SVD_BACKENDS)
+        self.repeats: int = repeats
+        self.backend: Optional[str] = backend
+        self.default: str = default
+        self.budget: float = budget
+        self.choices: Dict[str, str] = {}
+        self.__loaded: bool = False
+
+    @staticmethod
+    def __key(matrix: np.ndarray) -> str:
+        """ @private
+        Returns the key of the shape and type of a matrix
+        """
+        return f"{matrix.shape[0]}x{matrix.shape[1]} {matrix.dtype.name}"
+
+    @staticmethod
+    def __fingerprint() -> str:
+        """ @private
+        Returns the key of the machine, library versions and BLAS threads in the cache file
+        """
+        return json.dumps({"machine": platform.machine(), "processor": platform.processor(),
+                           "cpus": os.cpu_count(), "numpy": np.__version__, "scipy": sp.__version__,
+                           **{name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}}, sort_keys=True)
+
+    def __read(self) -> Dict[str, Dict[str, str]]:
+        """ @private
+        Reads the cache file, empty if missing or unreadable
+        """
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def __load(self) -> None:
+        """ @private
+        Loads the choices of this machine from the cache file, once
+        """
+        if not self.__loaded and self.path is not None:
+            self.choices = {**self.__read().get(self.__fingerprint(), {}), **self.choices}
+        self.__loaded = True
+
+    def __save(self) -> None:
+        """ @private
+        Merges the choices of this machine into the cache file, atomically. A cache file which cannot be
+        written, such as in a read-only home directory, is warned about once, the choices then being kept
+        in memory only.
+        """
+        if self.path is None:
+            return
+        cache: Dict[str, Dict[str, str]] = self.__read()
+        cache[self.__fingerprint()] = {**cache.get(self.__fingerprint(), {}), **self.choices}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.path)))
+            try:
+                with os.fdopen(descriptor, "w") as file:
+                    json.dump(cache, file, indent=2)
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.remove(temporary)
+                raise
+        except OSError as error:
+            warnings.warn(f"The SVD backends cannot be cached in {self.path}, they are kept in memory: {error}",
+                          RuntimeWarning)
+            self.path = None
+
+    def __time(self, matrix: np.ndarray, floor: float, budget: float) -> Tuple[str, SVDTriplets]:
+        """ @private
+        Times the candidate backends on a matrix, keeping the triplets above floor, until budget seconds
+        are spent, and stores the fastest accurate one for its shape and type, in the cache file if any.
+        A candidate slower than twice the fastest so far is only timed once. Returns the name of the
+        backend and the triplets of gesdd, computed as reference.
+        """
+        self.__load()
+        start: float = perf_counter()
+        triplets: SVDTriplets = SVD_BACKENDS["gesdd"](matrix, floor)
+        timings: Dict[str, List[float]] = {"gesdd": [perf_counter() - start]}
+        U, S, VT = triplets
+        r: int = int(np.count_nonzero(S > floor))
+        reference: np.ndarray = (U[:, :r] * (S[:r] - floor)) @ VT[:r]
+        tolerance: float = np.sqrt(np.finfo(matrix.dtype).eps) * max(float(np.linalg.norm(reference)), 1)
+        best: Tuple[float, str] = (np.inf, "gesdd")
+        for name in self.candidates:
+            times: List[float] = timings.get(name, [])
+            while len(times) < self.repeats and (not times or times[0] < 2 * best[0]) \
+                    and perf_counter() - start < budget:
+                begin: float = perf_counter()
+                U, S, VT = SVD_BACKENDS[name](matrix, floor)
+                times.append(perf_counter() - begin)
+            if not times:
+                continue
+            r = int(np.count_nonzero(S > floor))
+            if name == "gesdd" or np.linalg.norm((U[:, :r] * (S[:r] - floor)) @ VT[:r] - reference) <= tolerance:
+                best = min(best, (min(times), name))
+        self.choices[self.__key(matrix)] = best[1]
+        self.__save()
+        return best[1], triplets
+
+    def tune(self, matrix: np.ndarray, floor: float = 0) -> str:
+        """ @public
+        Times all the candidate backends on a matrix, keeping the triplets above floor, and stores the
+        fastest accurate one for its shape and type, in the cache file if any
+        """
+        return self.__time(matrix, floor, np.inf)[0]
+
+    def select(self, matrix: np.ndarray) -> str:
+        """ @public
+        Returns the name of the backend of a matrix, the default one if its shape and type were not tuned,
+        which svd does on first use
+        """
+        if self.backend is not None:
+            return self.backend
+        self.__load()
+        return self.choices.get(self.__key(matrix), self.default)
+
+    def svd(self, matrix: np.ndarray, floor: float = 0) -> SVDTriplets:
+        """ @public
+        Computes the singular triplets of a matrix, at least those with singular value above floor,
+        with the selected backend, the first matrix of a shape and type tuning it within the budget
+        """
+        if self.backend is None and self.budget > 0:
+            self.__load()
+            if self.__key(matrix) not in self.choices:
+                name, triplets = self.__time(matrix, floor, self.budget)
+                if name == "gesdd":
+                    return triplets
+        return SVD_BACKENDS[self.select(matrix)](matrix, floor)
+
+
+def make_autotuner(setting: Optional[str] = None) -> Autotuner:
+    """
+    Returns the Autotuner of the shrinkage operators for a value of SVD_CACHE_VARIABLE: caching its
+    choices in SVD_CACHE_PATH if unset or empty, in the given file otherwise, and neither tuning nor
+    caching if "off"
+    """
+    if setting == "off":
+        return Autotuner(budget=0)
+    return Autotuner(path=setting or SVD_CACHE_PATH)
+
+
+# Autotuner used by the shrinkage operators, see make_autotuner
+AUTOTUNER: Autotuner = make_autotuner(os.environ.get(SVD_CACHE_VARIABLE))
+
+
+def svd(matrix: np.ndarray, floor: float = 0) -> SVDTriplets:
+    """
+    Computes the singular triplets of a matrix, at least those with singular value above floor,
+    with the backend selected by AUTOTUNER
+    """
+    return AUTOTUNER.svd(matrix, floor)
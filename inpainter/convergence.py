@@ -5,65 +5,98 @@ convergence.py - Implements a function that plots several convergence plots
 ~ Daniel Cortild, 26 November 2022
 """
 
+# Standard Imports
+from typing import Dict, List, Optional, Tuple, Union
 
 # External Imports
-import matplotlib.pyplot as plt  # type: ignore
 import numpy as np
-from typing import List
 
+# Internal Imports
+from .lazy import pyplot
+from .Recorder import Recorder
+from .types import ConvergenceDict
 
-def plot_convergence(hist_static: List[np.ndarray], hist_inertial: List[np.ndarray], image) -> None:
+# History of a run, either its recorder or the metrics returned by its get_metrics
+History = Union[Recorder, ConvergenceDict]
+
+
+def convergence_curves(history: History,
+                       image: Optional[np.ndarray] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the iterations and values of the curves "fpr", "error", "psnr" and "ssim" available in
+    a history. The errors of a recorder to an image other than its reference are computed from its
+    snapshots.
+    """
+    metrics: ConvergenceDict = history.get_metrics() if isinstance(history, Recorder) else history
+    curves: Dict[str, Tuple[np.ndarray, np.ndarray]] = {"fpr": (metrics["iterations"], metrics["fpr"])}
+    if isinstance(history, Recorder) and image is not None and not history.has_reference(image):
+        curves["error"] = history.get_errors(image)
+        return curves
+    for key in ("error", "psnr", "ssim"):
+        if metrics[key] is not None:
+            curves[key] = (metrics["iterations"], metrics[key])
+    return curves
+
+
+def residual_label(history: History) -> str:
+    """
+    Returns the label of the fixed-point residuals of a history, taken at the iterates z_k unless its
+    recorder was at_inertial, see Recorder, in which case they are taken at the inertial variables u_k
+    """
+    point: str = history.point if isinstance(history, Recorder) else "z"
+    return f"|{point}_k-T{point}_k|^2"
+
+
+def plot_convergence(hist_static: History, hist_inertial: History, image: Optional[np.ndarray] = None) -> None:
     """
-    Create plots for convergence analysis
+    Create plots for convergence analysis, from the recorders of the runs or directly from the
+    arrays of their metrics. The errors to image are plotted if both histories provide them, as are
+    the PSNR and SSIM to the reference. The fixed-point residuals of an inertial run are those of its
+    iterates, which compare with those of the static run, unless it was recorded at_inertial, in which
+    case they are those of its inertial variables, and are labelled accordingly.
     """
-    # Compute the convergence rates
-    conv_static = [np.linalg.norm(z - Tz)**2 for z, Tz in zip(hist_static["Z"], hist_static["TZ"])]
-    conv_inertial = [np.linalg.norm(z - Tz)**2 for z, Tz in zip(hist_inertial["Z"], hist_inertial["TZ"])]
-    conv_exact_static = [np.linalg.norm(Tz - image)**2 for Tz in hist_static["TZ"]]
-    conv_exact_inertial = [np.linalg.norm(Tz - image)**2 for Tz in hist_inertial["TZ"]]
+    # Gather the convergence rates
+    static = convergence_curves(hist_static, image)
+    inertial = convergence_curves(hist_inertial, image)
+    labels: Dict[str, Tuple[str, str]] = {"fpr": (residual_label(hist_static), residual_label(hist_inertial)),
+                                          "error": ("|Tz_k-z^*|^2", "|Tz_k-z^*|^2")}
+    quantities = [(key, labels[key]) for key in ("fpr", "error") if key in static and key in inertial]
+    quality = [(key, label) for key, label in (("psnr", "PSNR (dB)"), ("ssim", "SSIM"))
+               if key in static and key in inertial]
 
     # Plot Converge of Solutions
-    fig, axs = plt.subplots(2, 2, figsize=(11, 8), dpi=300)
+    plt = pyplot()
+    rows: int = len(quantities) + (1 if quality else 0)
+    fig, axs = plt.subplots(rows, 2, figsize=(11, 4 * rows), dpi=300, squeeze=False)
     fig.suptitle("Convergence of Solutions", fontsize=16, y=1.04)
 
-    # First Plot
-    axs[0, 0].title.set_text("Convergence of $|z_k-Tz_k|^2$")
-    axs[0, 0].set_xlabel("Iteration ($k$)")
-    axs[0, 0].set_ylabel(f"$|z_k-Tz_k|^2$")
-    axs[0, 0].set_yscale('log')
-    axs[0, 0].plot(np.arange(len(conv_static))+1, conv_static, label="Static Iterations", color="g")
-    axs[0, 0].plot(np.arange(len(conv_inertial))+1, conv_inertial, label="Inertial Iterations", color="b")
-    axs[0, 0].legend()
+    # Convergence of a quantity, and of the quantity times k
+    for row, (key, (label_static, label_inertial)) in enumerate(quantities):
+        for column, scaled in enumerate((False, True)):
+            names: List[str] = [f"k{label}" if scaled else label for label in (label_static, label_inertial)]
+            # Quantities differing between the runs are named in the legend
+            name: str = f"${names[0]}$" if names[0] == names[1] else "$k$ times the residuals" if scaled \
+                else "the residuals"
+            axs[row, column].title.set_text(f"Convergence of {name}")
+            axs[row, column].set_xlabel("Iteration ($k$)")
+            axs[row, column].set_ylabel(name)
+            axs[row, column].set_yscale('log')
+            for curves, title, color, curve in ((static, "Static Iterations", "g", names[0]),
+                                                (inertial, "Inertial Iterations", "b", names[1])):
+                its, values = curves[key]
+                title = title if names[0] == names[1] else f"{title}, ${curve}$"
+                axs[row, column].plot(its, np.multiply(its, values) if scaled else values, label=title, color=color)
+            axs[row, column].legend()
 
-    # Second Plot
-    axs[0, 1].title.set_text("Convergence of $k|z_k-Tz_k|^2$")
-    axs[0, 1].set_xlabel("Iteration ($k$)")
-    axs[0, 1].set_ylabel(f"$k|z_k-Tz_k|^2$")
-    axs[0, 1].set_yscale('log')
-    axs[0, 1].plot(np.arange(len(conv_static))+1, np.multiply(np.arange(len(conv_static))+1, conv_static), 
-                label="Static Iterations", color="g")
-    axs[0, 1].plot(np.arange(len(conv_inertial))+1, np.multiply(np.arange(len(conv_inertial))+1, conv_inertial), 
-                label="Inertial Iterations", color="b")
-    axs[0, 1].legend()
-    
-    # Third Plot
-    axs[1, 0].title.set_text("Convergence of $|Tz_k-z^*|^2$")
-    axs[1, 0].set_xlabel("Iteration ($k$)")
-    axs[1, 0].set_ylabel(f"$|Tz_k-z^*|^2$")
-    axs[1, 0].set_yscale('log')
-    axs[1, 0].plot(np.arange(len(conv_exact_static))+1, conv_exact_static, label="Static Iterations", color="g")
-    axs[1, 0].plot(np.arange(len(conv_exact_inertial))+1, conv_exact_inertial, label="Inertial Iterations", color="b")
-    axs[1, 0].legend()
-    
-    # Fourth Plot
-    axs[1, 1].title.set_text("Convergence of $k|Tz_k-z^*|^2$")
-    axs[1, 1].set_xlabel("Iteration ($k$)")
-    axs[1, 1].set_ylabel(f"$k|Tz_k-z^*|^2$")
-    axs[1, 1].set_yscale('log')
-    axs[1, 1].plot(np.arange(len(conv_exact_static))+1, np.multiply(np.arange(len(conv_exact_static))+1, conv_exact_static), 
-                label="Static Iterations", color="g")
-    axs[1, 1].plot(np.arange(len(conv_exact_inertial))+1, np.multiply(np.arange(len(conv_exact_inertial))+1, conv_exact_inertial), 
-                label="Inertial Iterations", color="b")
-    axs[1, 1].legend()
+    # Quality of the images with respect to the reference
+    for column, (key, label) in enumerate(quality):
+        axs[-1, column].title.set_text(f"{label.split()[0]} of $Tz_k$")
+        axs[-1, column].set_xlabel("Iteration ($k$)")
+        axs[-1, column].set_ylabel(label)
+        axs[-1, column].plot(*static[key], label="Static Iterations", color="g")
+        axs[-1, column].plot(*inertial[key], label="Inertial Iterations", color="b")
+        axs[-1, column].legend()
+    if len(quality) == 1:
+        axs[-1, 1].set_axis_off()
 
-    plt.show()
\ No newline at end of file
+    plt.show()
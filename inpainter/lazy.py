@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+lazy.py - Implements the lazy loading of the plotting, tabulation and progress bar dependencies, so
+          that solving an image does not import them
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Iterable
+
+# Configuration of matplotlib, applied when it is first loaded
+RC_PARAMS: dict = {'axes.facecolor': 'white'}
+
+
+def pyplot() -> Any:
+    """
+    Returns matplotlib.pyplot, imported and configured with RC_PARAMS on the first call
+    """
+    import matplotlib.pyplot as plt     # type: ignore
+    if not getattr(plt, "_inpainter_configured", False):
+        plt.rcParams.update(RC_PARAMS)
+        plt._inpainter_configured = True
+    return plt
+
+
+def tabulate(*args: Any, **kwargs: Any) -> str:
+    """
+    Formats a table with tabulate.tabulate, imported on the first call
+    """
+    from tabulate import tabulate as format_table       # type: ignore
+    return format_table(*args, **kwargs)
+
+
+def tqdm(iterable: Iterable, disable: bool = False, **kwargs: Any) -> Iterable:
+    """
+    Wraps an iterable in a tqdm.auto progress bar, only importing tqdm if the bar is displayed
+    """
+    if disable:
+        return iterable
+    from tqdm.auto import tqdm as progress_bar          # type: ignore
+    return progress_bar(iterable, **kwargs)
+
+
+def trange(n: int, disable: bool = False, **kwargs: Any) -> Iterable[int]:
+    """
+    Returns range(n) wrapped in a progress bar, see tqdm
+    """
+    return tqdm(range(n), disable=disable, **kwargs)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+masks.py - Implements vectorised and seedable generators of masks, batched edits of masks and
+           their storage as packed files
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Sequence, Tuple, Union
+
+# External Imports
+import numpy as np
+
+# Seed or generator of the random numbers of a mask, None drawing the seed from the global numpy state
+Seed = Union[None, int, np.random.Generator]
+
+
+def make_rng(seed: Seed = None) -> np.random.Generator:
+    """
+    Returns a generator from a seed, or the generator itself. Without seed, the seed is drawn from
+    the global random state, so that np.random.seed still makes the masks reproducible.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed if seed is not None else np.random.randint(2 ** 31))
+
+
+def random_pixels(shape: Tuple[int, int], erase_ratio: float, seed: Seed = None) -> np.ndarray:
+    """
+    Creates an (N, M) mask erasing exactly int(N * M * erase_ratio) pixels drawn uniformly at random
+    """
+    rng: np.random.Generator = make_rng(seed)
+    size: int = shape[0] * shape[1]
+    mask: np.ndarray = np.ones(size, dtype=np.uint8)
+    mask[rng.choice(size, int(size * erase_ratio), replace=False)] = 0
+    return mask.reshape(shape)
+
+
+def erase_blocks(mask: np.ndarray, blocks: np.ndarray) -> np.ndarray:
+    """
+    Erases a batch of rectangular blocks from a mask in a single pass, every row of the (B, 4) array
+    blocks being the pixel bounds (top, bottom, left, right) of a block, bottom and right excluded.
+    The corners of the blocks are accumulated in a difference array, whose 2D cumulative sum counts
+    the blocks covering every pixel.
+    """
+    N, M = mask.shape
+    blocks = np.asarray(blocks, dtype=np.intp).reshape(-1, 4)
+    top, bottom = np.clip(blocks[:, 0], 0, N), np.clip(blocks[:, 1], 0, N)
+    left, right = np.clip(blocks[:, 2], 0, M), np.clip(blocks[:, 3], 0, M)
+    corners: np.ndarray = np.zeros((N + 1, M + 1), dtype=np.int32)
+    np.add.at(corners, (top, left), 1)
+    np.add.at(corners, (top, right), -1)
+    np.add.at(corners, (bottom, left), -1)
+    np.add.at(corners, (bottom, right), 1)
+    covered: np.ndarray = np.cumsum(np.cumsum(corners, axis=0), axis=1)[:N, :M] > 0
+    return np.where(covered, 0, mask).astype(mask.dtype, copy=False)
+
+
+def random_blocks(shape: Tuple[int, int], count: int, min_size: float = 0.05, max_size: float = 0.2,
+                  seed: Seed = None) -> np.ndarray:
+    """
+    Creates an (N, M) mask erasing count blocks placed uniformly at random, whose sides are fractions
+    of the image sides drawn uniformly in [min_size, max_size]
+    """
+    rng: np.random.Generator = make_rng(seed)
+    sides: np.ndarray = (rng.uniform(min_size, max_size, size=(count, 2)) * shape).astype(np.intp)
+    corners: np.ndarray = (rng.random((count, 2)) * (np.array(shape) - sides + 1)).astype(np.intp)
+    blocks: np.ndarray = np.column_stack((corners[:, 0], corners[:, 0] + sides[:, 0],
+                                          corners[:, 1], corners[:, 1] + sides[:, 1]))
+    return erase_blocks(np.ones(shape, dtype=np.uint8), blocks)
+
+
+def strokes(shape: Tuple[int, int], count: int, width: float = 5, segments: int = 4,
+            max_length: float = 0.2, seed: Seed = None) -> np.ndarray:
+    """
+    Creates an (N, M) mask erasing count brush strokes of the given width in pixels, every stroke being
+    a random walk of segments straight segments of length at most max_length times the smallest side.
+    The segments are sampled at every pixel, and thickened by a distance transform.
+    """
+    from scipy.ndimage import distance_transform_edt
+    rng: np.random.Generator = make_rng(seed)
+    N, M = shape
+    length: float = max_length * min(shape)
+    steps: np.ndarray = rng.uniform(0.3, 1, size=(count, segments, 1)) * length
+    angles: np.ndarray = rng.uniform(0, 2 * np.pi, size=(count, 1)) + \
+        np.cumsum(rng.normal(0, np.pi / 4, size=(count, segments)), axis=1)
+    directions: np.ndarray = np.stack((np.sin(angles), np.cos(angles)), axis=-1) * steps
+    starts: np.ndarray = rng.random((count, 1, 2)) * shape
+    vertices: np.ndarray = np.concatenate((starts, starts + np.cumsum(directions, axis=1)), axis=1)
+
+    # Sample every segment at every pixel of its length
+    t: np.ndarray = np.linspace(0, 1, int(np.ceil(length)) + 1)[:, None]
+    points: np.ndarray = vertices[:, :-1, None] + t * (vertices[:, 1:, None] - vertices[:, :-1, None])
+    points = np.rint(points.reshape(-1, 2)).astype(np.intp)
+    points = points[(points[:, 0] >= 0) & (points[:, 0] < N) & (points[:, 1] >= 0) & (points[:, 1] < M)]
+    centre: np.ndarray = np.ones(shape, dtype=bool)
+    centre[points[:, 0], points[:, 1]] = False
+    if not np.any(~centre):
+        return np.ones(shape, dtype=np.uint8)
+    return (distance_transform_edt(centre) > width / 2).astype(np.uint8)
+
+
+def text(shape: Tuple[int, int], message: str = "Lorem ipsum dolor sit amet", font_size: int = 20,
+         spacing: float = 2, seed: Seed = None) -> np.ndarray:
+    """
+    Creates an (N, M) mask erasing lines of text written over the image, one line every spacing
+    times the font size, each line repeating message from a random horizontal offset
+    """
+    from PIL import Image as ImagePIL, ImageDraw, ImageFont     # type: ignore
+    rng: np.random.Generator = make_rng(seed)
+    N, M = shape
+    canvas = ImagePIL.new("L", (M, N), 255)
+    draw = ImageDraw.Draw(canvas)
+    font = ImageFont.load_default(size=font_size)
+    line: str = " ".join([message] * (M // max(1, font_size * len(message) // 3) + 2))
+    rows: np.ndarray = np.arange(0, N, int(spacing * font_size)) + rng.integers(0, font_size, size=1)
+    for row, offset in zip(rows, rng.integers(0, font_size * len(message) // 2 + 1, size=rows.size)):
+        draw.text((-int(offset), int(row)), line, fill=0, font=font)
+    return (np.asarray(canvas) > 127).astype(np.uint8)
+
+
+def save_mask(path: str, mask: np.ndarray) -> None:
+    """
+    Saves a mask to a compressed .npz file, as a bitmask of one bit per pixel together with its shape
+    """
+    np.savez_compressed(path, packed=np.packbits(np.asarray(mask) != 0, axis=None), shape=np.shape(mask))
+
+
+def load_mask(path: str) -> np.ndarray:
+    """
+    Loads an (N, M) mask saved by save_mask, or by MaskedImage.save_mask
+    """
+    with np.load(path) as data:
+        shape: Sequence[int] = tuple(data["shape"])
+        return np.unpackbits(data["packed"], count=int(np.prod(shape))).reshape(shape)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+metrics.py - Implements the validation of the solver precision, and exposes the image quality metrics
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Dict, List, Optional, Sequence
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from .lazy import tabulate
+from .quality import psnr, ssim
+from .Image import MaskedImage
+from .InPainter import InPainter
+from .Recorder import Recorder
+
+
+def precision_report(image: MaskedImage, rho: float, lamb: float, alpha_static: bool, bregman: bool = False,
+                     dtypes: Sequence[Any] = (np.float64, np.float32), verbose: bool = True,
+                     **options: Any) -> List[Dict[str, Any]]:
+    """
+    Solves the inpainting problem of image in every floating point type of dtypes, the first being
+    the reference, and reports the iterations, time, memory of an iterate, the PSNR with respect to
+    the original image and the PSNR with respect to the solution of the reference type
+    """
+    rows: List[Dict[str, Any]] = []
+    reference: Optional[np.ndarray] = None
+    for dtype in dtypes:
+        painter: InPainter = InPainter(image, dtype=dtype, **options)
+        solution, its, times, _ = painter.run(rho, lamb, alpha_static, bregman, recorder=Recorder(every=0))
+        reference = solution if reference is None else reference
+        rows.append({"dtype": np.dtype(dtype).name,
+                     "iterations": its,
+                     "time": times,
+                     "iterate MB": solution.nbytes / 2 ** 20,
+                     "PSNR original": psnr(solution, image.get_image()),
+                     f"PSNR {np.dtype(dtypes[0]).name}": psnr(solution, reference)})
+    if verbose:
+        print(tabulate([list(row.values()) for row in rows], headers=list(rows[0].keys())))
+    return rows
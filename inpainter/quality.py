@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+quality.py - Implements the image quality metrics, computed with numpy only so that the recorders
+             can evaluate them at every iteration
+~ Daniel Cortild, 16 October 2026
+"""
+
+# External Imports
+import numpy as np
+
+
+def psnr(image: np.ndarray, reference: np.ndarray, peak: float = 1) -> float:
+    """
+    Computes the peak signal-to-noise ratio, in dB, of an image with respect to a reference
+    """
+    mse: float = float(np.mean(np.square(np.asarray(image, dtype=np.float64) - reference)))
+    return np.inf if mse == 0 else 10 * np.log10(peak ** 2 / mse)
+
+
+def psnr_from_error(error: np.ndarray, size: int, peak: float = 1) -> np.ndarray:
+    """
+    Computes the peak signal-to-noise ratios, in dB, from the norms |x - x*| of the errors of
+    images of size entries, without the images themselves
+    """
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(peak ** 2 * size / np.square(error))
+
+
+def box_mean(image: np.ndarray, window: int) -> np.ndarray:
+    """
+    Computes the mean of every window x window block of the first two axes of an image, from the
+    2D cumulative sum of the image, for the blocks lying fully inside the image
+    """
+    sums: np.ndarray = np.zeros((image.shape[0] + 1, image.shape[1] + 1, *image.shape[2:]))
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=sums[1:, 1:])
+    return (sums[window:, window:] - sums[:-window, window:] - sums[window:, :-window] +
+            sums[:-window, :-window]) / window ** 2
+
+
+def ssim(image: np.ndarray, reference: np.ndarray, peak: float = 1, window: int = 7) -> float:
+    """
+    Computes the mean structural similarity of an image with respect to a reference, with uniform
+    window x window windows, every channel being compared separately
+    """
+    c1: float = (0.01 * peak) ** 2
+    c2: float = (0.03 * peak) ** 2
+    x: np.ndarray = np.asarray(image, dtype=np.float64)
+    y: np.ndarray = np.asarray(reference, dtype=np.float64)
+    mu_x, mu_y = box_mean(x, window), box_mean(y, window)
+    # Unbiased variances and covariance, as the usual implementations
+    correction: float = window ** 2 / (window ** 2 - 1)
+    var_x: np.ndarray = (box_mean(x * x, window) - mu_x * mu_x) * correction
+    var_y: np.ndarray = (box_mean(y * y, window) - mu_y * mu_y) * correction
+    cov: np.ndarray = (box_mean(x * y, window) - mu_x * mu_y) * correction
+    return float(np.mean((2 * mu_x * mu_y + c1) * (2 * cov + c2) /
+                         ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))))
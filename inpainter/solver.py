@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+solver.py - Solver-only import path of the inpainter module, for headless workers: it provides the
+            images, solvers, shrinkage engines and recorders without the experiments and plots
+~ Daniel Cortild, 16 October 2026
+"""
+
+from .Image import Image, MaskedImage, DeletedImage
+from .Algorithm import Algorithm
+from .LowRank import LowRank
+from .backends import Autotuner, SVD_BACKENDS
+from .Shrinkage import Shrinkage, RandomizedShrinkage, SubspaceShrinkage, LanczosShrinkage, svd_shrink, tsvd_shrink
+from .Recorder import Recorder, HistoryRecorder, RingRecorder, DiskRecorder
+from .Profiler import Profiler
+from .SolveCache import SolveCache
+from .Checkpoint import Checkpoint
+from .InPainter import InPainter
+from .BatchInPainter import BatchInPainter
+from .TiledInPainter import TiledInPainter
+from .PyramidInPainter import PyramidInPainter
+from .EditSession import EditSession
+from . import masks
@@ -6,7 +6,7 @@ types.py - File for custom types
 """
 
 # Standard Imports
-from typing import List, TypedDict
+from typing import List, Optional, Tuple, TypedDict
 
 # External Imports
 import numpy as np
@@ -16,6 +16,46 @@ import numpy as np
 class HistoryDict(TypedDict):
     Z: List[float]
     TZ: List[float]
+    FPR: List[float]
+
+
+# Dictionary for the convergence metrics computed online, None if not computed
+class ConvergenceDict(TypedDict):
+    iterations: np.ndarray
+    fpr: np.ndarray
+    error: Optional[np.ndarray]
+    psnr: Optional[np.ndarray]
+    ssim: Optional[np.ndarray]
+
+
+# Dictionary for a configuration evaluated by the hyperparameter search
+class TrialDict(TypedDict):
+    rho: float
+    lamb: float
+    alpha_static: bool
+    bregman: bool
+    iterations: int
+    residual: float
+    converged: bool
+    estimate: float
+    time: float
+
+
+# Dictionary for a progress record of a run, the solution only being set once done
+class ProgressDict(TypedDict):
+    iteration: int
+    residual: float
+    tol: float
+    preview: Optional[np.ndarray]
+    done: bool
+    solution: Optional[np.ndarray]
+
+
+# Dictionary for the report of a level of a pyramid
+class LevelDict(TypedDict):
+    size: Tuple[int, int]
+    iterations: int
+    time: float
 
 
 # Dictionary for Solution data
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+conftest.py - Fixtures shared by the tests
+~ Daniel Cortild, 16 October 2026
+"""
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, backends
+from inpainter.backends import Autotuner, SVD_CACHE_VARIABLE
+from inpainter.masks import random_pixels
+
+
+@pytest.fixture(autouse=True)
+def untuned(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Keeps the solves on the default SVD backend, so that they are deterministic and write no cache,
+    in the workers of the tests as well
+    """
+    monkeypatch.setenv(SVD_CACHE_VARIABLE, "off")
+    monkeypatch.setattr(backends, "AUTOTUNER", Autotuner(budget=0))
+
+
+@pytest.fixture
+def image() -> MaskedImage:
+    """
+    A small random image with half of its pixels erased
+    """
+    rng: np.random.Generator = np.random.default_rng(0)
+    return MaskedImage.from_arrays(rng.random((64, 64, 3)), random_pixels((64, 64), 0.5, seed=1))
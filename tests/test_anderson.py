@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_anderson.py - Tests the safeguarded Anderson acceleration of the KM iterations
+~ Daniel Cortild, 16 October 2026
+"""
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, HistoryRecorder, Recorder
+
+
+@pytest.mark.parametrize("anderson_type", [1, 2])
+def test_anderson_accelerates_the_iterations(image: MaskedImage, anderson_type: int) -> None:
+    _, plain_its, _, _ = InPainter(image, 200).run(1, 0.5, True, recorder=Recorder(every=0))
+    painter: InPainter = InPainter(image, 200, anderson=5, anderson_type=anderson_type)
+    _, its, _, history = painter.run(1, 0.5, True, recorder=HistoryRecorder())
+    assert its < plain_its
+    # The safeguard only keeps the accelerated steps that decrease the residual
+    assert np.all(np.diff(history["FPR"]) <= 0)
+
+
+def test_anderson_type(image: MaskedImage) -> None:
+    with pytest.raises(ValueError):
+        InPainter(image, anderson=5, anderson_type=3).run(1, 0.5, True, recorder=Recorder(every=0))
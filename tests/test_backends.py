@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_backends.py - Tests the accuracy guard of gram_svd and the tuning of the Autotuner
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import json
+from typing import Any, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import backends
+from inpainter.backends import Autotuner, gram_svd, lapack_svd, make_autotuner, numpy_svd
+
+
+def matrix_with_spectrum(S: np.ndarray, dtype: Any = np.float64) -> np.ndarray:
+    """
+    Returns a (2 * len(S), len(S)) matrix with the singular values S
+    """
+    rng: np.random.Generator = np.random.default_rng(0)
+    U: np.ndarray = np.linalg.qr(rng.standard_normal((2 * S.size, S.size)))[0]
+    V: np.ndarray = np.linalg.qr(rng.standard_normal((S.size, S.size)))[0]
+    return ((U * S) @ V.T).astype(dtype)
+
+
+@pytest.fixture
+def fallbacks(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """
+    Spies on the exact SVDs gram_svd falls back to, returning their drivers
+    """
+    drivers: List[str] = []
+
+    def spy(driver: str) -> Any:
+        drivers.append(driver)
+        return lapack_svd(driver)
+    monkeypatch.setattr(backends, "lapack_svd", spy)
+    return drivers
+
+
+@pytest.mark.parametrize("ratio", [0.1, 1e-3])
+def test_gram_accurate_above_the_guard(fallbacks: List[str], ratio: float) -> None:
+    S: np.ndarray = np.geomspace(10, 10 * ratio, 40)
+    matrix: np.ndarray = matrix_with_spectrum(S)
+    U, computed, VT = gram_svd(matrix)
+    # Kept singular values above s_max * eps^(1/4) have a relative error of at most sqrt(eps)
+    assert fallbacks == []
+    np.testing.assert_allclose(computed, S, rtol=np.sqrt(np.finfo(float).eps))
+    np.testing.assert_allclose((U * computed) @ VT, matrix, atol=1e-8)
+
+
+@pytest.mark.parametrize("dtype, ratio", [(np.float64, 1e-5), (np.float32, 1e-2)])
+def test_gram_falls_back_on_ill_conditioned(fallbacks: List[str], dtype: Any, ratio: float) -> None:
+    S: np.ndarray = np.geomspace(1, ratio, 40)
+    matrix: np.ndarray = matrix_with_spectrum(S, dtype)
+    _, computed, _ = gram_svd(matrix)
+    assert fallbacks == ["gesdd"]
+    np.testing.assert_allclose(computed, S, rtol=10 * np.sqrt(np.finfo(dtype).eps))
+
+
+def test_gram_only_guards_the_kept_values(fallbacks: List[str]) -> None:
+    S: np.ndarray = np.concatenate((np.linspace(10, 5, 20), np.geomspace(1e-3, 1e-9, 20)))
+    U, computed, VT = gram_svd(matrix_with_spectrum(S), floor=1)
+    assert fallbacks == []
+    np.testing.assert_allclose(computed, S[:20])
+    assert U.shape[1] == VT.shape[0] == 20
+
+
+def test_autotuner_tunes_on_first_use(tmp_path: Any) -> None:
+    path: str = str(tmp_path / "svd.json")
+    matrix: np.ndarray = matrix_with_spectrum(np.linspace(10, 1, 40))
+    tuner: Autotuner = Autotuner(path=path, candidates=["gesdd", "gram"], repeats=1, budget=np.inf)
+    assert tuner.select(matrix) == "gesdd" and tuner.choices == {}
+    U, S, VT = tuner.svd(matrix)
+    np.testing.assert_allclose((U * S) @ VT, matrix, atol=1e-10)
+    choice: str = tuner.choices["80x40 float64"]
+    assert tuner.select(matrix) == choice
+    assert Autotuner(path=path).select(matrix) == choice
+    with open(path) as file:
+        assert list(json.load(file).values()) == [{"80x40 float64": choice}]
+    assert Autotuner(backend="numpy").select(matrix) == "numpy"
+
+
+def test_autotuner_of_an_unwritable_cache(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    matrix: np.ndarray = matrix_with_spectrum(np.linspace(10, 1, 40))
+    # The directory of the cache file is a file, so it cannot be created
+    (tmp_path / "home").write_text("")
+    tuner: Autotuner = Autotuner(path=str(tmp_path / "home" / "svd.json"), candidates=["gesdd"], repeats=1)
+    with pytest.warns(RuntimeWarning):
+        tuner.svd(matrix)
+    assert tuner.path is None and tuner.choices == {"80x40 float64": "gesdd"}
+
+    # A write failing midway leaves no temporary file behind
+    def failing_dump(*args: Any, **kwargs: Any) -> None:
+        raise OSError("No space left on device")
+    monkeypatch.setattr(json, "dump", failing_dump)
+    full: Autotuner = Autotuner(path=str(tmp_path / "svd.json"), candidates=["gesdd"], repeats=1)
+    with pytest.warns(RuntimeWarning):
+        full.tune(matrix)
+    assert list(tmp_path.iterdir()) == [tmp_path / "home"]
+
+
+def test_autotuner_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    matrix: np.ndarray = matrix_with_spectrum(np.linspace(10, 1, 40))
+    timed: List[str] = []
+
+    def spy(name: str) -> Any:
+        def backend(matrix: np.ndarray, floor: float = 0) -> Any:
+            timed.append(name)
+            return numpy_svd(matrix, floor)
+        return backend
+    for name in ("gram", "numpy"):
+        monkeypatch.setitem(backends.SVD_BACKENDS, name, spy(name))
+    # Without budget left after the reference, gesdd is kept and its triplets returned
+    tuner: Autotuner = Autotuner(budget=1e-12)
+    tuner.svd(matrix)
+    assert timed == [] and tuner.choices == {"80x40 float64": "gesdd"}
+    # Without budget at all, nothing is tuned
+    untuned: Autotuner = Autotuner(budget=0)
+    untuned.svd(matrix)
+    assert timed == [] and untuned.choices == {}
+    assert Autotuner(candidates=["gesdd", "gram"], repeats=2).tune(matrix) in ("gesdd", "gram")
+    assert timed.count("gram") in (1, 2)
+
+
+def test_autotuner_of_the_environment(tmp_path: Any) -> None:
+    assert make_autotuner(None).path == make_autotuner("").path == backends.SVD_CACHE_PATH
+    assert make_autotuner(str(tmp_path / "svd.json")).path == str(tmp_path / "svd.json")
+    off: Autotuner = make_autotuner("off")
+    assert off.path is None and off.budget == 0
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_batch.py - Tests that the BatchInPainter solves every image of its batch as InPainter does
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, BatchInPainter, Recorder
+from inpainter.masks import random_pixels
+
+
+@pytest.mark.parametrize("alpha_static", [True, False])
+@pytest.mark.parametrize("bregman", [False, True])
+def test_batch_matches_inpainter(image: MaskedImage, alpha_static: bool, bregman: bool) -> None:
+    rng: np.random.Generator = np.random.default_rng(4)
+    # Images of different masks, converging at different iterations
+    images: List[MaskedImage] = [image, MaskedImage.from_arrays(rng.random((64, 64, 3)),
+                                                                random_pixels((64, 64), 0.3, seed=5)),
+                                 MaskedImage.from_arrays(np.full((64, 64, 3), 0.5), random_pixels((64, 64), 0.5, seed=6))]
+    options = {"max_it": 40, "tol": 1e-2, "tol_bregman": 1}
+    solutions, iterations, _ = BatchInPainter(images, **options).run(1, 0.5, alpha_static, bregman)
+    for masked, solution, its in zip(images, solutions, iterations):
+        expected, expected_its, _, _ = InPainter(masked, **options).run(1, 0.5, alpha_static, bregman,
+                                                                       recorder=Recorder(every=0))
+        assert its == expected_its
+        np.testing.assert_allclose(solution, expected, atol=1e-10)
+    assert len(set(iterations.tolist())) > 1
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_blending.py - Tests the blending of the tiles of TiledInPainter and of the focused solves of
+                   EditSession
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Recorder, TiledInPainter, EditSession
+from inpainter.TiledInPainter import blending_window, bounded_map, solve_tile
+
+
+def test_windows_sum_to_one() -> None:
+    # Ranges of 40 pixels overlapping by 8, covering an axis of 100 pixels
+    ranges = [(0, 40), (32, 72), (60, 100)]
+    total: np.ndarray = np.zeros(100)
+    for start, stop in ranges:
+        total[start:stop] += blending_window(start, stop, 100, 8)
+    # The last range overlaps the previous one by more, so its ramp only covers part of the overlap
+    np.testing.assert_allclose(total[:60], 1)
+    assert np.all(total[60:72] >= 1) and np.all(total[72:] == 1)
+    np.testing.assert_array_equal(blending_window(0, 100, 100, 8), 1)
+
+
+def test_tiles_blend_to_their_solutions(image: MaskedImage) -> None:
+    options = {"max_it": 5}
+    solution, iterations, _ = TiledInPainter(image, tile_size=40, overlap=8, **options).run(1, 0.5, False)
+    assert solution.shape == image.get_image().shape and iterations.shape == (4,)
+    # Pixels covered by a single tile are its solution, the others a convex combination
+    first, _ = solve_tile((image.get_image()[:40, :40], image.mask[:40, :40], options, 1, 0.5, False, False))
+    np.testing.assert_allclose(solution[:24, :24], first[:24, :24])
+    assert not np.allclose(solution[24:40, 24:40], first[24:40, 24:40])
+
+
+def test_single_tile_is_the_solve(image: MaskedImage) -> None:
+    solution, iterations, _ = TiledInPainter(image, tile_size=128, max_it=5).run(1, 0.5, False, True)
+    expected, its, _, _ = InPainter(image, max_it=5).run(1, 0.5, False, True, recorder=Recorder(every=0))
+    np.testing.assert_array_equal(solution, expected)
+    assert iterations.tolist() == [its]
+
+
+def test_pool_blends_as_the_tiles_complete(image: MaskedImage) -> None:
+    sequential, iterations, _ = TiledInPainter(image, tile_size=24, overlap=4, max_it=3).run(1, 0.5, True)
+    pooled, pooled_iterations, _ = TiledInPainter(image, tile_size=24, overlap=4, workers=2, max_it=3).run(1, 0.5, True)
+    np.testing.assert_allclose(pooled, sequential, rtol=1e-12)
+    np.testing.assert_array_equal(pooled_iterations, iterations)
+
+
+def test_bounded_map_limits_the_jobs_in_flight() -> None:
+    submitted: List[int] = []
+
+    def jobs() -> Iterator[int]:
+        for job in range(10):
+            submitted.append(job)
+            yield job
+
+    with ThreadPoolExecutor(2) as pool:
+        results = bounded_map(pool, lambda job: job ** 2, jobs(), 3)
+        index, result = next(results)
+        # Only the jobs up to the one waiting for a free slot were taken
+        assert len(submitted) == 4 and result == index ** 2
+        assert sorted([(index, result), *results]) == [(job, job ** 2) for job in range(10)]
+
+
+@pytest.mark.parametrize("focus", [False, True])
+def test_edit_session_blends_the_edit(image: MaskedImage, focus: bool) -> None:
+    session: EditSession = EditSession(image, focus=focus, margin=8, max_it=5)
+    before, _, _ = session.solve()
+    assert session.solve()[1] == 0
+    session.add_block(0.5, 0.625, 0.5, 0.625)
+    assert session.get_mask()[32:40, 32:40].sum() == 0
+    after, its, _ = session.solve()
+    assert its > 0
+    if focus:
+        # Only the edit and its margin, rows and columns 24 to 48, are solved again
+        outside: np.ndarray = np.ones(image.mask.shape, dtype=bool)
+        outside[24:48, 24:48] = False
+        np.testing.assert_array_equal(after[outside], before[outside])
+    assert not np.allclose(after[32:40, 32:40], before[32:40, 32:40])
+    # A restored block is observed, whatever the initial mask
+    session.remove_block(0.5, 0.625, 0.5, 0.625)
+    assert session.get_mask()[32:40, 32:40].min() == 1
+
+
+def test_edit_session_without_edits_is_cached(image: MaskedImage, monkeypatch: pytest.MonkeyPatch) -> None:
+    session: EditSession = EditSession(image, max_it=5)
+    solution, its, _ = session.solve()
+    assert its > 0
+    # No solve runs without edits, the last solution being returned as is
+    monkeypatch.setattr(InPainter, "run", lambda *args, **kwargs: pytest.fail("solved without edits"))
+    cached, its, _ = session.solve()
+    assert its == 0
+    np.testing.assert_array_equal(cached, solution)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_cache.py - Tests the SolveCache, its hits and misses, its eviction and the runs it serves
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+from typing import Any
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Recorder, SolveCache
+
+
+def test_hit_and_miss(tmp_path: Any) -> None:
+    cache: SolveCache = SolveCache(str(tmp_path))
+    key: str = SolveCache.key([np.arange(4)], {"rho": 1})
+    assert cache.get(key) is None
+    cache.put(key, np.ones((2, 2, 3), dtype=np.float32), 12, 0.5)
+    solution, iterations, time = cache.get(key)
+    assert solution.dtype == np.float32 and (iterations, time) == (12, 0.5)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert SolveCache.key([np.arange(4)], {"rho": 2}) != key
+    assert SolveCache.key([np.arange(4.)], {"rho": 1}) != key
+
+
+def test_evicts_the_least_recently_used(tmp_path: Any) -> None:
+    cache: SolveCache = SolveCache(str(tmp_path))
+    solution: np.ndarray = np.zeros((16, 16, 3))
+    for index, key in enumerate(("a", "b", "c")):
+        cache.put(key, solution, 1, 0)
+        os.utime(os.path.join(str(tmp_path), f"{key}.npz"), (index, index))
+    cache.get("a")
+    cache.max_bytes = 2 * cache.size() // 3
+    cache.put("d", solution, 1, 0)
+    # b is the least recently used once a was hit, then c
+    assert [cache.get(key) is not None for key in "abcd"] == [True, False, False, True]
+
+
+def test_failed_write_leaves_no_temporary(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache: SolveCache = SolveCache(str(tmp_path))
+
+    def failing(*args: Any, **kwargs: Any) -> None:
+        raise OSError("No space left on device")
+    monkeypatch.setattr(np, "savez", failing)
+    with pytest.raises(OSError):
+        cache.put("a", np.zeros(3), 1, 0)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_inpainter_serves_recorders_of_no_iteration(image: MaskedImage, tmp_path: Any) -> None:
+    painter: InPainter = InPainter(image, 5, cache=SolveCache(str(tmp_path)))
+    solution, iterations, _, _ = painter.run(1, 0.5, False)
+    cached, cached_iterations, _, history = painter.run(1, 0.5, False, recorder=Recorder(every=0))
+    np.testing.assert_array_equal(cached, solution)
+    assert cached_iterations == iterations and history.final is cached
+    _, _, _, recorded = painter.run(1, 0.5, False)
+    assert len(recorded["FPR"]) == iterations
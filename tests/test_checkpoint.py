@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_checkpoint.py - Tests that a run stopped or killed and resumed from its checkpoint reaches the
+                     solution of an uninterrupted run
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+from typing import Any, Generator
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Recorder, Checkpoint
+
+
+class Killed (Exception):
+    """
+    Raised by KillingRecorder, standing for the run being killed
+    """
+
+
+class KillingRecorder (Recorder):
+    """
+    Records nothing, but kills the run once it has completed iteration at + 1
+    """
+
+    def __init__(self, at: int) -> None:
+        super().__init__(every=0)
+        self.at: int = at
+
+    def wants(self, k: int) -> bool:
+        if k == self.at:
+            raise Killed
+        return False
+
+
+@pytest.mark.parametrize("alpha_static, bregman", [(True, False), (False, True)])
+def test_killed_run_resumes_exactly(image: MaskedImage, tmp_path: Any, alpha_static: bool, bregman: bool) -> None:
+    painter: InPainter = InPainter(image, 20, tol=0, tol_bregman=5)
+    solution, iterations, _, _ = painter.run(1, 0.5, alpha_static, bregman, recorder=Recorder(every=0))
+
+    checkpoint: Checkpoint = Checkpoint(str(tmp_path / "run.npz"), every=5)
+    with pytest.raises(Killed):
+        painter.run(1, 0.5, alpha_static, bregman, recorder=KillingRecorder(11), checkpoint=checkpoint)
+    assert checkpoint.saves == 2
+    assert os.path.exists(checkpoint.path)
+
+    resumed, resumed_iterations, _, _ = painter.run(1, 0.5, alpha_static, bregman, recorder=Recorder(every=0),
+                                                    checkpoint=checkpoint)
+    assert resumed_iterations == iterations
+    np.testing.assert_allclose(resumed, solution, rtol=0, atol=1e-12)
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_stopped_run_resumes_exactly(image: MaskedImage, tmp_path: Any) -> None:
+    painter: InPainter = InPainter(image, 20, tol=0, tol_bregman=5)
+    solution, iterations, _, _ = painter.run(1, 0.5, False, True, recorder=Recorder(every=0))
+
+    checkpoint: Checkpoint = Checkpoint(str(tmp_path / "run.npz"), every=0)
+    progress: Generator = painter.stream(1, 0.5, False, True, Recorder(every=0), checkpoint=checkpoint, every=7)
+    assert next(progress)["iteration"] == 7
+    assert progress.send({"stop": True})["done"]
+    assert checkpoint.saves == 1
+
+    resumed, resumed_iterations, _, _ = painter.run(1, 0.5, False, True, recorder=Recorder(every=0),
+                                                    checkpoint=checkpoint)
+    assert resumed_iterations == iterations
+    np.testing.assert_allclose(resumed, solution, rtol=0, atol=1e-12)
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_checkpoint_of_another_problem(image: MaskedImage, tmp_path: Any) -> None:
+    checkpoint: Checkpoint = Checkpoint(str(tmp_path / "run.npz"), every=3)
+    with pytest.raises(Killed):
+        InPainter(image, 20).run(1, 0.5, False, recorder=KillingRecorder(5), checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        InPainter(image, 20).run(1, 0.5, True, checkpoint=checkpoint)
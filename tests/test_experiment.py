@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_experiment.py - Tests that the sweeps of the experiments give the same runs in a process pool,
+                     and release the shared image whatever happens
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+import warnings
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import Experiment as experiment_module
+from inpainter.Experiment import ExperimentRho, attach_memory
+
+# Image of the experiments, at the root of the repository
+HOUSES: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Houses.jpeg")
+
+
+def small_experiment(workers: int) -> ExperimentRho:
+    """
+    Returns a sweep over two values of rho on a small version of Houses.jpeg
+    """
+    experiment: ExperimentRho = ExperimentRho([0.5, 1], workers=workers, seed=0)
+    experiment.image_string, experiment.image_size = HOUSES, (32, 32)
+    return experiment
+
+
+def test_pool_gives_the_sequential_runs() -> None:
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        pooled = small_experiment(2)._Experiment__run(20, 1e-3)
+    sequential = small_experiment(0)._Experiment__run(20, 1e-3)
+    for its_pooled, its_sequential in zip(pooled[:2], sequential[:2]):
+        np.testing.assert_array_equal(its_pooled, its_sequential)
+
+
+def test_sequential_failure_releases_the_image(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(job: Any) -> None:
+        raise RuntimeError("run failed")
+    monkeypatch.setattr(experiment_module, "run_single", fail)
+    with pytest.raises(RuntimeError):
+        small_experiment(0)._Experiment__run(20, 1e-3)
+    assert experiment_module._shared == {}
+
+
+def test_workers_do_not_track_the_segments(monkeypatch: pytest.MonkeyPatch) -> None:
+    memory: SharedMemory = SharedMemory(create=True, size=64)
+    registered: List[str] = []
+    monkeypatch.setattr(resource_tracker, "register", lambda name, rtype: registered.append(name))
+    try:
+        attached: SharedMemory = attach_memory(memory.name)
+        attached.close()
+        assert registered == []
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_factored.py - Tests that the factored proximal outputs give the iterations of the dense ones
+~ Daniel Cortild, 16 October 2026
+"""
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, LowRank, Recorder, HistoryRecorder
+
+
+@pytest.mark.parametrize("alpha_static, bregman", [(True, False), (False, False), (False, True)])
+def test_factored_matches_the_dense_path(image: MaskedImage, alpha_static: bool, bregman: bool) -> None:
+    options = {"max_it": 30, "tol": 1e-3, "tol_bregman": 1}
+    dense, dense_its, _, _ = InPainter(image, **options).run(1, 0.5, alpha_static, bregman,
+                                                             recorder=Recorder(every=0))
+    factored, its, _, _ = InPainter(image, factored=True, **options).run(1, 0.5, alpha_static, bregman)
+    assert its == dense_its
+    np.testing.assert_allclose(factored, dense, atol=1e-10)
+
+
+def test_factored_records_no_iteration(image: MaskedImage) -> None:
+    with pytest.raises(ValueError):
+        InPainter(image, 5, factored=True).run(1, 0.5, False, recorder=HistoryRecorder())
+
+
+@pytest.mark.parametrize("axis", [0, 1])
+def test_low_rank_dense(axis: int) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    shape = (8, 6, 3)
+    left: np.ndarray = rng.random((8 if axis == 0 else 24, 2))
+    right: np.ndarray = rng.random((2, 18 if axis == 0 else 6))
+    low_rank: LowRank = LowRank(left, right, axis, shape)
+    expected: np.ndarray = (left @ right).reshape(shape, order='F')
+    np.testing.assert_allclose(low_rank.dense(), expected)
+    np.testing.assert_allclose(low_rank.dense(out=np.empty(shape)), expected)
+    assert low_rank.rank == 2 and low_rank.nbytes == left.nbytes + right.nbytes
+    with pytest.raises(ValueError):
+        LowRank(left, right[:1], axis, shape)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_image.py - Tests the packed mask of MaskedImage and its observed-pixel operators restrict and
+                extend, for C and Fortran ordered images
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage
+from inpainter.masks import load_mask, random_pixels
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_extend_restrict_is_the_mask(image: MaskedImage, order: str) -> None:
+    rng: np.random.Generator = np.random.default_rng(2)
+    x: np.ndarray = np.asarray(rng.random((64, 64, 3)), order=order)
+    expected: np.ndarray = image.mask[:, :, None] * x
+    np.testing.assert_array_equal(image.extend(image.restrict(x)), expected)
+    out: np.ndarray = np.zeros((64, 64, 3), order=order)
+    assert image.extend(image.restrict(x), out=out) is out
+    np.testing.assert_array_equal(out, expected)
+    np.testing.assert_array_equal(image.mask_image(x), expected)
+
+
+def test_restrict_and_extend_are_adjoint(image: MaskedImage) -> None:
+    rng: np.random.Generator = np.random.default_rng(3)
+    x: np.ndarray = rng.random((64, 64, 3))
+    values: np.ndarray = rng.random((int(image.mask.sum()), 3))
+    assert np.isclose(np.vdot(image.restrict(x), values), np.vdot(x, image.extend(values)))
+    np.testing.assert_array_equal(image.restrict(image.extend(values)), values)
+    np.testing.assert_array_equal(image.restrict(np.asfortranarray(x)), image.restrict(x))
+
+
+def test_extend_rejects_other_layouts(image: MaskedImage) -> None:
+    values: np.ndarray = image.restrict(image.get_image())
+    with pytest.raises(ValueError):
+        image.extend(values, out=np.zeros((64, 64, 6))[:, :, ::2])
+    with pytest.raises(ValueError):
+        image.extend(values, out=np.zeros((64, 64, 3)).transpose(1, 0, 2))
+
+
+def test_packed_mask(image: MaskedImage, tmp_path: Any) -> None:
+    mask: np.ndarray = random_pixels((64, 64), 0.5, seed=1)
+    np.testing.assert_array_equal(image.mask, mask)
+    assert image.get_erase_ratio() == 0.5
+    with pytest.raises(ValueError):
+        image.mask[0, 0] = 0
+    image.save_mask(str(tmp_path / "mask.npz"))
+    np.testing.assert_array_equal(load_mask(str(tmp_path / "mask.npz")), mask)
+
+
+def test_mask_setter_updates_the_operators(image: MaskedImage) -> None:
+    mask: np.ndarray = image.mask.copy()
+    mask[:8] = 0
+    image.mask = mask
+    np.testing.assert_array_equal(image.mask, mask)
+    x: np.ndarray = np.asfortranarray(image.get_image())
+    assert image.restrict(x).shape == (int(mask.sum()), 3)
+    np.testing.assert_array_equal(image.extend(image.restrict(x), out=np.zeros_like(x)), mask[:, :, None] * x)
+
+
+def test_update_mask_masks_the_image(image: MaskedImage) -> None:
+    mask: np.ndarray = image.mask.copy()
+    mask[:, :8] = 0
+    image.update_mask(mask)
+    np.testing.assert_array_equal(image.mask, mask)
+    np.testing.assert_array_equal(image.get_image_masked(), mask[:, :, None] * image.get_image())
+    assert image.restrict(image.get_image()).shape == (int(mask.sum()), 3)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_lazy.py - Tests that importing the solver and solving an image leave the heavy dependencies unloaded
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import json
+import subprocess
+import sys
+from typing import List
+
+# External Imports
+import pytest
+
+# Internal Imports
+import inpainter
+from benchmarks.startup import HEAVY, ROOT
+
+# Script solving a small image in a fresh interpreter, printing the heavy dependencies it imported
+SOLVE: str = """
+import json, sys
+import numpy as np
+{statement}
+from inpainter.masks import random_pixels
+image = MaskedImage.from_arrays(np.random.default_rng(0).random((32, 32, 3)), random_pixels((32, 32), 0.5, seed=0))
+InPainter(image, 3).run(1, 0.5, False, True, recorder=Recorder(every=0))
+print(json.dumps([name for name in {heavy} if name in sys.modules]))
+"""
+
+
+@pytest.mark.parametrize("statement", ["from inpainter.solver import InPainter, MaskedImage, Recorder",
+                                       "from inpainter import InPainter, MaskedImage, Recorder"])
+def test_solve_imports_no_heavy_dependency(statement: str) -> None:
+    output: str = subprocess.run([sys.executable, "-c", SOLVE.format(statement=statement, heavy=HEAVY)],
+                                 cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    heavy: List[str] = json.loads(output)
+    assert heavy == []
+
+
+def test_lazy_names_resolve() -> None:
+    from inpainter.Experiment import ExperimentRho
+    assert inpainter.ExpRho is ExperimentRho
+    assert "ExpRho" in dir(inpainter)
+    with pytest.raises(AttributeError):
+        inpainter.ExpUnknown
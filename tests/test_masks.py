@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_masks.py - Tests the seedable mask generators and the packed mask files
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Callable, Dict
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter.masks import Seed, erase_blocks, load_mask, random_blocks, random_pixels, save_mask, strokes, text
+
+# Generators of (48, 64) masks from a seed
+GENERATORS: Dict[str, Callable[[Seed], np.ndarray]] = {
+    "pixels": lambda seed: random_pixels((48, 64), 0.3, seed=seed),
+    "blocks": lambda seed: random_blocks((48, 64), 5, seed=seed),
+    "strokes": lambda seed: strokes((48, 64), 3, seed=seed),
+    "text": lambda seed: text((48, 64), font_size=10, seed=seed),
+}
+
+
+@pytest.mark.parametrize("ratio", [0, 0.25, 0.5, 0.999])
+def test_random_pixels_erase_ratio(ratio: float) -> None:
+    mask: np.ndarray = random_pixels((48, 64), ratio, seed=0)
+    assert mask.shape == (48, 64) and mask.dtype == np.uint8
+    assert np.count_nonzero(mask == 0) == int(48 * 64 * ratio)
+
+
+@pytest.mark.parametrize("name", GENERATORS)
+def test_generators_are_seeded(name: str) -> None:
+    generate: Callable[[Seed], np.ndarray] = GENERATORS[name]
+    mask: np.ndarray = generate(1)
+    assert mask.shape == (48, 64) and set(np.unique(mask)) <= {0, 1}
+    assert 0 < np.count_nonzero(mask == 0) < mask.size
+    np.testing.assert_array_equal(generate(1), mask)
+    np.testing.assert_array_equal(generate(np.random.default_rng(1)), mask)
+    # Without seed, the masks follow the global random state
+    np.random.seed(2)
+    unseeded: np.ndarray = generate(None)
+    np.random.seed(2)
+    np.testing.assert_array_equal(generate(None), unseeded)
+
+
+def test_erase_blocks_covers_the_blocks() -> None:
+    mask: np.ndarray = erase_blocks(np.ones((10, 12), dtype=np.uint8), np.array([[0, 3, 0, 4], [2, 5, 3, 20]]))
+    expected: np.ndarray = np.ones((10, 12), dtype=np.uint8)
+    expected[0:3, 0:4] = expected[2:5, 3:12] = 0
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_saved_masks_reload(tmp_path: Any) -> None:
+    mask: np.ndarray = random_blocks((37, 53), 4, seed=3)
+    save_mask(str(tmp_path / "mask.npz"), mask)
+    np.testing.assert_array_equal(load_mask(str(tmp_path / "mask.npz")), mask)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_precision.py - Tests that the dtype option of the solvers applies to every solve, including
+                    those warm started from a given initial guess
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import sys
+from typing import Any, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, PyramidInPainter, EditSession
+
+
+@pytest.fixture
+def workspaces(monkeypatch: pytest.MonkeyPatch) -> List[np.dtype]:
+    """
+    Spies on the workspaces of the Algorithm, returning the types of their iterates
+    """
+    module = sys.modules["inpainter.Algorithm"]
+    dtypes: List[np.dtype] = []
+
+    class Spy (module.Workspace):
+        def __init__(self, Z_init: np.ndarray, *args: Any, **kwargs: Any) -> None:
+            super().__init__(Z_init, *args, **kwargs)
+            dtypes.append(self.Z_actual.dtype)
+
+    monkeypatch.setattr(module, "Workspace", Spy)
+    return dtypes
+
+
+def test_inpainter_casts_Z_init(image: MaskedImage, workspaces: List[np.dtype]) -> None:
+    solution, _, _, _ = InPainter(image, 5, dtype=np.float32).run(1, 0.5, False, Z_init=image.get_image_masked())
+    assert workspaces == [np.float32]
+    assert solution.dtype == np.float32
+
+
+def test_pyramid_float32(image: MaskedImage, workspaces: List[np.dtype]) -> None:
+    solution, _, _, report = PyramidInPainter(image, levels=3, max_it=5, dtype=np.float32).run(1, 0.5, False)
+    assert len(report) == 3
+    assert workspaces == [np.float32] * 3
+    assert solution.dtype == np.float32
+
+
+@pytest.mark.parametrize("focus", [False, True])
+def test_edit_session_float32(image: MaskedImage, workspaces: List[np.dtype], focus: bool) -> None:
+    session: EditSession = EditSession(image, focus=focus, margin=8, max_it=5, dtype=np.float32)
+    session.solve()
+    session.add_block(0.4, 0.5, 0.4, 0.5)
+    solution, _, _ = session.solve()
+    assert workspaces == [np.float32] * 2
+    assert solution.dtype == np.float32
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_profiler.py - Tests the timing of the phases of a run and its Chrome trace
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import json
+import os
+from typing import Any, Dict
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Profiler, Recorder
+
+
+def test_profiler_times_the_phases(image: MaskedImage) -> None:
+    profiler: Profiler = Profiler()
+    painter: InPainter = InPainter(image, 5, tol=0, tol_bregman=10)
+    _, its, _, _ = painter.run(1, 0.5, True, True, recorder=Recorder(every=0), profiler=profiler)
+    counts: Dict[str, int] = profiler.counts()
+    assert counts["iteration"] == its
+    assert counts["proxf"] == counts["proxg"] == counts["LgradhL"] >= its
+    assert counts["residuals"] == counts["bregman"] == its
+    assert profiler.timeline("iteration").shape == (its,)
+    assert np.isclose(profiler.timeline("iteration").sum(), profiler.totals()["iteration"])
+
+
+def test_chrome_trace_is_valid(image: MaskedImage, tmp_path: Any) -> None:
+    profiler: Profiler = Profiler()
+    InPainter(image, 3, tol=0).run(1, 0.5, False, recorder=Recorder(every=0), profiler=profiler)
+    path: str = os.path.join(tmp_path, "trace.json")
+    profiler.to_chrome_trace(path)
+    with open(path) as file:
+        trace: Dict[str, Any] = json.load(file)
+    events = trace["traceEvents"]
+    assert len(events) == len(profiler.events)
+    assert {event["name"] for event in events} == set(profiler.counts())
+    assert {"iteration", "proxf", "proxg", "LgradhL", "residuals"} <= {event["name"] for event in events}
+    assert all(event["ph"] == "X" and event["dur"] >= 0 and event["ts"] >= 0 for event in events)
+    assert sorted({event["args"]["iteration"] for event in events if event["name"] == "iteration"}) == [0, 1, 2]
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_pyramid.py - Tests the resampling of the levels of the PyramidInPainter
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Tuple
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter.PyramidInPainter import downsample, upsample
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (33, 64), (64, 17), (7, 9)])
+def test_downsample_upsample_shapes(shape: Tuple[int, int]) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    image: np.ndarray = rng.random((*shape, 3))
+    coarse, mask = downsample(image, np.ones(shape, dtype=int))
+    assert coarse.shape == ((shape[0] + 1) // 2, (shape[1] + 1) // 2, 3) and mask.shape == coarse.shape[:2]
+    assert upsample(coarse, shape).shape == image.shape
+
+
+def test_downsample_averages_the_observed_pixels() -> None:
+    image: np.ndarray = np.arange(16, dtype=float).reshape(4, 4, 1).repeat(3, axis=2)
+    mask: np.ndarray = np.ones((4, 4), dtype=int)
+    mask[0, 0] = mask[2:, 2:] = 0
+    coarse, coarse_mask = downsample(image, mask)
+    np.testing.assert_array_equal(coarse_mask, [[1, 1], [1, 0]])
+    np.testing.assert_allclose(coarse[..., 0], [[(1 + 4 + 5) / 3, 4.5], [10.5, 0]])
+
+
+def test_upsample_repeats_the_pixels() -> None:
+    coarse: np.ndarray = np.arange(4, dtype=float).reshape(2, 2, 1).repeat(3, axis=2)
+    np.testing.assert_array_equal(upsample(coarse, (3, 4))[..., 0], [[0, 0, 1, 1], [0, 0, 1, 1], [2, 2, 3, 3]])
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_recorder.py - Tests that the recorders record the fixed-point residuals of the iterates, or of
+                   the inertial variables to which T is applied, and the metrics computed online
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+from typing import Any, Dict, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Recorder, HistoryRecorder, RingRecorder, DiskRecorder
+from inpainter.Algorithm import Algorithm, inertial_alpha
+from inpainter.quality import psnr, ssim
+from inpainter.types import HistoryDict
+
+
+def test_default_records_the_iterates(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 10, tol=0)
+    solution, _, _, inertial = painter.run(1, 0.5, False, recorder=HistoryRecorder(at_inertial=True))
+    exact_solution, _, _, exact = painter.run(1, 0.5, False, recorder=HistoryRecorder())
+    assert (inertial.point, exact.point) == ("u", "z")
+    np.testing.assert_array_equal(exact_solution, solution)
+    # T maps the inertial variable of an iteration to the iterate recorded by the next one
+    for Z, TU in zip(exact["Z"][1:], inertial["TZ"]):
+        np.testing.assert_allclose(Z, TU)
+    for Z, TZ, fpr in zip(exact["Z"], exact["TZ"], exact["FPR"]):
+        assert np.isclose(np.linalg.norm(Z - TZ), fpr)
+    assert not np.allclose(inertial["FPR"][1:], exact["FPR"][1:])
+
+
+def test_static_iterates_are_exact(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 10, tol=0)
+    _, _, _, static = painter.run(1, 0.5, True, recorder=HistoryRecorder(at_inertial=True))
+    _, _, _, exact = painter.run(1, 0.5, True, recorder=HistoryRecorder())
+    assert static.point == exact.point == "z"
+    np.testing.assert_array_equal(static["FPR"], exact["FPR"])
+
+
+@pytest.mark.parametrize("alpha_static", [True, False])
+def test_default_history_matches_the_plain_iterations(alpha_static: bool) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    target: np.ndarray = rng.random((16, 16, 3))
+    Z_init: np.ndarray = rng.random(target.shape)
+    # A Bregman update moving the target on every iteration, so that T changes between the records
+    shift: List[float] = [0]
+    operators: Dict[str, Any] = dict(proxf=lambda Z, rho: np.clip(Z, 0.2, 0.8), proxg=lambda Z, rho: Z / (1 + rho),
+                                     LgradhL=lambda Z: Z - target - shift[0], update_LgradhL=lambda Z: None)
+
+    def update(Z: np.ndarray) -> None:
+        shift[0] += 0.01
+
+    _, history = Algorithm(**{**operators, "update_LgradhL": update}, Z_init=Z_init, alpha_static=alpha_static) \
+        .run(8, 0, tol_bregman=np.inf, verbose=False, recorder=HistoryRecorder())
+
+    # The iterations of the original implementation, recording z_k and Tz_k before the Bregman update
+    shift[0] = 0
+    def T(U: np.ndarray) -> np.ndarray:
+        Xg: np.ndarray = operators["proxg"](U, 1)
+        return U + 0.5 * (operators["proxf"](2 * Xg - U - operators["LgradhL"](Xg), 1) - Xg)
+
+    alpha: float = 0 if alpha_static else inertial_alpha(0.5, 1, 1)
+    Z_previous, Z_actual = np.ones_like(Z_init), Z_init
+    expected: Dict[str, List[np.ndarray]] = {"Z": [], "TZ": []}
+    for k in range(8):
+        Z_previous, Z_actual = Z_actual, T(Z_actual + (1 - 1 / (k + 1)) * alpha * (Z_actual - Z_previous))
+        expected["Z"].append(Z_actual)
+        expected["TZ"].append(T(Z_actual))
+        update(Z_actual)
+
+    history_dict: HistoryDict = history.history()
+    assert len(history_dict["Z"]) == len(history_dict["TZ"]) == len(history_dict["FPR"]) == 8
+    for key in ("Z", "TZ"):
+        for recorded, reference in zip(history_dict[key], expected[key]):
+            np.testing.assert_allclose(recorded, reference, rtol=1e-12)
+    np.testing.assert_allclose(history_dict["FPR"], [np.linalg.norm(Z - TZ) for Z, TZ in
+                                                     zip(expected["Z"], expected["TZ"])], rtol=1e-12)
+
+
+def test_online_metrics_match_the_snapshots(image: MaskedImage) -> None:
+    reference: np.ndarray = image.get_image()
+    _, _, _, history = InPainter(image, 10, tol=0).run(1, 0.5, False, recorder=HistoryRecorder(
+        every=3, reference=reference, ssim=True))
+    metrics = history.get_metrics()
+    assert metrics["iterations"].tolist() == [1, 4, 7, 10]
+    np.testing.assert_allclose(metrics["error"], [np.linalg.norm(TZ - reference) ** 2 for TZ in history["TZ"]])
+    np.testing.assert_allclose(metrics["psnr"], [psnr(TZ, reference) for TZ in history["TZ"]])
+    np.testing.assert_allclose(metrics["ssim"], [ssim(TZ, reference) for TZ in history["TZ"]])
+    # Errors to another image than the reference are computed from the snapshots
+    other: np.ndarray = image.get_image_masked()
+    np.testing.assert_allclose(history.get_errors(other)[1],
+                               [np.linalg.norm(TZ - other) ** 2 for TZ in history["TZ"]])
+
+
+def test_metrics_without_snapshots(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 10, tol=0)
+    _, _, _, history = painter.run(1, 0.5, True, recorder=HistoryRecorder())
+    _, _, _, compact = painter.run(1, 0.5, True, recorder=Recorder())
+    np.testing.assert_array_equal(compact.get_fpr()[1], history.get_fpr()[1])
+    with pytest.raises(KeyError):
+        compact["Z"]
+
+
+def test_ring_keeps_the_last_snapshots(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 10, tol=0)
+    _, _, _, history = painter.run(1, 0.5, False, recorder=HistoryRecorder(every=2))
+    _, _, _, ring = painter.run(1, 0.5, False, recorder=RingRecorder(3, every=2))
+    # The metrics of every recorded iteration are kept, but only the last 3 snapshots, in order
+    np.testing.assert_array_equal(ring.get_fpr()[0], [1, 3, 5, 7, 9])
+    np.testing.assert_array_equal(ring.get_fpr()[1], history.get_fpr()[1])
+    for key in ("Z", "TZ"):
+        assert len(ring[key]) == 3
+        for kept, recorded in zip(ring[key], history[key][-3:]):
+            np.testing.assert_array_equal(kept, recorded)
+    np.testing.assert_allclose(ring.get_errors(image.get_image())[1],
+                               history.get_errors(image.get_image())[1][-3:])
+
+
+def test_disk_reloads_the_snapshots(image: MaskedImage, tmp_path: Any) -> None:
+    painter: InPainter = InPainter(image, 6, tol=0)
+    _, _, _, history = painter.run(1, 0.5, True, recorder=HistoryRecorder(every=2))
+    _, _, _, disk = painter.run(1, 0.5, True, recorder=DiskRecorder(str(tmp_path / "snapshots"), every=2))
+    assert sorted(os.listdir(str(tmp_path / "snapshots"))) == \
+        [f"{key}_{k:06d}.npy" for key in ("TZ", "Z") for k in (1, 3, 5)]
+    for key in ("Z", "TZ"):
+        assert len(disk[key]) == 3
+        for loaded, recorded in zip(disk[key], history[key]):
+            assert isinstance(loaded, np.memmap)
+            np.testing.assert_array_equal(loaded, recorded)
+    with pytest.raises(KeyError):
+        disk["U"]
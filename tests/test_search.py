@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_search.py - Tests that the HyperbandSearch measures comparable rates, resumes the configurations
+                 it continues and drops the hopeless ones after the first rung
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import os
+from typing import Any, Dict, List
+
+# External Imports
+import numpy as np
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, HistoryRecorder, HyperbandSearch
+from inpainter.Search import ResidualRecorder
+from inpainter.types import TrialDict
+
+
+def test_residuals_at_the_iterates(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 8, tol=0)
+    recorder: ResidualRecorder = ResidualRecorder(at=3)
+    _, _, _, residuals = painter.run(1, 0.5, False, recorder=recorder)
+    _, _, _, history = painter.run(1, 0.5, False, recorder=HistoryRecorder())
+    its, fpr = history.get_fpr()
+    # The mid-rung sample and the final residual are both those of iterates
+    np.testing.assert_allclose(residuals.get_fpr()[1], fpr[its == 4])
+    Z, TZ = history["Z"][-1], history["TZ"][-1]
+    assert np.isclose(recorder.residual, np.linalg.norm(Z - TZ) / np.linalg.norm(Z))
+
+
+def test_resumes_the_continued_configuration(image: MaskedImage, tmp_path: Any) -> None:
+    search: HyperbandSearch = HyperbandSearch(image, rhos=(1,), lambdas=(0.5,), alpha_static=(True, False),
+                                              bregman=(False,), max_it=8, min_it=4, eta=2, tol=1e-12,
+                                              directory=str(tmp_path), verbose=False)
+    results: List[TrialDict] = search.halving()
+    best, dropped = results
+    assert (best["iterations"], dropped["iterations"]) == (8, 4)
+    # The second rung ran 4 more iterations of the best configuration, not 8 from scratch
+    assert search.spent() == 2 * 4 + 4
+    assert os.listdir(str(tmp_path)) == [f"rho1_lamb0.5_static{best['alpha_static']:d}_bregman0.npy"]
+
+    # It continued from the image by T of its first rung
+    painter: InPainter = InPainter(image, 4, tol=0)
+    first, _, _, _ = painter.run(1, 0.5, best["alpha_static"])
+    recorder: ResidualRecorder = ResidualRecorder(at=2)
+    second, _, _, _ = painter.run(1, 0.5, best["alpha_static"], recorder=recorder, Z_init=first)
+    assert np.isclose(best["residual"], recorder.residual)
+    np.testing.assert_allclose(np.load(os.path.join(str(tmp_path), os.listdir(str(tmp_path))[0])), second)
+
+
+def test_drops_hopeless_configurations(image: MaskedImage) -> None:
+    search: HyperbandSearch = HyperbandSearch(image, rhos=(1,), lambdas=(0.5, 1e-3, 2e-3, 5e-3),
+                                              alpha_static=(True,), bregman=(False,), max_it=16, min_it=4, eta=4,
+                                              tol=1e-6, verbose=False)
+    trials: Dict[float, TrialDict] = {trial["lamb"]: trial for trial in search.halving()}
+    assert trials[0.5]["iterations"] == 16
+    for lamb in (1e-3, 2e-3, 5e-3):
+        assert trials[lamb]["iterations"] == 4 and trials[lamb]["estimate"] > trials[0.5]["estimate"]
+    assert search.spent() == 4 * 4 + 12
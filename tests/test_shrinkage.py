@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_shrinkage.py - Tests the rank-adaptive shrinkage engines, their warm start across runs and the t-SVD shrinkage
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Callable, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, EditSession, Recorder, svd_shrink, tsvd_shrink
+from inpainter.Shrinkage import RandomizedShrinkage, SubspaceShrinkage, make_shrinkage
+
+
+def test_inpainter_keeps_its_engines(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 5, shrinkage="subspace")
+    engines = painter.get_engines()
+    painter.run(1, 0.5, False, recorder=Recorder(every=0))
+    assert painter.get_engines() is engines
+    assert all(engine.rank > 0 for engine in engines)
+    shared: InPainter = InPainter(image, 5, shrinkage="subspace", engines=engines)
+    assert shared.get_engines() is engines
+
+
+def test_engines_of_another_method(image: MaskedImage) -> None:
+    engines = (make_shrinkage("randomized"), make_shrinkage("randomized"))
+    with pytest.raises(ValueError):
+        InPainter(image, shrinkage="subspace", engines=engines)
+
+
+def test_edit_session_shares_its_engines(image: MaskedImage, monkeypatch: pytest.MonkeyPatch) -> None:
+    created: List[SubspaceShrinkage] = []
+    original: Callable[..., None] = SubspaceShrinkage.__init__
+
+    def spy(self: SubspaceShrinkage, *args: Any, **kwargs: Any) -> None:
+        original(self, *args, **kwargs)
+        created.append(self)
+    monkeypatch.setattr(SubspaceShrinkage, "__init__", spy)
+
+    session: EditSession = EditSession(image, focus=False, max_it=5, shrinkage="subspace")
+    session.solve()
+    session.add_block(0.4, 0.5, 0.4, 0.5)
+    session.solve()
+    # The engines of the first solve, one per unfolding, are those of the next ones
+    assert len(created) == 2
+
+
+def test_subspace_warm_start_is_accurate() -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    low_rank: np.ndarray = rng.random((120, 12)) @ rng.random((12, 90))
+    engine: SubspaceShrinkage = SubspaceShrinkage(tol=1e-8)
+    for _ in range(3):
+        matrix: np.ndarray = low_rank + 1e-3 * rng.standard_normal(low_rank.shape)
+        np.testing.assert_allclose(engine(matrix, 0.5), svd_shrink(matrix, 0.5), atol=1e-6)
+
+
+def test_refinement_is_local_to_a_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    U, _, VT = np.linalg.svd(rng.standard_normal((200, 150)), full_matrices=False)
+    # Slowly decaying singular values, on which the range-finder is inaccurate at this tolerance
+    matrix: np.ndarray = (U * (10 / np.arange(1, 151))) @ VT
+    engine: RandomizedShrinkage = RandomizedShrinkage(tol=1e-12, power_its=0, max_power_its=2)
+    refinements: List[bool] = []
+    original: Callable[[], bool] = engine._refine
+    monkeypatch.setattr(engine, "_refine", lambda: refinements.append(original()) or refinements[-1])
+    for _ in range(2):
+        np.testing.assert_allclose(engine(matrix, 1), svd_shrink(matrix, 1), atol=1e-8)
+    # Every call retries with up to max_power_its, from the configured power_its
+    assert refinements == [True, True, False] * 2
+    assert engine.power_its == 0
+
+
+def test_restart_sized_from_the_actual_rank() -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    matrix: np.ndarray = rng.random((100, 30)) @ rng.random((30, 80))
+    engine: SubspaceShrinkage = SubspaceShrinkage(min_rank=4, max_rank_ratio=0, oversampling=2)
+    engine(matrix, 1e-6)
+    assert engine.rank == 30
+    # The stored subspace holds rank + min_rank + oversampling vectors, only padded with random ones beyond
+    np.testing.assert_array_equal(engine._test_matrix(80, 36, matrix.dtype), engine._test_matrix(80, 36, matrix.dtype))
+    assert not np.array_equal(engine._test_matrix(80, 37, matrix.dtype), engine._test_matrix(80, 37, matrix.dtype))
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+def test_tsvd_shrink_matches_the_full_fft(channels: int) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    tensor: np.ndarray = rng.random((40, 30, channels))
+    # Reference shrinking every slice of the full FFT, including the conjugate ones
+    slices: np.ndarray = np.fft.fft(tensor, axis=2)
+    for k in range(channels):
+        U, S, VT = np.linalg.svd(slices[:, :, k], full_matrices=False)
+        slices[:, :, k] = (U * np.maximum(S - 0.5, 0)) @ VT
+    reference: np.ndarray = np.fft.ifft(slices, axis=2)
+    np.testing.assert_allclose(reference.imag, 0, atol=1e-12)
+    np.testing.assert_allclose(tsvd_shrink(tensor, 0.5), reference.real, atol=1e-12)
+
+
+def test_tsvd_regularizer_solves(image: MaskedImage) -> None:
+    solution, its, _, _ = InPainter(image, 5, regularizer="tsvd").run(1, 0.5, True, recorder=Recorder(every=0))
+    assert its == 5 and solution.shape == image.get_image().shape and np.all(np.isfinite(solution))
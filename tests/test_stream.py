@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_stream.py - Tests the progress records of the streaming runs and the commands sent to them
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+from typing import Any, Generator, List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import MaskedImage, InPainter, Recorder, SolveCache
+
+
+def test_records_and_solution(image: MaskedImage) -> None:
+    painter: InPainter = InPainter(image, 10, tol=0)
+    solution, _, _, _ = painter.run(1, 0.5, False, recorder=Recorder(every=0))
+    records: List[Any] = list(painter.stream(1, 0.5, False, recorder=Recorder(every=0), every=3, preview=4))
+    assert [record["iteration"] for record in records] == [3, 6, 9, 10]
+    assert [record["done"] for record in records] == [False] * 3 + [True]
+    assert records[0]["preview"].shape == (16, 16, 3) and records[0]["solution"] is None
+    np.testing.assert_array_equal(records[-1]["solution"], solution)
+
+
+def test_preview_without_iterations(image: MaskedImage) -> None:
+    records: List[Any] = list(InPainter(image, 0).stream(1, 0.5, False, recorder=Recorder(every=0), preview=4))
+    assert len(records) == 1 and records[0]["done"] and records[0]["solution"] is None
+    np.testing.assert_array_equal(records[0]["preview"], image.get_image_masked()[::4, ::4])
+
+
+def test_tolerance_command(image: MaskedImage) -> None:
+    progress: Generator = InPainter(image, 50, tol=0).stream(1, 0.5, False, recorder=Recorder(every=0), every=2)
+    assert next(progress)["iteration"] == 2
+    # The residual is below the new tolerance, so the next iteration converges
+    record: Any = progress.send({"tol": np.inf})
+    assert record["done"] and record["iteration"] == 3 and record["tol"] == np.inf
+
+
+def test_stop_command(image: MaskedImage, tmp_path: Any) -> None:
+    cache: SolveCache = SolveCache(str(tmp_path))
+    painter: InPainter = InPainter(image, 50, tol=0, cache=cache)
+    progress: Generator = painter.stream(1, 0.5, False, recorder=Recorder(every=0), every=4)
+    next(progress)
+    record: Any = progress.send({"stop": True})
+    assert record["done"] and record["iteration"] == 4
+    with pytest.raises(StopIteration) as stop:
+        progress.send(None)
+    solution, iterations, _, _ = stop.value.value
+    assert iterations == 4 and solution is record["solution"]
+    # A stopped run is not that of its parameters, so it is not cached
+    assert cache.size() == 0
+    np.testing.assert_array_equal(InPainter(image, 4, tol=0).run(1, 0.5, False, recorder=Recorder(every=0))[0],
+                                  solution)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+test_workspace.py - Tests that the iterations of the Algorithm run in its workspace, allocating no
+                    array outside the operators
+~ Daniel Cortild, 16 October 2026
+"""
+
+# Standard Imports
+import tracemalloc
+from typing import List
+
+# External Imports
+import numpy as np
+import pytest
+
+# Internal Imports
+from inpainter import Recorder
+from inpainter.Algorithm import Algorithm
+
+
+@pytest.mark.parametrize("alpha_static", [True, False])
+def test_iterations_allocate_no_array(alpha_static: bool) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    target: np.ndarray = rng.random((64, 64, 3))
+    gradient: np.ndarray = np.empty_like(target)
+    transients: List[int] = []
+
+    def proxg(Z: np.ndarray, rho: float) -> np.ndarray:
+        # Transient memory of the previous iteration, as T starts once per iteration
+        current, peak = tracemalloc.get_traced_memory()
+        transients.append(peak - current)
+        tracemalloc.reset_peak()
+        return Z
+
+    # Proximal operators and gradient working in place, so that only the iterations could allocate
+    algorithm: Algorithm = Algorithm(proxf=lambda Z, rho: Z, proxg=proxg,
+                                     LgradhL=lambda Z: np.subtract(Z, target, out=gradient),
+                                     update_LgradhL=lambda Z: None, Z_init=rng.random(target.shape),
+                                     alpha_static=alpha_static)
+    tracemalloc.start()
+    algorithm.run(20, 0, tol_bregman=np.inf, verbose=False, recorder=Recorder(every=0))
+    tracemalloc.stop()
+    # The first application of T follows the allocation of the workspace, the last one is of the solution
+    assert len(transients) == 21
+    assert max(transients[1:]) < target.nbytes / 4